@@ -0,0 +1,215 @@
+"""Throughput benchmark for the host/collective/project reconcile pipelines.
+
+Generates synthetic configs (mixed hosts, collectives and projects with
+realistic tag and description sizes), runs them against the in-memory fake API
+with injected latency, and records items/s, requests per item, peak RSS and
+per-item latency percentiles. Each case runs in a fresh process so peak RSS
+belongs to that case alone.
+
+    python benchmarks/bench_reconcile.py --sizes 100,1000,10000 --latency 0.002 \
+        --out bench-results.json
+
+``--mode library`` calls ``upsert_*`` through ``FakeTransport``; ``--mode cli``
+runs the ``hosts``/``collectives``/``projects`` commands against the fake over
+localhost HTTP (per-item latency is not available in that mode). Every case
+runs twice: ``create`` against an empty fake, then ``rerun`` where every item
+is already converged.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import resource
+import statistics
+import string
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import yaml
+
+from oc_opsdevnz import OpenCollectiveClient, __version__
+from oc_opsdevnz.cli import main as cli_main
+from oc_opsdevnz.fake_oc import FakeOpenCollective, FakeTransport, Faults, serve
+from oc_opsdevnz.operations import upsert_collective, upsert_host, upsert_project
+
+TAGS = [f"tag-{word}" for word in ("arts", "health", "civic", "open-source", "youth", "climate")]
+
+
+def _words(rng: random.Random, count: int) -> str:
+    return " ".join(
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))) for _ in range(count)
+    )
+
+
+def generate_config(size: int, seed: int = 0) -> Dict[str, list[Dict[str, Any]]]:
+    """``size`` items split ~1% hosts, ~40% collectives, the rest projects."""
+    rng = random.Random(seed)
+    n_hosts = max(1, size // 100)
+    n_collectives = max(1, int(size * 0.4))
+    n_projects = max(0, size - n_hosts - n_collectives)
+
+    def common(slug: str) -> Dict[str, Any]:
+        return {
+            "name": slug.replace("-", " ").title(),
+            "slug": slug,
+            "description": _words(rng, rng.randint(8, 30)),
+            "tags": rng.sample(TAGS, rng.randint(1, 4)),
+        }
+
+    hosts = [
+        {**common(f"bench-host-{i}"), "website": f"https://host{i}.example.org", "currency": "NZD"}
+        for i in range(n_hosts)
+    ]
+    collectives = []
+    for i in range(n_collectives):
+        item = common(f"bench-collective-{i}")
+        if i % 2 == 0:
+            item.update({"host_slug": hosts[i % n_hosts]["slug"], "apply_to_host": True})
+        collectives.append(item)
+    projects = [
+        {**common(f"bench-project-{i}"), "parent_slug": rng.choice(collectives)["slug"]}
+        for i in range(n_projects)
+    ]
+    return {"host": hosts, "collective": collectives, "project": projects}
+
+
+def _seed_hosts(fake: FakeOpenCollective, config) -> None:
+    # Hosts must be hosts before collectives apply; upsert_host only creates organizations.
+    for item in config["host"]:
+        if item["slug"] not in fake.accounts:
+            fake.add_host(item["slug"], name=item["name"])
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _summary(phase: str, items: int, seconds: float, requests: int, latencies: list[float]):
+    result: Dict[str, Any] = {
+        "phase": phase,
+        "items": items,
+        "seconds": round(seconds, 4),
+        "items_per_second": round(items / seconds, 2) if seconds else None,
+        "requests": requests,
+        "requests_per_item": round(requests / items, 3) if items else None,
+    }
+    if latencies:
+        cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        result.update(
+            {
+                "p50_item_ms": round(cuts[49] * 1000, 3),
+                "p95_item_ms": round(cuts[94] * 1000, 3),
+                "max_item_ms": round(max(latencies) * 1000, 3),
+            }
+        )
+    return result
+
+
+def _run_library(config, fake: FakeOpenCollective, phase: str) -> Dict[str, Any]:
+    client = OpenCollectiveClient(
+        api_url="http://fake.local/graphql/v2", token="bench-token", transport=FakeTransport(fake)
+    )
+    upserts = {"host": upsert_host, "collective": upsert_collective, "project": upsert_project}
+    latencies: list[float] = []
+    started = time.perf_counter()
+    for kind in ("host", "collective", "project"):
+        for item in config[kind]:
+            t0 = time.perf_counter()
+            upserts[kind](client, item)
+            latencies.append(time.perf_counter() - t0)
+    seconds = time.perf_counter() - started
+    client.close()
+    return _summary(phase, len(latencies), seconds, client.network["requests"], latencies)
+
+
+def _run_cli(config, fake: FakeOpenCollective, phase: str, workdir: Path) -> Dict[str, Any]:
+    commands = {"host": "hosts", "collective": "collectives", "project": "projects"}
+    before = sum(fake.responses.values())
+    items = 0
+    with serve(fake) as url:
+        started = time.perf_counter()
+        for kind, command in commands.items():
+            path = workdir / f"{command}.yaml"
+            path.write_text(yaml.safe_dump(config[kind], sort_keys=False))
+            argv = [command, "--file", str(path), "--api-url", url, "--token", "bench-token"]
+            if cli_main([*argv, "--output", "quiet"]) != 0:
+                raise RuntimeError(f"{command} failed during the benchmark")
+            items += len(config[kind])
+        seconds = time.perf_counter() - started
+    return _summary(phase, items, seconds, sum(fake.responses.values()) - before, [])
+
+
+def run_case(size: int, mode: str, latency: float, jitter: float, seed: int) -> Dict[str, Any]:
+    """One benchmark case (meant to run in its own process)."""
+    config = generate_config(size, seed)
+    fake = FakeOpenCollective(faults=Faults(latency=latency, jitter=jitter, seed=seed))
+    _seed_hosts(fake, config)
+    phases = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for phase in ("create", "rerun"):
+            if mode == "cli":
+                phases.append(_run_cli(config, fake, phase, Path(tmp)))
+            else:
+                phases.append(_run_library(config, fake, phase))
+    return {"size": size, "mode": mode, "phases": phases, "peak_rss_mb": _peak_rss_mb()}
+
+
+def _run_isolated(args: tuple) -> Dict[str, Any]:
+    return run_case(*args)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", default="100,1000,10000", help="Comma-separated item counts.")
+    ap.add_argument("--mode", choices=("library", "cli"), default="library")
+    ap.add_argument("--latency", type=float, default=0.002, help="Injected seconds per request.")
+    ap.add_argument("--jitter", type=float, default=0.0005, help="+/- seconds around --latency.")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default="bench-results.json", help="JSON results path.")
+    args = ap.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for size in sizes:
+        with ctx.Pool(1) as pool:
+            case = pool.apply(
+                _run_isolated, ((size, args.mode, args.latency, args.jitter, args.seed),)
+            )
+        results.append(case)
+        for phase in case["phases"]:
+            print(
+                f"{case['mode']:<8} {size:>6} {phase['phase']:<6}"
+                f" {phase['items_per_second'] or 0:>9.1f} items/s"
+                f" {phase['requests_per_item'] or 0:>6.2f} req/item"
+                f" p95={phase.get('p95_item_ms', '-')}ms rss={case['peak_rss_mb']}MB",
+                file=sys.stderr,
+            )
+
+    report = {
+        "meta": {
+            "version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    Path(args.out).write_text(json.dumps(report, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
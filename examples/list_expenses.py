@@ -1,11 +1,12 @@
 # examples/list_expenses.py
-import json
 import os
 import sys
 
 from op_opsdevnz.onepassword import get_secret
 
+from oc_opsdevnz.expenses import iter_expenses
 from oc_opsdevnz.oc_client import PROD_URL, OpenCollectiveClient
+from oc_opsdevnz.output import write_ndjson
 
 
 def main():
@@ -21,20 +22,8 @@ def main():
     api_url = os.getenv("OC_API_URL")
     oc = OpenCollectiveClient(api_url=api_url, token=token, allow_prod=api_url == PROD_URL)
 
-    q = """
-    query ListExpenses($slug: String!, $status: [ExpenseStatus!]) {
-      expenses(account: { slug: $slug }, limit: 20, status: $status) {
-        nodes {
-          id legacyId status type description
-          amount { valueInCents currency }
-          payee { slug name }
-          createdAt
-        }
-      }
-    }
-    """
-    res = oc.execute(q, {"slug": slug, "status": statuses})
-    print(json.dumps(res, indent=2))
+    # Streams every page; equivalent to `oc-opsdevnz expenses list <slug> --status ...`
+    write_ndjson(iter_expenses(oc, slug, statuses=statuses), sys.stdout)
 
 if __name__ == "__main__":
     main()
@@ -47,6 +47,7 @@ from typing import Optional
 
 from op_opsdevnz.onepassword import get_secret
 
+from oc_opsdevnz.balances import fetch_balances
 from oc_opsdevnz.oc_client import OpenCollectiveClient
 
 HOST_SLUG = "startmeup-nz"
@@ -81,19 +82,6 @@ mutation AddFunds(
 }
 """
 
-BALANCE_QUERY = """
-query Balance($slug: String!) {
-  account(slug: $slug) {
-    slug
-    name
-    stats {
-      balance { valueInCents currency }
-    }
-  }
-}
-"""
-
-
 # ---------------------------------------------------------------------------
 # Operations
 # ---------------------------------------------------------------------------
@@ -164,16 +152,13 @@ def allocate_to_project(
 
 
 def show_balances(client: OpenCollectiveClient, slugs: list[str]) -> None:
-    """Print balances for one or more account slugs."""
+    """Print balances for one or more account slugs (one batched request)."""
     print("── Balances ──")
-    for slug in slugs:
-        result = client.graphql(BALANCE_QUERY, {"slug": slug})
-        acc = result.get("account")
-        if acc is None:
+    for slug, bal in fetch_balances(client, slugs).items():
+        if not bal.found:
             print(f"  {slug}: not found")
             continue
-        bal = acc["stats"]["balance"]
-        print(f"  {acc['slug']:40s}  ${bal['valueInCents'] / 100:>10,.2f} {bal['currency']}")
+        print(f"  {bal.slug:40s}  ${bal.value_in_cents / 100:>10,.2f} {bal.currency}")
 
 
 # ---------------------------------------------------------------------------
@@ -1,8 +1,11 @@
 from importlib import metadata
 
+from .clients import ClientPool
+from .expenses import iter_expenses
 from .oc_client import (
     PROD_URL,
     STAGING_URL,
+    DeadlineExceeded,
     GraphQLError,
     HTTPRequestError,
     OpenCollectiveClient,
@@ -16,6 +19,8 @@ except metadata.PackageNotFoundError:  # Local/editable installs without metadat
     __version__ = "0.0.0+local"
 
 __all__ = [
+    "ClientPool",
+    "DeadlineExceeded",
     "GraphQLError",
     "HTTPRequestError",
     "OpenCollectiveClient",
@@ -23,6 +28,7 @@ __all__ = [
     "STAGING_URL",
     "TransportError",
     "UpsertResult",
+    "iter_expenses",
     "load_items",
     "__version__",
     "upsert_collective",
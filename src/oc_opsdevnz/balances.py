@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+from .concurrency import run_bounded
+from .oc_client import GraphQLError, OpenCollectiveClient
+from .operations import NOT_FOUND_MESSAGES
+
+BALANCE_SELECTION = "slug name stats { balance { valueInCents currency } }"
+
+Q_HOSTED_BALANCES = f"""
+query HostedBalances($slug: String!, $limit: Int!, $offset: Int!) {{
+  account(slug: $slug) {{
+    slug
+    ... on Host {{
+      hostedAccounts(limit: $limit, offset: $offset) {{
+        totalCount
+        nodes {{ {BALANCE_SELECTION} }}
+      }}
+    }}
+  }}
+}}
+"""
+
+DEFAULT_CHUNK_SIZE = 100
+
+
+@dataclass
+class Balance:
+    slug: str
+    found: bool = True
+    name: Optional[str] = None
+    value_in_cents: Optional[int] = None
+    currency: Optional[str] = None
+
+    def as_record(self) -> Dict[str, Any]:
+        """Flat dict for NDJSON/CSV output (``valueInCents`` stays an integer)."""
+        record = asdict(self)
+        record["valueInCents"] = record.pop("value_in_cents")
+        return record
+
+
+def build_balances_query(count: int) -> str:
+    """Aliased query fetching ``count`` accounts in one request (``b0`` ... ``bN``)."""
+    params = ", ".join(f"$s{i}: String!" for i in range(count))
+    fields = "\n".join(
+        f"  b{i}: account(slug: $s{i}) {{ {BALANCE_SELECTION} }}" for i in range(count)
+    )
+    return f"query Balances({params}) {{\n{fields}\n}}\n"
+
+
+def _is_not_found(error: Dict[str, Any]) -> bool:
+    return any(sig in str(error.get("message", "")) for sig in NOT_FOUND_MESSAGES)
+
+
+def _balance_from_node(slug: str, acc: Optional[Dict[str, Any]]) -> Balance:
+    if not acc:
+        return Balance(slug=slug, found=False)
+    bal = (acc.get("stats") or {}).get("balance") or {}
+    return Balance(
+        slug=acc.get("slug") or slug,
+        name=acc.get("name"),
+        value_in_cents=bal.get("valueInCents"),
+        currency=bal.get("currency"),
+    )
+
+
+def _fetch_chunk(client: OpenCollectiveClient, slugs: Sequence[str]) -> Dict[str, Balance]:
+    variables = {f"s{i}": slug for i, slug in enumerate(slugs)}
+    try:
+        data = client.graphql(build_balances_query(len(slugs)), variables)
+    except GraphQLError as e:
+        # Not-found errors only null out their own alias; keep the partial data.
+        if not e.errors or not all(_is_not_found(err) for err in e.errors):
+            raise
+        data = e.data
+    return {slug: _balance_from_node(slug, data.get(f"b{i}")) for i, slug in enumerate(slugs)}
+
+
+def fetch_balances(
+    client: OpenCollectiveClient,
+    slugs: Sequence[str],
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    concurrency: int = 1,
+) -> Dict[str, Balance]:
+    """Fetch balances for ``slugs`` with one aliased query per ``chunk_size`` accounts.
+
+    Unknown slugs come back as ``Balance(found=False)`` instead of failing the batch.
+    Results keep the order of ``slugs`` (duplicates collapsed).
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer.")
+    unique = list(dict.fromkeys(slugs))
+    chunks = [unique[i : i + chunk_size] for i in range(0, len(unique), chunk_size)]
+
+    fetched: Dict[str, Balance] = {}
+    for _, chunk_balances, err in run_bounded(
+        lambda chunk: _fetch_chunk(client, chunk), chunks, max_workers=concurrency
+    ):
+        if err is not None:
+            raise err
+        fetched.update(chunk_balances)
+    return {slug: fetched[slug] for slug in unique}
+
+
+def iter_hosted_balances(
+    client: OpenCollectiveClient, host_slug: str, *, page_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Balance]:
+    """Yield the balance of every account hosted by ``host_slug``, one page per request."""
+    offset = 0
+    while True:
+        data = client.graphql(
+            Q_HOSTED_BALANCES, {"slug": host_slug, "limit": page_size, "offset": offset}
+        )
+        account = data.get("account")
+        if not account:
+            raise RuntimeError(f"Host '{host_slug}' not found in this environment.")
+        page = account.get("hostedAccounts")
+        if page is None:
+            raise RuntimeError(f"Account '{host_slug}' is not a fiscal host.")
+        nodes = page.get("nodes") or []
+        for node in nodes:
+            yield _balance_from_node(node.get("slug"), node)
+        offset += len(nodes)
+        total = page.get("totalCount")
+        if len(nodes) < page_size or (total is not None and offset >= total):
+            return
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Iterator
+
+# How long "no account with this slug" is believed without asking again.
+NOT_FOUND_TTL = 30.0
+
+
+class NotFoundCache:
+    """Slugs the API recently reported as missing, each remembered for ``ttl`` seconds.
+
+    Thread-safe. ``ttl <= 0`` disables it. Entries are dropped as soon as the
+    owning client sends a mutation naming the slug, so a slug this run creates
+    is never reported missing from stale state.
+    """
+
+    def __init__(self, ttl: float = NOT_FOUND_TTL):
+        self.ttl = ttl
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, slug: str) -> None:
+        if self.ttl > 0:
+            with self._lock:
+                self._expires[slug] = time.monotonic() + self.ttl
+
+    def discard(self, slug: str) -> None:
+        with self._lock:
+            self._expires.pop(slug, None)
+
+    def __contains__(self, slug: object) -> bool:
+        with self._lock:
+            expires = self._expires.get(slug)  # type: ignore[arg-type]
+            if expires is None:
+                return False
+            if time.monotonic() < expires:
+                return True
+            del self._expires[slug]  # type: ignore[arg-type]
+            return False
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._expires)
+
+
+def slugs_in(value: Any) -> Iterator[str]:
+    """Every string under a ``slug`` key anywhere in nested GraphQL variables."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key == "slug" and isinstance(item, str):
+                yield item
+            else:
+                yield from slugs_in(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from slugs_in(item)
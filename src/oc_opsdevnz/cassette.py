@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import gzip
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any, Deque, Dict, Iterable, Optional
+
+import httpx
+
+from . import codec
+from .compression import decompress_body
+from .oc_client import _redact
+
+CASSETTE_VERSION = 1
+SECRET_HEADERS = ("personal-token", "authorization")
+REDACTED = "***REDACTED***"
+# Decoded bodies are stored, so transfer-level headers must not be replayed.
+_DROP_RESPONSE_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+def _open(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")  # type: ignore[return-value]
+    return path.open(mode, encoding="utf-8")
+
+
+def _request_secrets(request: httpx.Request) -> list[str]:
+    secrets = []
+    for name in SECRET_HEADERS:
+        value = request.headers.get(name)
+        if value:
+            secrets.append(value)
+            if value.lower().startswith("bearer "):
+                secrets.append(value[7:])
+    return secrets
+
+
+def _request_record(request: httpx.Request, extra_secrets: Iterable[str]) -> Dict[str, Any]:
+    secrets = [*_request_secrets(request), *extra_secrets]
+    content = decompress_body(request.content, request.headers.get("content-encoding"))
+    headers = {
+        k: (REDACTED if k in SECRET_HEADERS else v)
+        for k, v in request.headers.items()
+        if k in SECRET_HEADERS or k in ("idempotency-key", "content-type", "user-agent")
+    }
+    return {
+        "method": request.method,
+        "url": str(request.url),
+        "headers": headers,
+        "body": _redact(content.decode("utf-8", "replace"), secrets),
+    }
+
+
+def _match_key(method: str, url: str, body: str) -> tuple[str, str, str]:
+    try:
+        body = codec.dumps(codec.loads(body), sort_keys=True)
+    except ValueError:
+        pass
+    return method, url, body
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """Forward requests to ``inner`` and append each exchange to a cassette file.
+
+    Cassettes are JSON lines (gzip when the path ends in ``.gz``): a header
+    line, then one compact entry per request with its start offset and
+    duration. Token headers are replaced and token values are scrubbed from
+    bodies with ``_redact`` before anything touches disk. Safe to share
+    between worker threads.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        inner: Optional[httpx.BaseTransport] = None,
+        *,
+        secrets: Iterable[str] = (),
+    ):
+        self.path = Path(path)
+        self.inner = inner or httpx.HTTPTransport()
+        self.secrets = [s for s in secrets if s]
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._fp = _open(self.path, "w")
+        header = {
+            "cassette": CASSETTE_VERSION,
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+        }
+        self._fp.write(codec.dumps(header) + "\n")
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        offset = time.perf_counter() - self._started
+        response = self.inner.handle_request(request)
+        try:
+            body = response.read()
+        finally:
+            response.close()
+        duration = time.perf_counter() - self._started - offset
+        headers = [(k, v) for k, v in response.headers.items() if k not in _DROP_RESPONSE_HEADERS]
+        secrets = [*_request_secrets(request), *self.secrets]
+        entry = {
+            "t": round(offset, 6),
+            "d": round(duration, 6),
+            "request": _request_record(request, self.secrets),
+            "response": {
+                "status": response.status_code,
+                "headers": dict(headers),
+                "body": _redact(body.decode("utf-8", "replace"), secrets),
+            },
+        }
+        line = codec.dumps(entry)
+        with self._lock:
+            self._fp.write(line + "\n")
+            self._fp.flush()
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._fp.closed:
+                self._fp.close()
+        self.inner.close()
+
+
+class CassetteMiss(LookupError):
+    """A replayed request has no (remaining) recorded counterpart."""
+
+
+class ReplayTransport(httpx.BaseTransport):
+    """Answer requests from a cassette recorded by ``RecordingTransport``.
+
+    Requests match on method, URL and (canonical JSON) body; repeated
+    identical requests replay their recordings in order. ``speed`` of None
+    answers immediately, ``1.0`` reproduces recorded durations and other
+    values scale them (``0.5`` = half as long).
+    """
+
+    def __init__(self, path: Path | str, *, speed: Optional[float] = None):
+        self.path = Path(path)
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._entries: Dict[tuple, Deque[Dict[str, Any]]] = defaultdict(deque)
+        with _open(self.path, "r") as fp:
+            header = codec.loads(fp.readline() or "{}")
+            if header.get("cassette") != CASSETTE_VERSION:
+                raise ValueError(f"{self.path} is not a version {CASSETTE_VERSION} cassette.")
+            for line in fp:
+                if line.strip():
+                    entry = codec.loads(line)
+                    req = entry["request"]
+                    self._entries[_match_key(req["method"], req["url"], req["body"])].append(entry)
+
+    @property
+    def remaining(self) -> int:
+        return sum(len(q) for q in self._entries.values())
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        recorded = _request_record(request, ())
+        key = _match_key(recorded["method"], recorded["url"], recorded["body"])
+        with self._lock:
+            queue = self._entries.get(key)
+            if not queue:
+                raise CassetteMiss(f"No recorded response for {request.method} {request.url}.")
+            entry = queue.popleft()
+        if self.speed:
+            time.sleep(entry["d"] * self.speed)
+        res = entry["response"]
+        return httpx.Response(
+            res["status"],
+            headers=res["headers"],
+            content=res["body"].encode("utf-8"),
+            request=request,
+        )
@@ -1,13 +1,60 @@
 from __future__ import annotations
 
 import argparse
-import json
+import io
+import os
 import sys
+import time
+from contextlib import nullcontext
 from pathlib import Path
 
-from . import __version__
-from .oc_client import PROD_URL, OpenCollectiveClient
-from .operations import UpsertResult, load_items, upsert_collective, upsert_host, upsert_project
+from . import __version__, codec
+from .balances import fetch_balances, iter_hosted_balances
+from .cache import NOT_FOUND_TTL
+from .clients import DEFAULT_KEY, ClientPool
+from .concurrency import run_bounded
+from .connections import PoolSettings
+from .deadline import Deadline, OperationTimeouts, parse_duration
+from .environments import Environment, client_for, parse_environments, resolve_environment
+from .expenses import (
+    EXPENSE_CSV_FIELDS,
+    EXPENSE_STATUSES,
+    EXPENSE_TYPES,
+    flatten_expense,
+    iter_expenses,
+    load_expense_rows,
+    plan_expense_jobs,
+    run_expense_pipeline,
+)
+from .funds import allocate_funds, plan_allocations
+from .hedging import HedgePolicy
+from .journal import read_journal
+from .metrics import Metrics
+from .oc_client import PROD_URL, STAGING_URL, DeadlineExceeded, OpenCollectiveClient
+from .operations import (
+    UpsertResult,
+    load_items,
+    load_rows,
+    upsert_collective,
+    upsert_host,
+    upsert_project,
+)
+from .output import (
+    OUTPUT_MODES,
+    SUMMARY_COUNTS,
+    ResultPrinter,
+    format_counts,
+    result_outcomes,
+    write_csv,
+    write_ndjson,
+)
+from .ratelimit import RateLimiter
+from .reconcile import ledger_entries, load_oc_transactions, reconcile
+from .reports import expense_arrays, ledger_arrays, rollup
+from .request_log import RequestLog
+from .schema import Validator, builtin_documents, fetch_schema, load_schema, save_schema
+from .timings import PhaseTimer, profiled, write_timings
+from .transactions import LedgerStore, sync_transactions
 
 WHOAMI_QUERY = """
 query Account($slug: String!) {
@@ -34,38 +81,272 @@ def _add_common_options(ap: argparse.ArgumentParser) -> None:
         help="Personal-Token vs OAuth bearer.",
     )
     ap.add_argument(
-        "--log-requests", action="store_true", help="Print request summaries (also via OC_DEBUG=1)."
+        "--log-requests",
+        action="store_true",
+        help="Structured JSON line per request (operation, status, duration, sizes, attempt,"
+        " idempotency key) on stderr (also via OC_DEBUG=1).",
     )
+    ap.add_argument(
+        "--request-log",
+        metavar="PATH",
+        help="Append the request log to PATH instead of stderr (implies --log-requests).",
+    )
+    ap.add_argument(
+        "--metrics-file",
+        metavar="PATH",
+        help="Write Prometheus text-format metrics (requests, latency, retries, 429s, cache,"
+        " items) to PATH when the run ends.",
+    )
+    ap.add_argument(
+        "--validate",
+        action="store_true",
+        help="Check every document and its variables against the schema cached by"
+        " `introspect` before sending anything.",
+    )
+    ap.add_argument(
+        "--cache-dir",
+        metavar="DIR",
+        help="Local cache directory (default: $XDG_CACHE_HOME/oc-opsdevnz).",
+    )
+    ap.add_argument(
+        "--http2",
+        action="store_true",
+        help="Multiplex requests over HTTP/2 (needs the http2 extra).",
+    )
+    ap.add_argument(
+        "--compress-requests",
+        action="store_true",
+        help="Gzip request bodies of 1 KiB or more (large batched documents).",
+    )
+    ap.add_argument(
+        "--persisted-queries",
+        action="store_true",
+        help="Send query hashes (automatic persisted queries), falling back to full text.",
+    )
+    ap.add_argument(
+        "--max-connections",
+        type=int,
+        default=PoolSettings.max_connections,
+        help=f"Open connections cap (default: {PoolSettings.max_connections}).",
+    )
+    ap.add_argument(
+        "--keepalive-expiry",
+        type=float,
+        default=PoolSettings.keepalive_expiry,
+        metavar="SECONDS",
+        help=f"Idle connection lifetime (default: {PoolSettings.keepalive_expiry:g}s).",
+    )
+    ap.add_argument(
+        "--deadline",
+        type=parse_duration,
+        metavar="DURATION",
+        help="Budget for the whole run (e.g. 90s, 10m, 1h30m). Requests and retries never"
+        " start past it; items it leaves no time for are reported as skipped (exit 3).",
+    )
+    ap.add_argument(
+        "--connect-timeout",
+        type=parse_duration,
+        metavar="DURATION",
+        help="Per-attempt connect timeout for reads and mutations (default: 20s).",
+    )
+    ap.add_argument(
+        "--query-timeout",
+        type=_timeout_pair,
+        metavar="READ[,TOTAL]",
+        help="Per-attempt read timeout for queries, optionally with a total including retries.",
+    )
+    ap.add_argument(
+        "--mutation-timeout",
+        type=_timeout_pair,
+        metavar="READ[,TOTAL]",
+        help="Per-attempt read timeout for mutations, optionally with a total including retries.",
+    )
+
+    ap.add_argument(
+        "--rate-limit",
+        type=float,
+        metavar="RPS",
+        help="Client-side cap on requests per second (retries and hedges included).",
+    )
+    ap.add_argument(
+        "--not-found-ttl",
+        type=parse_duration,
+        default=NOT_FOUND_TTL,
+        metavar="DURATION",
+        help=f"Remember slugs the API reported missing for this long (default: {NOT_FOUND_TTL:g}s;"
+        " 0 disables). Creating a slug forgets it at once.",
+    )
+    ap.add_argument(
+        "--hedge",
+        action="store_true",
+        help="Send a duplicate of any read still running after that operation's observed p95"
+        " latency and use whichever answers first. Mutations are never hedged.",
+    )
+
+
+def _timeout_pair(text: str) -> tuple[float, float | None]:
+    read, _, total = text.partition(",")
+    return parse_duration(read), parse_duration(total) if total else None
+
+
+def _timeouts_from_args(args, kind: str) -> OperationTimeouts | None:
+    connect = getattr(args, "connect_timeout", None)
+    pair = getattr(args, f"{kind}_timeout", None)
+    if connect is None and pair is None:
+        return None
+    read, total = pair or (OperationTimeouts.read, None)
+    return OperationTimeouts(
+        connect=connect if connect is not None else OperationTimeouts.connect,
+        read=read,
+        total=total,
+    )
+
+
+def _add_upsert_options(ap: argparse.ArgumentParser) -> None:
+    """Fan-out and output options shared by the hosts/collectives/projects commands."""
+    ap.add_argument(
+        "--envs",
+        type=parse_environments,
+        metavar="ENV[,ENV...]",
+        help="Reconcile in several environments at once (e.g. staging,prod), each with the"
+        " token from OC_SECRET_REF_<ENV>; per-environment output plus a combined summary.",
+    )
+    ap.add_argument(
+        "--host-token",
+        dest="host_tokens",
+        action="append",
+        metavar="HOST=VAR",
+        help="Send items of HOST (host_slug, slug, or the parent collective's host) with the"
+        " token in env var VAR (an op:// ref or the token). Repeatable; each token runs in"
+        " parallel on its own rate budget. Other items need default=VAR.",
+    )
+    ap.add_argument(
+        "--output",
+        choices=OUTPUT_MODES,
+        default="pretty",
+        help="pretty (default), ndjson (one compact record per item), summary (counts only)"
+        " or quiet.",
+    )
+
+
+def _add_diagnostic_options(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--profile", metavar="PATH", help="Write cProfile stats for the run to PATH.")
+    ap.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print a per-phase wall/CPU breakdown (load, validate, prefetch, diff, mutate,"
+        " network, print) and network wait to stderr.",
+    )
+    ap.add_argument(
+        "--timings-file",
+        metavar="PATH",
+        help="Write the --timings breakdown as JSON to PATH instead (implies --timings).",
+    )
+
+
+def _timings_target(args) -> str | None:
+    """``--timings-file`` PATH, ``"-"`` (stderr) for ``--timings``, else None."""
+    return getattr(args, "timings_file", None) or ("-" if getattr(args, "timings", False) else None)
+
+
+def _write_timings_from_args(args, timer: PhaseTimer, client=None) -> None:
+    target = _timings_target(args)
+    if target:
+        write_timings(timer.report(client.network if client else None), target)
+
+
+def _pool_from_args(args) -> PoolSettings:
+    max_connections = getattr(args, "max_connections", PoolSettings.max_connections)
+    return PoolSettings(
+        http2=getattr(args, "http2", False),
+        max_connections=max_connections,
+        max_keepalive_connections=min(max_connections, PoolSettings.max_keepalive_connections),
+        keepalive_expiry=getattr(args, "keepalive_expiry", PoolSettings.keepalive_expiry),
+    )
+
+
+def _client_options(args) -> dict:
+    """Client keyword arguments shared by every environment of a run (no token or endpoint)."""
+    return {
+        "auth_mode": args.auth_mode,
+        "metrics": getattr(args, "metrics", None),
+        "pool": _pool_from_args(args),
+        "shared_pool": True,
+        "compress_requests": getattr(args, "compress_requests", False),
+        "persisted_queries": getattr(args, "persisted_queries", False),
+        "query_timeouts": _timeouts_from_args(args, "query"),
+        "mutation_timeouts": _timeouts_from_args(args, "mutation"),
+        "deadline": getattr(args, "run_deadline", None),
+        "rate_limiter": RateLimiter(args.rate_limit) if getattr(args, "rate_limit", None) else None,
+        "hedge": HedgePolicy() if getattr(args, "hedge", False) else None,
+        "not_found_ttl": getattr(args, "not_found_ttl", NOT_FOUND_TTL),
+    }
+
+
+def _request_log_from_args(args) -> RequestLog | None:
+    path = getattr(args, "request_log", None)
+    if path:
+        return RequestLog.open(path)
+    return RequestLog.open("-") if args.log_requests else None
+
+
+def _endpoint_from_args(args) -> tuple[str, bool]:
+    """``(api_url, allow_prod)`` for the environment flags; prod unless told otherwise."""
+    if args.api_url:
+        return args.api_url, args.api_url == PROD_URL
+    if args.staging or args.test:
+        return STAGING_URL, False
+    return PROD_URL, True
 
 
 def _client_from_args(args) -> OpenCollectiveClient:
-    kwargs = {"token": args.token, "auth_mode": args.auth_mode, "log_requests": args.log_requests}
+    kwargs = {"token": args.token, **_client_options(args)}
+    request_log = _request_log_from_args(args)
+    if request_log is not None:
+        kwargs["request_log"] = request_log
     if args.api_url:
-        return OpenCollectiveClient(
+        client = OpenCollectiveClient(
             api_url=args.api_url, allow_prod=args.api_url == PROD_URL, **kwargs
         )
-    if args.staging or args.test:
-        return OpenCollectiveClient.for_staging(**kwargs)
-    # Default to prod; --prod is accepted for explicitness/backward compatibility
-    return OpenCollectiveClient.for_prod(**kwargs)
-
-
-def _print_result(label: str, result: UpsertResult) -> None:
-    summary = {
-        "slug": result.slug,
-        "created": result.created,
-        "updated": result.updated,
-        "applied_to_host": result.applied_to_host,
-        "warnings": result.warnings,
-    }
-    print(f"[{label}] {json.dumps(summary)}")
-    print(json.dumps({"account": result.account}, indent=2))
+    elif args.staging or args.test:
+        client = OpenCollectiveClient.for_staging(**kwargs)
+    else:
+        # Default to prod; --prod is accepted for explicitness/backward compatibility
+        client = OpenCollectiveClient.for_prod(**kwargs)
+    if getattr(args, "validate", False):
+        client.validator = _validator_for(client.api_url, getattr(args, "cache_dir", None))
+    return client
+
+
+def _validator_for(api_url: str, cache_dir) -> Validator:
+    schema = load_schema(api_url, cache_dir)
+    if schema is None:
+        raise RuntimeError(f"No cached schema for {api_url}; run `oc-opsdevnz introspect` first.")
+    validator = Validator(schema)
+    # Static documents are checked once up front; generated ones on first use.
+    failures = validator.check_all(builtin_documents())
+    if failures:
+        details = "; ".join(f"{name}: {', '.join(p)}" for name, p in sorted(failures.items()))
+        raise RuntimeError(f"Documents do not match the cached schema: {details}")
+    return validator
+
+
+def cmd_introspect(args) -> int:
+    client = _client_from_args(args)
+    introspection = fetch_schema(client)
+    path = save_schema(client.api_url, introspection, args.cache_dir)
+    types = len(introspection.get("types") or [])
+    print(f"[schema] {types} types from {client.api_url} saved to {path}")
+    problems = Validator(load_schema(client.api_url, args.cache_dir)).check_all(builtin_documents())
+    for name, found in sorted(problems.items()):
+        print(f"[invalid] {name}: {'; '.join(found)}", file=sys.stderr)
+    return 1 if problems else 0
 
 
 def cmd_whoami(args) -> int:
     client = _client_from_args(args)
     data = client.graphql(WHOAMI_QUERY, {"slug": args.slug})
-    print(json.dumps(data, indent=2))
+    print(codec.dumps(data, indent=True))
     return 0
 
 
@@ -106,60 +387,483 @@ def _validate_project_item(item: dict) -> None:
         raise ValueError(f"Project item '{item.get('slug')}' is missing parent_slug.")
 
 
-def cmd_hosts(args) -> int:
+def _run_upserts(args, label: str, validate, upsert) -> int:
     path = Path(args.config or args.file)
     if not path.exists():
-        print(f"hosts file not found: {path}", file=sys.stderr)
+        print(f"{label}s file not found: {path}", file=sys.stderr)
         return 2
+    if getattr(args, "envs", None):
+        return _run_upserts_across(args, path, label, validate, upsert)
+    if getattr(args, "host_tokens", None):
+        return _run_upserts_by_token(args, path, label, validate, upsert)
+
+    with profiled(getattr(args, "profile", None)):
+        timer = PhaseTimer()
+        with timer.phase("load"):
+            items = load_items(path)
+        client = _client_from_args(args)
+        printer = ResultPrinter(getattr(args, "output", "pretty"))
+        try:
+            _upsert_items(args, client, items, label, validate, upsert, printer, timer)
+        finally:
+            with timer.phase("print"):
+                printer.close()
+            _write_timings_from_args(args, timer, client)
+    skipped = printer.counts["skipped"]
+    if skipped:
+        print(f"[deadline] {skipped} {label}(s) skipped; rerun to finish.", file=sys.stderr)
+        return 3
+    return 0
 
+
+def _run_upserts_across(args, path: Path, label: str, validate, upsert) -> int:
+    """Reconcile the same items in several environments at once, one client per environment."""
+    if args.token or args.api_url or args.staging or args.test or args.prod:
+        raise ValueError(
+            "--envs takes endpoints and tokens from OC_API_URL_<ENV> / OC_SECRET_REF_<ENV>;"
+            " drop --token/--api-url/--staging/--prod."
+        )
+    environments = [resolve_environment(name) for name in args.envs]
     items = load_items(path)
-    client = _client_from_args(args)
+    request_log = _request_log_from_args(args)
+
+    def opener(env: Environment):
+        # Own client per environment: token, prod guard, rate limiter and caches.
+        return lambda: client_for(env, request_log=request_log, **_client_options(args))
+
+    groups = [(env.name, opener(env), items) for env in environments]
+    return _run_groups(args, label, validate, upsert, groups, "env")
+
+
+def _run_upserts_by_token(args, path: Path, label: str, validate, upsert) -> int:
+    """Route items to per-host clients (``--host-token``) and run each token's items in parallel."""
+    options = _client_options(args)
+    # The pool owns these: one rate limiter per token, one shared connection pool.
+    for name in ("rate_limiter", "shared_pool"):
+        options.pop(name)
+    request_log = _request_log_from_args(args)
+    if request_log is not None:
+        options["request_log"] = request_log
+    api_url, allow_prod = _endpoint_from_args(args)
+    clients = ClientPool(
+        rate=getattr(args, "rate_limit", None),
+        pool=options.pop("pool"),
+        api_url=api_url,
+        allow_prod=allow_prod,
+        **options,
+    )
+    with clients:
+        for spec in args.host_tokens:
+            key, _, var = spec.partition("=")
+            if not key or not var:
+                raise ValueError(f"--host-token expects HOST=VAR, got '{spec}'.")
+            # VAR holds the host's op:// reference, or the token itself (CI).
+            if (os.getenv(var) or "").startswith("op://"):
+                clients.add(key, secret_ref_env=var)
+            else:
+                clients.add(key, token_env=var)
+
+        routed: dict[str, list] = {}
+        unrouted = []
+        for item in load_items(path):
+            if not args.only or item.get("slug") == args.only:
+                try:
+                    key, _ = clients.route(item)
+                except KeyError:
+                    unrouted.append(str(item.get("slug")))
+                    continue
+                routed.setdefault(key, []).append(item)
+        if unrouted:
+            # Never fall back to the run's main token: add a --host-token default=VAR.
+            raise ValueError(
+                f"No --host-token for {', '.join(unrouted)};"
+                f" pass --host-token {DEFAULT_KEY}=VAR for items of other hosts."
+            )
+        groups = [
+            (key, lambda key=key: clients.client(key), items) for key, items in routed.items()
+        ]
+        return _run_groups(args, label, validate, upsert, groups, "client")
+
+
+def _run_groups(args, label: str, validate, upsert, groups, field: str) -> int:
+    """Run ``(name, open_client, items)`` groups concurrently, one thread per group.
+
+    Each group's output is buffered and printed in the order given, followed by
+    per-group and combined counts on stderr. Exit code: 1 if any group failed,
+    else 3 if any items were skipped, else 0.
+    """
+    if _timings_target(args):
+        raise ValueError("--timings needs a single client (drop --envs/--host-token).")
+    mode = getattr(args, "output", "pretty")
+    opened = []
+
+    def run(group) -> tuple[ResultPrinter, io.StringIO, Exception | None]:
+        name, open_client, items = group
+        buffer = io.StringIO()
+        printer = ResultPrinter(mode, buffer, group=name, group_field=field)
+        try:
+            client = open_client()
+            opened.append(client)
+            if getattr(args, "validate", False) and client.validator is None:
+                client.validator = _validator_for(client.api_url, getattr(args, "cache_dir", None))
+            _upsert_items(args, client, items, label, validate, upsert, printer, PhaseTimer())
+        except Exception as e:
+            return printer, buffer, e
+        finally:
+            printer.close()
+        return printer, buffer, None
+
+    outcomes = {}
+    try:
+        with profiled(getattr(args, "profile", None)):
+            for group, outcome, _ in run_bounded(run, groups, max_workers=max(1, len(groups))):
+                outcomes[group[0]] = outcome
+    finally:
+        for client in opened:
+            client.close()
+
+    totals = dict.fromkeys(SUMMARY_COUNTS, 0)
+    status = 0
+    for name, _, _ in groups:
+        printer, buffer, error = outcomes[name]
+        sys.stdout.write(buffer.getvalue())
+        for key, value in printer.counts.items():
+            totals[key] += value
+        state = "ok"
+        if error is not None:
+            state, status = f"failed: {error}", 1
+        elif printer.counts["skipped"]:
+            state, status = "incomplete", status or 3
+        print(f"[{name}] {format_counts(printer.counts)} ({state})", file=sys.stderr)
+    if mode == "summary":
+        print(f"total: {format_counts(totals)}")
+    print(f"[{field}s] {format_counts(totals)}", file=sys.stderr)
+    sys.stdout.flush()
+    return status
+
 
+def _upsert_items(
+    args, client, items, label: str, validate, upsert, printer, timer: PhaseTimer
+) -> None:
+    """Upsert ``items`` through ``client`` in order; the first failure is re-raised."""
+    metrics = getattr(args, "metrics", None)
+    deadline = client.deadline
     for item in items:
         if args.only and item.get("slug") != args.only:
             continue
-        _validate_host_item(item)
-        result = upsert_host(client, item)
-        _print_result("host", result)
-    return 0
+        if deadline is not None and deadline.expired:
+            printer.skip(label, item.get("slug"), "deadline reached before start")
+            if metrics is not None:
+                metrics.count_item(label, "skipped")
+            continue
+        try:
+            with timer.phase("validate"):
+                validate(item)
+            result = _timed_upsert(timer, client, upsert, item, printer, label)
+            if metrics is not None:
+                for outcome in result_outcomes(result):
+                    metrics.count_item(label, outcome)
+        except DeadlineExceeded as e:
+            if deadline is None or not deadline.expired:
+                # An operation's own total timeout: a failure like any other.
+                printer.fail(label, item.get("slug"), e)
+                if metrics is not None:
+                    metrics.count_item(label, "failed")
+                raise
+            reason = str(e)
+            if e.attempted:
+                reason += " (may be partly applied; rerun to finish)"
+            printer.skip(label, item.get("slug"), reason)
+            if metrics is not None:
+                metrics.count_item(label, "skipped")
+        except Exception as e:
+            printer.fail(label, item.get("slug"), e)
+            if metrics is not None:
+                metrics.count_item(label, "failed")
+            raise
+
+
+def _timed_upsert(
+    timer: PhaseTimer, client, upsert, item: dict, printer, label: str
+) -> UpsertResult:
+    """Split one upsert into prefetch (reads), mutate (writes) and diff (everything local)."""
+    net0 = dict(client.network)
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+    try:
+        result = upsert(client, item)
+    finally:
+        wall = time.perf_counter() - wall0
+        reads = client.network["query_seconds"] - net0["query_seconds"]
+        writes = client.network["mutation_seconds"] - net0["mutation_seconds"]
+        timer.add("prefetch", reads)
+        timer.add("mutate", writes)
+        timer.add("diff", max(0.0, wall - reads - writes), time.process_time() - cpu0)
+    with timer.phase("print"):
+        printer.add(label, result)
+    return result
+
+
+def cmd_hosts(args) -> int:
+    return _run_upserts(args, "host", _validate_host_item, upsert_host)
 
 
 def cmd_collectives(args) -> int:
-    path = Path(args.config or args.file)
+    return _run_upserts(args, "collective", _validate_collective_item, upsert_collective)
+
+
+def cmd_projects(args) -> int:
+    return _run_upserts(args, "project", _validate_project_item, upsert_project)
+
+
+def cmd_expenses_list(args) -> int:
+    client = _client_from_args(args)
+    expenses = iter_expenses(
+        client,
+        args.slug,
+        statuses=args.status,
+        expense_type=args.type,
+        date_from=args.date_from,
+        date_to=args.date_to,
+        page_size=args.page_size,
+    )
+    out = open(args.out, "w", newline="") if args.out else nullcontext(sys.stdout)
+    with out as fp:
+        if args.format == "csv":
+            count = write_csv((flatten_expense(e) for e in expenses), fp, EXPENSE_CSV_FIELDS)
+        else:
+            count = write_ndjson(expenses, fp)
+    print(f"[expenses] exported {count} expense(s) for {args.slug}", file=sys.stderr)
+    return 0
+
+
+def cmd_expenses_bulk(args) -> int:
+    path = Path(args.file)
     if not path.exists():
-        print(f"collectives file not found: {path}", file=sys.stderr)
+        print(f"expenses file not found: {path}", file=sys.stderr)
         return 2
 
-    items = load_items(path)
-    client = _client_from_args(args)
+    with profiled(getattr(args, "profile", None)):
+        timer = PhaseTimer()
+        with timer.phase("load"):
+            jobs = plan_expense_jobs(load_expense_rows(path))
+            journal_path = Path(args.journal or f"{path}.journal.jsonl")
+            journal_state = read_journal(journal_path)
+        client = _client_from_args(args)
 
-    for item in items:
-        if args.only and item.get("slug") != args.only:
-            continue
-        _validate_collective_item(item)
-        result = upsert_collective(client, item)
-        _print_result("collective", result)
-    return 0
+        with timer.phase("network"), journal_path.open("a") as journal:
+            run_expense_pipeline(
+                client,
+                jobs,
+                until=args.until,
+                concurrency=args.concurrency,
+                journal=journal,
+                journal_state=journal_state,
+            )
 
+        failed = 0
+        with timer.phase("print"):
+            for job in jobs:
+                failed += job.error is not None
+                summary = {
+                    "key": job.key,
+                    "account": job.expense_input["account"]["slug"],
+                    "payee": job.expense_input["payee"]["slug"],
+                    "id": job.expense_id,
+                    "legacyId": job.legacy_id,
+                    "status": job.status,
+                    "error": job.error,
+                }
+                print(f"[expense] {codec.dumps(summary)}")
+            print(
+                f"[expenses] {len(jobs) - failed} ok, {failed} failed; journal: {journal_path}",
+                file=sys.stderr,
+            )
+        _write_timings_from_args(args, timer, client)
+    return 1 if failed else 0
 
-def cmd_projects(args) -> int:
-    path = Path(args.config or args.file)
+
+def cmd_allocate(args) -> int:
+    path = Path(args.ledger)
     if not path.exists():
-        print(f"projects file not found: {path}", file=sys.stderr)
+        print(f"ledger file not found: {path}", file=sys.stderr)
+        return 2
+
+    with profiled(getattr(args, "profile", None)):
+        timer = PhaseTimer()
+        with timer.phase("load"):
+            allocations = plan_allocations(load_rows(path), host=args.host, currency=args.currency)
+            journal_path = Path(args.journal or f"{path}.journal.jsonl")
+            journal_state = read_journal(journal_path)
+        client = _client_from_args(args)
+
+        with timer.phase("network"), journal_path.open("a") as journal:
+            report = allocate_funds(
+                client,
+                allocations,
+                host=args.host,
+                currency=args.currency,
+                concurrency=args.concurrency,
+                journal=journal,
+                journal_state=journal_state,
+            )
+
+        with timer.phase("print"):
+            for a in report.allocations:
+                summary = {
+                    "project": a.project,
+                    "amountInCents": a.cents,
+                    "currency": report.currency,
+                    "id": a.transaction_id,
+                    "status": a.status,
+                    "error": a.error,
+                }
+                print(f"[allocation] {codec.dumps(summary)}")
+            for slug, bal in report.after.items():
+                before = report.before[slug].value_in_cents or 0
+                after = bal.value_in_cents or 0
+                print(
+                    f"[balance] {slug:40s} {after / 100:>12,.2f} {bal.currency or ''}"
+                    f" ({(after - before) / 100:+,.2f})"
+                )
+            for mismatch in report.mismatches:
+                print(f"[warning] balance check failed: {mismatch}", file=sys.stderr)
+        _write_timings_from_args(args, timer, client)
+    return 1 if report.failed or report.mismatches else 0
+
+
+def cmd_balance(args) -> int:
+    if not args.slugs and not args.host:
+        print("balance: pass one or more slugs and/or --host", file=sys.stderr)
         return 2
 
-    items = load_items(path)
     client = _client_from_args(args)
+    balances = []
+    if args.host:
+        balances.extend(iter_hosted_balances(client, args.host, page_size=args.chunk_size))
+    if args.slugs:
+        balances.extend(
+            fetch_balances(
+                client, args.slugs, chunk_size=args.chunk_size, concurrency=args.concurrency
+            ).values()
+        )
 
-    for item in items:
-        if args.only and item.get("slug") != args.only:
-            continue
-        _validate_project_item(item)
-        result = upsert_project(client, item)
-        _print_result("project", result)
+    if args.format == "ndjson":
+        write_ndjson((b.as_record() for b in balances), sys.stdout)
+    else:
+        for b in balances:
+            if not b.found:
+                print(f"{b.slug:40s}  {'not found':>14s}")
+                continue
+            amount = (b.value_in_cents or 0) / 100
+            print(f"{b.slug:40s}  {amount:>14,.2f} {b.currency or ''}")
+    return 1 if any(not b.found for b in balances) else 0
+
+
+def cmd_transactions_sync(args) -> int:
+    if not args.slugs and not args.host:
+        print("transactions sync: pass one or more slugs and/or --host", file=sys.stderr)
+        return 2
+
+    with profiled(getattr(args, "profile", None)):
+        timer = PhaseTimer()
+        client = _client_from_args(args)
+        slugs = list(args.slugs)
+        if args.host:
+            with timer.phase("network"):
+                slugs.extend(b.slug for b in iter_hosted_balances(client, args.host))
+
+        with timer.phase("load"):
+            store = LedgerStore(args.db)
+        with store:
+            for slug in dict.fromkeys(slugs):
+                # Pages are fetched and committed interleaved; both count as network.
+                with timer.phase("network"):
+                    result = sync_transactions(
+                        client, store, slug, full=args.full, page_size=args.page_size
+                    )
+                with timer.phase("print"):
+                    summary = {
+                        "account": result.account,
+                        "since": result.since,
+                        "fetched": result.fetched,
+                        "inserted": result.inserted,
+                        "highWater": result.high_water,
+                    }
+                    print(f"[transactions] {codec.dumps(summary)}")
+        _write_timings_from_args(args, timer, client)
+    return 0
+
+
+def cmd_report_rollup(args) -> int:
+    if args.expenses:
+        path = Path(args.expenses)
+        if not path.exists():
+            print(f"expenses file not found: {path}", file=sys.stderr)
+            return 2
+        arrays = expense_arrays(load_rows(path))
+    else:
+        if not Path(args.db).exists():
+            print(f"ledger database not found: {args.db}", file=sys.stderr)
+            return 2
+        with LedgerStore(args.db) as store:
+            arrays = ledger_arrays(
+                store, accounts=args.account, date_from=args.date_from, date_to=args.date_to
+            )
+
+    result = rollup(arrays)
+    out = open(args.out, "w", newline="") if args.out else nullcontext(sys.stdout)
+    with out as fp:
+        if args.format == "csv":
+            write_csv(result.records(), fp, result.fields)
+        else:
+            fp.write(codec.dumps(list(result.records()), indent=True))
+            fp.write("\n")
     return 0
 
 
+def cmd_reconcile(args) -> int:
+    path = Path(args.ledger)
+    if not path.exists():
+        print(f"ledger file not found: {path}", file=sys.stderr)
+        return 2
+
+    if args.db and not Path(args.db).exists():
+        print(f"ledger database not found: {args.db}", file=sys.stderr)
+        return 2
+
+    with profiled(getattr(args, "profile", None)):
+        timer = PhaseTimer()
+        client = None
+        with timer.phase("load"):
+            journal_state = read_journal(Path(args.journal)) if args.journal else None
+            entries = ledger_entries(load_rows(path), journal_state=journal_state)
+        fetch = {"window_days": args.window_days, "kinds": args.kind}
+        if args.db:
+            with timer.phase("load"), LedgerStore(args.db) as store:
+                transactions = load_oc_transactions(entries, store=store, **fetch)
+        else:
+            client = _client_from_args(args)
+            with timer.phase("network"):
+                transactions = load_oc_transactions(entries, client=client, **fetch)
+
+        with timer.phase("diff"):
+            report = reconcile(entries, transactions, window_days=args.window_days)
+        with timer.phase("print"):
+            if args.format == "ndjson":
+                write_ndjson(report.records(), sys.stdout)
+            else:
+                for record in report.records():
+                    if record["result"] != "matched":
+                        print(f"[{record['result']}] {codec.dumps(record)}")
+            print(
+                f"[reconcile] matched={len(report.matched)} missing={len(report.missing)}"
+                f" unexpected={len(report.unexpected)}",
+                file=sys.stderr,
+            )
+        _write_timings_from_args(args, timer, client)
+    return 0 if report.clean else 1
+
+
 def cmd_version(args) -> int:  # noqa: ARG001 - required by argparse
     print(__version__)
     return 0
@@ -174,6 +878,13 @@ def build_parser() -> argparse.ArgumentParser:
     p_whoami.add_argument("slug", help="Account slug to query.")
     p_whoami.set_defaults(func=cmd_whoami)
 
+    p_introspect = sub.add_parser(
+        "introspect",
+        help="Cache the API schema for this environment and check the bundled documents.",
+    )
+    _add_common_options(p_introspect)
+    p_introspect.set_defaults(func=cmd_introspect)
+
     p_hosts = sub.add_parser("hosts", help="Create/update host organizations from YAML/JSON.")
     _add_common_options(p_hosts)
     p_hosts.add_argument("--file", default="hosts.yaml", help="Path to hosts YAML/JSON (array).")
@@ -181,6 +892,8 @@ def build_parser() -> argparse.ArgumentParser:
         "--config", help="Alias for --file when using env-named configs (e.g., staging-host.yaml)."
     )
     p_hosts.add_argument("--only", help="Only process the matching slug.")
+    _add_upsert_options(p_hosts)
+    _add_diagnostic_options(p_hosts)
     p_hosts.set_defaults(func=cmd_hosts)
 
     p_colls = sub.add_parser(
@@ -195,6 +908,8 @@ def build_parser() -> argparse.ArgumentParser:
         help="Alias for --file when using env-named configs (e.g., staging-collectives.yaml).",
     )
     p_colls.add_argument("--only", help="Only process the matching slug.")
+    _add_upsert_options(p_colls)
+    _add_diagnostic_options(p_colls)
     p_colls.set_defaults(func=cmd_collectives)
 
     p_projects = sub.add_parser(
@@ -209,8 +924,165 @@ def build_parser() -> argparse.ArgumentParser:
         help="Alias for --file when using env-named configs (e.g., staging-projects.yaml).",
     )
     p_projects.add_argument("--only", help="Only process the matching slug.")
+    _add_upsert_options(p_projects)
+    _add_diagnostic_options(p_projects)
     p_projects.set_defaults(func=cmd_projects)
 
+    p_expenses = sub.add_parser("expenses", help="Expense export and processing.")
+    expenses_sub = p_expenses.add_subparsers(dest="expenses_command", required=True)
+    p_exp_list = expenses_sub.add_parser(
+        "list", help="Stream all expenses of an account as NDJSON or CSV."
+    )
+    _add_common_options(p_exp_list)
+    p_exp_list.add_argument("slug", help="Account slug whose expenses to export.")
+    p_exp_list.add_argument(
+        "--status",
+        action="append",
+        type=str.upper,
+        choices=EXPENSE_STATUSES,
+        help="Only export this status (repeatable; default: all).",
+    )
+    p_exp_list.add_argument(
+        "--type", type=str.upper, choices=EXPENSE_TYPES, help="Only export this expense type."
+    )
+    p_exp_list.add_argument("--date-from", help="Only expenses created on/after (ISO 8601).")
+    p_exp_list.add_argument("--date-to", help="Only expenses created before (ISO 8601).")
+    p_exp_list.add_argument(
+        "--format", choices=["ndjson", "csv"], default="ndjson", help="Output format."
+    )
+    p_exp_list.add_argument("--out", help="Write to this file instead of stdout.")
+    p_exp_list.add_argument(
+        "--page-size", type=int, default=100, help="Expenses fetched per request (default: 100)."
+    )
+    p_exp_list.set_defaults(func=cmd_expenses_list)
+
+    p_exp_bulk = expenses_sub.add_parser(
+        "bulk", help="Create, approve and pay many expenses from CSV/JSONL."
+    )
+    _add_common_options(p_exp_bulk)
+    p_exp_bulk.add_argument("--file", required=True, help="Path to expenses CSV or JSONL.")
+    p_exp_bulk.add_argument(
+        "--journal", help="Results journal (JSONL); default: <file>.journal.jsonl. Reruns resume."
+    )
+    p_exp_bulk.add_argument(
+        "--until",
+        type=str.upper,
+        choices=["CREATE", "APPROVE", "PAY"],
+        default="PAY",
+        help="Last stage to run (default: PAY).",
+    )
+    p_exp_bulk.add_argument(
+        "--concurrency", type=int, default=4, help="Requests in flight per stage (default: 4)."
+    )
+    _add_diagnostic_options(p_exp_bulk)
+    p_exp_bulk.set_defaults(func=cmd_expenses_bulk)
+
+    p_alloc = sub.add_parser(
+        "allocate", help="Allocate host funds to projects (addFunds) from a ledger file."
+    )
+    _add_common_options(p_alloc)
+    p_alloc.add_argument(
+        "--ledger",
+        required=True,
+        help="CSV/JSONL/YAML rows with project, amount, description[, processedAt].",
+    )
+    p_alloc.add_argument("--host", required=True, help="Fiscal host slug funds are drawn from.")
+    p_alloc.add_argument("--currency", type=str.upper, default="NZD", help="Default: NZD.")
+    p_alloc.add_argument(
+        "--journal",
+        help="Results journal (JSONL); default: <ledger>.journal.jsonl. Reruns skip done lines.",
+    )
+    p_alloc.add_argument(
+        "--concurrency", type=int, default=4, help="addFunds calls in flight (default: 4)."
+    )
+    _add_diagnostic_options(p_alloc)
+    p_alloc.set_defaults(func=cmd_allocate)
+
+    p_balance = sub.add_parser(
+        "balance", help="Fetch balances for many accounts with batched (aliased) queries."
+    )
+    _add_common_options(p_balance)
+    p_balance.add_argument("slugs", nargs="*", help="Account slugs to query.")
+    p_balance.add_argument("--host", help="Also include every account hosted by this host.")
+    p_balance.add_argument(
+        "--format", choices=["table", "ndjson"], default="table", help="Output format."
+    )
+    p_balance.add_argument(
+        "--chunk-size", type=int, default=100, help="Accounts per request (default: 100)."
+    )
+    p_balance.add_argument(
+        "--concurrency", type=int, default=1, help="Chunk requests in flight (default: 1)."
+    )
+    p_balance.set_defaults(func=cmd_balance)
+
+    p_tx = sub.add_parser("transactions", help="Transaction reading and local ledger sync.")
+    tx_sub = p_tx.add_subparsers(dest="transactions_command", required=True)
+    p_tx_sync = tx_sub.add_parser(
+        "sync", help="Incrementally pull transactions into a local SQLite ledger."
+    )
+    _add_common_options(p_tx_sync)
+    p_tx_sync.add_argument("slugs", nargs="*", help="Account slugs to sync.")
+    p_tx_sync.add_argument("--host", help="Also sync every account hosted by this host.")
+    p_tx_sync.add_argument(
+        "--db", default="oc-ledger.sqlite", help="SQLite ledger path (default: oc-ledger.sqlite)."
+    )
+    p_tx_sync.add_argument(
+        "--full", action="store_true", help="Ignore stored high-water marks and re-pull history."
+    )
+    p_tx_sync.add_argument(
+        "--page-size", type=int, default=500, help="Transactions per request (default: 500)."
+    )
+    _add_diagnostic_options(p_tx_sync)
+    p_tx_sync.set_defaults(func=cmd_transactions_sync)
+
+    p_report = sub.add_parser("report", help="Reports over synced ledger or exported expenses.")
+    report_sub = p_report.add_subparsers(dest="report_command", required=True)
+    p_rollup = report_sub.add_parser(
+        "rollup", help="Per-account, per-month totals, counts and running balances."
+    )
+    p_rollup.add_argument(
+        "--db", default="oc-ledger.sqlite", help="SQLite ledger from 'transactions sync'."
+    )
+    p_rollup.add_argument(
+        "--expenses", help="Roll up an 'expenses list' export (NDJSON/CSV) by status instead."
+    )
+    p_rollup.add_argument("--account", action="append", help="Only this account (repeatable).")
+    p_rollup.add_argument("--date-from", help="Only transactions created on/after (ISO 8601).")
+    p_rollup.add_argument("--date-to", help="Only transactions created before (ISO 8601).")
+    p_rollup.add_argument("--format", choices=["csv", "json"], default="csv", help="Output format.")
+    p_rollup.add_argument("--out", help="Write to this file instead of stdout.")
+    p_rollup.set_defaults(func=cmd_report_rollup)
+
+    p_recon = sub.add_parser(
+        "reconcile", help="Match our ledger against OpenCollective transactions."
+    )
+    _add_common_options(p_recon)
+    p_recon.add_argument(
+        "--ledger",
+        required=True,
+        help="CSV/JSONL/YAML rows with account, signed amount, date, description[, id/key].",
+    )
+    p_recon.add_argument(
+        "--db", help="Read OC transactions from this synced SQLite ledger instead of the API."
+    )
+    p_recon.add_argument(
+        "--journal", help="allocate/expenses bulk journal used to resolve idempotency keys."
+    )
+    p_recon.add_argument(
+        "--window-days", type=int, default=3, help="Allowed date drift in days (default: 3)."
+    )
+    p_recon.add_argument(
+        "--kind", action="append", type=str.upper, help="Only consider this OC kind (repeatable)."
+    )
+    p_recon.add_argument(
+        "--format",
+        choices=["summary", "ndjson"],
+        default="summary",
+        help="summary: only missing/unexpected lines; ndjson: every record.",
+    )
+    _add_diagnostic_options(p_recon)
+    p_recon.set_defaults(func=cmd_reconcile)
+
     p_version = sub.add_parser("version", help="Print package version.")
     _add_common_options(p_version)
     p_version.set_defaults(func=cmd_version)
@@ -221,11 +1093,19 @@ def build_parser() -> argparse.ArgumentParser:
 def main(argv: list[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
+    metrics_file = getattr(args, "metrics_file", None)
+    args.metrics = Metrics() if metrics_file else None
+    # Started here so the budget covers loading and setup as well as requests.
+    budget = getattr(args, "deadline", None)
+    args.run_deadline = Deadline(budget) if budget is not None else None
     try:
         return args.func(args)
     except Exception as e:  # pragma: no cover - convenience for CLI use
         print(f"[error] {e}", file=sys.stderr)
         return 1
+    finally:
+        if metrics_file:
+            args.metrics.write_textfile(metrics_file)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+from .connections import PoolSettings
+from .oc_client import GraphQLError, OpenCollectiveClient
+from .queries import account_query
+from .ratelimit import RateLimiter
+from .secrets import get_oc_token
+
+# Item fields tried, in order, when routing an item to a client.
+ROUTE_FIELDS = ("host_slug", "hostSlug", "slug")
+# A project's parent is a collective: items naming one go to that collective's host.
+PARENT_FIELDS = ("parent_slug", "parentSlug")
+DEFAULT_KEY = "default"
+
+Q_ACCOUNT_HOST = account_query("AccountHost", ("slug", "host"))
+
+
+class ClientPool:
+    """Clients keyed by token ref or host slug, one per distinct token.
+
+    Every client uses the process-wide connection pool for ``pool`` and gets its
+    own ``RateLimiter(rate, burst)``, so each token spends an independent budget.
+    Keys that resolve to the same token share a client and therefore a budget.
+    ``client_kwargs`` (endpoint, timeouts, metrics, ...) go to every client.
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        pool: Optional[PoolSettings] = None,
+        **client_kwargs: Any,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.pool = pool or PoolSettings()
+        self.client_kwargs = client_kwargs
+        self._clients: Dict[str, OpenCollectiveClient] = {}
+        self._by_token: Dict[str, OpenCollectiveClient] = {}
+        self._hosts: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        key: str,
+        *,
+        token: Optional[str] = None,
+        secret_ref_env: Optional[str] = None,
+        token_env: Optional[str] = None,
+    ) -> OpenCollectiveClient:
+        """Register ``key``; its token is ``token`` or read via ``secret_ref_env``/``token_env``."""
+        if token is None:
+            if secret_ref_env is None and token_env is None:
+                raise ValueError(f"Client '{key}' needs a token, secret_ref_env or token_env.")
+            # Empty names, not the OC_SECRET_REF/OC_TOKEN defaults: a key never borrows the
+            # run's main token.
+            token = get_oc_token(secret_ref_env=secret_ref_env or "", env_override=token_env or "")
+        with self._lock:
+            client = self._by_token.get(token)
+            if client is None:
+                limiter = RateLimiter(self.rate, self.burst) if self.rate else None
+                client = OpenCollectiveClient(
+                    token=token,
+                    pool=self.pool,
+                    shared_pool=True,
+                    rate_limiter=limiter,
+                    **self.client_kwargs,
+                )
+                self._by_token[token] = client
+            self._clients[key] = client
+        return client
+
+    def client(self, key: str) -> OpenCollectiveClient:
+        try:
+            return self._clients[key]
+        except KeyError:
+            raise KeyError(f"No client registered for '{key}'.") from None
+
+    def route(self, item: Mapping[str, Any]) -> Tuple[str, OpenCollectiveClient]:
+        """The client for ``item``'s host, else ``DEFAULT_KEY``; KeyError when neither exists.
+
+        The host is the first of ``ROUTE_FIELDS`` naming a registered key, or the
+        parent named by ``PARENT_FIELDS`` (or the parent's host, see ``host_of``).
+        """
+        for name in ROUTE_FIELDS:
+            value = item.get(name)
+            if isinstance(value, str) and value in self._clients:
+                return value, self._clients[value]
+        for name in PARENT_FIELDS:
+            parent = item.get(name)
+            if isinstance(parent, str) and parent:
+                key = parent if parent in self._clients else self.host_of(parent)
+                if key in self._clients:
+                    return key, self._clients[key]
+                break
+        if DEFAULT_KEY in self._clients:
+            return DEFAULT_KEY, self._clients[DEFAULT_KEY]
+        raise KeyError(f"No client for item '{item.get('slug')}' and no '{DEFAULT_KEY}' client.")
+
+    def host_of(self, slug: str) -> Optional[str]:
+        """Slug of the host of account ``slug``, read once with any registered client."""
+        with self._lock:
+            if slug in self._hosts:
+                return self._hosts[slug]
+            client = next(iter(self._by_token.values()), None)
+        if client is None:
+            return None
+        try:
+            account = client.graphql(Q_ACCOUNT_HOST, {"slug": slug}).get("account")
+        except GraphQLError:
+            # Unknown accounts come back as errors; the item is simply left unrouted.
+            account = None
+        host = ((account or {}).get("host") or {}).get("slug")
+        with self._lock:
+            self._hosts[slug] = host
+        return host
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._clients
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._clients))
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def close(self) -> None:
+        with self._lock:
+            clients = list(self._by_token.values())
+        for client in clients:
+            client.close()
+
+    def __enter__(self) -> "ClientPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
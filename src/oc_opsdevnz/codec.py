@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Optional
+
+try:  # optional fast path
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None  # type: ignore[assignment]
+
+BACKENDS = ("orjson", "json")
+
+
+def _default(obj: Any) -> Any:
+    # Money stays exact: Decimals go out as strings, never through float.
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+@dataclass(frozen=True)
+class _Codec:
+    name: str
+    dumpb: Callable[..., bytes]
+    loads: Callable[[Any], Any]
+
+
+def _stdlib_dumpb(obj: Any, *, indent: bool = False, sort_keys: bool = False) -> bytes:
+    text = json.dumps(
+        obj,
+        default=_default,
+        ensure_ascii=False,
+        sort_keys=sort_keys,
+        indent=2 if indent else None,
+        separators=(",", ": ") if indent else (",", ":"),
+    )
+    return text.encode("utf-8")
+
+
+def _orjson_dumpb(obj: Any, *, indent: bool = False, sort_keys: bool = False) -> bytes:
+    option = orjson.OPT_NON_STR_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    return orjson.dumps(obj, default=_default, option=option)
+
+
+_CODECS = {"json": _Codec("json", _stdlib_dumpb, json.loads)}
+if orjson is not None:
+    _CODECS["orjson"] = _Codec("orjson", _orjson_dumpb, orjson.loads)
+
+
+def use_backend(name: Optional[str] = None) -> str:
+    """Select the JSON backend (``orjson`` when installed, else ``json``); returns its name.
+
+    ``OC_JSON_CODEC=json`` forces the stdlib at import time.
+    """
+    global _codec
+    if name is None:
+        name = "orjson" if "orjson" in _CODECS else "json"
+    if name not in _CODECS:
+        raise ValueError(f"JSON backend '{name}' is not available (have: {', '.join(_CODECS)}).")
+    _codec = _CODECS[name]
+    return name
+
+
+_codec: _Codec
+use_backend(os.getenv("OC_JSON_CODEC") if os.getenv("OC_JSON_CODEC") in _CODECS else None)
+
+
+def backend() -> str:
+    return _codec.name
+
+
+def dumpb(obj: Any, *, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """UTF-8 JSON bytes: compact by default, or two-space indented."""
+    return _codec.dumpb(obj, indent=indent, sort_keys=sort_keys)
+
+
+def dumps(obj: Any, *, indent: bool = False, sort_keys: bool = False) -> str:
+    return _codec.dumpb(obj, indent=indent, sort_keys=sort_keys).decode("utf-8")
+
+
+def loads(data: bytes | str, *, decimal: bool = False) -> Any:
+    """Parse JSON; ``decimal=True`` reads non-integer numbers as ``Decimal`` (stdlib path)."""
+    if decimal:
+        return json.loads(data, parse_float=Decimal)
+    return _codec.loads(data)
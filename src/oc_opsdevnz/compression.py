@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import gzip
+import importlib.util
+import zlib
+from typing import Optional
+
+# Request bodies below this size go out as-is; gzip framing would eat the gain.
+GZIP_MIN_BYTES = 1024
+
+
+def _importable(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def accepted_encodings() -> list[str]:
+    """Response encodings httpx can decode here (brotli/zstd only when installed)."""
+    encodings = ["gzip", "deflate"]
+    if _importable("brotli") or _importable("brotlicffi"):
+        encodings.append("br")
+    if _importable("zstandard"):
+        encodings.append("zstd")
+    return encodings
+
+
+ACCEPT_ENCODING = ", ".join(accepted_encodings())
+
+
+def compress_body(body: bytes, min_bytes: int = GZIP_MIN_BYTES) -> tuple[bytes, Optional[str]]:
+    """Gzip ``body`` when it is large enough and actually shrinks; returns (body, encoding)."""
+    if len(body) < min_bytes:
+        return body, None
+    packed = gzip.compress(body, compresslevel=6)
+    if len(packed) >= len(body):
+        return body, None
+    return packed, "gzip"
+
+
+def decompress_body(body: bytes, encoding: Optional[str]) -> bytes:
+    """Undo a ``Content-Encoding`` of gzip or deflate (what the fake server accepts)."""
+    encoding = (encoding or "identity").strip().lower()
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        return zlib.decompress(body)
+    if encoding == "identity":
+        return body
+    raise ValueError(f"Unsupported Content-Encoding: {encoding}")
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Iterator, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+Outcome = Tuple[T, Optional[R], Optional[BaseException]]
+
+
+def run_bounded(
+    fn: Callable[[T], R], items: Iterable[T], *, max_workers: int = 4
+) -> Iterator[Outcome]:
+    """Run ``fn`` over ``items`` with at most ``max_workers`` calls in flight.
+
+    Yields ``(item, result, error)`` in completion order on the calling thread,
+    so callers can write journals/output without extra locking. Items are
+    submitted lazily; at most ``2 * max_workers`` are queued at once.
+    """
+    if max_workers <= 1:
+        for item in items:
+            try:
+                yield item, fn(item), None
+            except Exception as e:
+                yield item, None, e
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending: dict[Future, T] = {}
+
+        def _drain(block_until: int) -> Iterator[Outcome]:
+            while len(pending) > block_until:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    item = pending.pop(fut)
+                    err = fut.exception()
+                    yield item, (None if err else fut.result()), err
+
+        for item in items:
+            yield from _drain(2 * max_workers - 1)
+            pending[pool.submit(fn, item)] = item
+        yield from _drain(0)
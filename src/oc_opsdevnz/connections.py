@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import atexit
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import httpx
+from httpx._utils import get_environment_proxies
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """Connection pool shape for the transports behind ``OpenCollectiveClient``.
+
+    ``max_connections`` caps open sockets per pool (extra requests wait for a
+    free connection). With ``http2`` concurrent workers multiplex streams over
+    one connection per origin instead of opening a socket each.
+    """
+
+    http2: bool = False
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+def http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def build_transport(
+    settings: Optional[PoolSettings] = None, proxy: Optional[str] = None
+) -> httpx.HTTPTransport:
+    settings = settings or PoolSettings()
+    if settings.http2 and not http2_available():
+        raise RuntimeError("HTTP/2 needs h2; install with `pip install oc-opsdevnz[http2]`.")
+    return httpx.HTTPTransport(http2=settings.http2, limits=settings.limits(), proxy=proxy)
+
+
+_shared: Dict[Tuple[PoolSettings, Optional[str]], httpx.HTTPTransport] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_transport(
+    settings: Optional[PoolSettings] = None, proxy: Optional[str] = None
+) -> httpx.HTTPTransport:
+    """The process-wide transport (connection pool) for ``settings``, created once.
+
+    Tokens and idempotency keys travel as per-request headers and each client
+    keeps its own cookie jar, so clients for different tokens or environments
+    can share one pool and reuse its warm TLS connections.
+    """
+    settings = settings or PoolSettings()
+    with _shared_lock:
+        transport = _shared.get((settings, proxy))
+        if transport is None:
+            transport = _shared[(settings, proxy)] = build_transport(settings, proxy)
+        return transport
+
+
+def proxy_mounts(
+    settings: Optional[PoolSettings] = None, shared: bool = False
+) -> Dict[str, Optional[httpx.BaseTransport]]:
+    """``HTTP(S)_PROXY``/``ALL_PROXY``/``NO_PROXY`` as ``httpx.Client(mounts=...)``.
+
+    httpx only reads the proxy environment when it builds the transport itself;
+    these mounts keep proxies working with an explicit (or shared) pool.
+    """
+    make = shared_transport if shared else build_transport
+    return {
+        pattern: None if url is None else make(settings, url)
+        for pattern, url in get_environment_proxies().items()
+    }
+
+
+def close_shared_transports() -> None:
+    with _shared_lock:
+        transports = list(_shared.values())
+        _shared.clear()
+    for transport in transports:
+        transport.close()
+
+
+atexit.register(close_shared_transports)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import re
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(ms|h|m|s)?")
+_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0, None: 1.0}
+
+
+def parse_duration(text: str) -> float:
+    """Seconds in ``"90"``, ``"90s"``, ``"10m"``, ``"1h30m"`` or ``"250ms"``."""
+    spec = str(text).strip().lower()
+    pos, total = 0, 0.0
+    while pos < len(spec):
+        match = _DURATION_RE.match(spec, pos)
+        if match is None or match.end() == pos:
+            raise ValueError(f"Invalid duration: {text!r} (use e.g. 90s, 10m, 1h30m).")
+        total += float(match.group(1)) * _UNITS[match.group(2)]
+        pos = match.end()
+    if not spec:
+        raise ValueError("Empty duration.")
+    return total
+
+
+class Deadline:
+    """A monotonic point in time by which a whole run has to finish."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.at
+
+
+@dataclass(frozen=True)
+class OperationTimeouts:
+    """Timeouts for one operation class (reads or mutations).
+
+    ``connect`` and ``read`` bound each HTTP attempt; ``total`` bounds one
+    ``graphql()`` call including retries and backoff (None = attempts only).
+    """
+
+    connect: float = 20.0
+    read: float = 20.0
+    total: Optional[float] = None
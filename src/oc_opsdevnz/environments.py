@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Any
+
+from .oc_client import PROD_URL, STAGING_URL, OpenCollectiveClient
+from .secrets import get_oc_token
+
+KNOWN_ENVIRONMENTS = {"staging": STAGING_URL, "test": STAGING_URL, "prod": PROD_URL}
+
+
+@dataclass(frozen=True)
+class Environment:
+    """One target of a multi-environment run and where its endpoint and token come from.
+
+    ``OC_SECRET_REF_<NAME>`` (or ``OC_TOKEN_<NAME>``) holds the token and
+    ``OC_API_URL_<NAME>`` overrides the endpoint. Only ``prod`` may use the
+    production API; the client's prod guard rejects it for any other name.
+    """
+
+    name: str
+    api_url: str
+
+    @property
+    def secret_ref_env(self) -> str:
+        return f"OC_SECRET_REF_{self._suffix}"
+
+    @property
+    def token_env(self) -> str:
+        return f"OC_TOKEN_{self._suffix}"
+
+    @property
+    def allow_prod(self) -> bool:
+        return self.name == "prod"
+
+    @property
+    def _suffix(self) -> str:
+        return self.name.upper().replace("-", "_")
+
+
+def parse_environments(text: str) -> list[str]:
+    """``"staging,prod"`` -> ``["staging", "prod"]`` (lower-cased, duplicates dropped)."""
+    names: list[str] = []
+    for part in text.split(","):
+        name = part.strip().lower()
+        if name and name not in names:
+            names.append(name)
+    if not names:
+        raise ValueError("No environments given (e.g. staging,prod).")
+    return names
+
+
+def resolve_environment(name: str) -> Environment:
+    suffix = name.upper().replace("-", "_")
+    api_url = os.getenv(f"OC_API_URL_{suffix}") or KNOWN_ENVIRONMENTS.get(name)
+    if not api_url:
+        raise ValueError(
+            f"Unknown environment '{name}': use {', '.join(KNOWN_ENVIRONMENTS)}"
+            f" or set OC_API_URL_{suffix}."
+        )
+    return Environment(name=name, api_url=api_url.rstrip("/"))
+
+
+def client_for(env: Environment, **kwargs: Any) -> OpenCollectiveClient:
+    """A client of its own for ``env``, with the token resolved from that environment's ref."""
+    token = kwargs.pop("token", None) or get_oc_token(
+        secret_ref_env=env.secret_ref_env, env_override=env.token_env
+    )
+    kwargs.setdefault("app_name", f"oc_opsdevnz-{env.name}")
+    return OpenCollectiveClient(
+        api_url=env.api_url, token=token, allow_prod=env.allow_prod, **kwargs
+    )
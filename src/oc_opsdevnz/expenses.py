@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, TextIO
+
+from .concurrency import run_bounded
+from .journal import append_journal
+from .money import to_cents
+from .oc_client import OpenCollectiveClient
+from .operations import load_rows
+
+Q_EXPENSES = """
+query Expenses(
+  $slug: String!
+  $limit: Int!
+  $offset: Int!
+  $status: [ExpenseStatusFilter]
+  $type: ExpenseType
+  $dateFrom: DateTime
+  $dateTo: DateTime
+) {
+  expenses(
+    account: { slug: $slug }
+    limit: $limit
+    offset: $offset
+    status: $status
+    type: $type
+    dateFrom: $dateFrom
+    dateTo: $dateTo
+    orderBy: { field: CREATED_AT, direction: ASC }
+  ) {
+    totalCount
+    nodes {
+      id
+      legacyId
+      status
+      type
+      description
+      amount { valueInCents currency }
+      account { slug }
+      payee { slug name }
+      createdAt
+    }
+  }
+}
+"""
+
+EXPENSE_STATUSES = ("DRAFT", "PENDING", "APPROVED", "PAID", "REJECTED", "CANCELED")
+EXPENSE_TYPES = ("INVOICE", "RECEIPT", "REIMBURSEMENT", "FUNDING_REQUEST", "GRANT", "UNCLASSIFIED")
+
+EXPENSE_CSV_FIELDS = (
+    "id",
+    "legacyId",
+    "status",
+    "type",
+    "description",
+    "amountInCents",
+    "currency",
+    "accountSlug",
+    "payeeSlug",
+    "payeeName",
+    "createdAt",
+)
+
+DEFAULT_PAGE_SIZE = 100
+
+
+def iter_expenses(
+    client: OpenCollectiveClient,
+    slug: str,
+    *,
+    statuses: Optional[Sequence[str]] = None,
+    expense_type: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """Yield every expense of an account, one page at a time.
+
+    Filtering happens server-side; only the current page is held in memory.
+    Pages are ordered by creation date so expenses created mid-export land on
+    later pages instead of shifting earlier offsets.
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be a positive integer.")
+
+    variables: Dict[str, Any] = {
+        "slug": slug,
+        "limit": page_size,
+        "status": [s.upper() for s in statuses] if statuses else None,
+        "type": expense_type.upper() if expense_type else None,
+        "dateFrom": date_from,
+        "dateTo": date_to,
+    }
+    offset = 0
+    while True:
+        data = client.graphql(Q_EXPENSES, {**variables, "offset": offset})
+        page = data.get("expenses") or {}
+        nodes = page.get("nodes") or []
+        yield from nodes
+        offset += len(nodes)
+        total = page.get("totalCount")
+        if len(nodes) < page_size or (total is not None and offset >= total):
+            return
+
+
+def flatten_expense(node: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten an expense node into the flat row shape used for CSV exports."""
+    amount = node.get("amount") or {}
+    payee = node.get("payee") or {}
+    account = node.get("account") or {}
+    return {
+        "id": node.get("id"),
+        "legacyId": node.get("legacyId"),
+        "status": node.get("status"),
+        "type": node.get("type"),
+        "description": node.get("description"),
+        "amountInCents": amount.get("valueInCents"),
+        "currency": amount.get("currency"),
+        "accountSlug": account.get("slug"),
+        "payeeSlug": payee.get("slug"),
+        "payeeName": payee.get("name"),
+        "createdAt": node.get("createdAt"),
+    }
+
+
+MUTATION_CREATE_EXPENSE = """
+mutation CreateExpense($input: ExpenseCreateInput!) {
+  createExpense(expense: $input) {
+    expense { id legacyId status amount { valueInCents currency } }
+  }
+}
+"""
+
+MUTATION_PROCESS_EXPENSE = """
+mutation ProcessExpense($id: String!, $action: ExpenseProcessAction!) {
+  processExpense(expense: { id: $id }, action: $action) {
+    expense { id legacyId status }
+  }
+}
+"""
+
+PIPELINE_STAGES = ("CREATE", "APPROVE", "PAY")
+
+
+@dataclass
+class ExpenseJob:
+    """One row of a bulk expense file and its progress through the pipeline."""
+
+    key: str
+    row: Dict[str, Any]
+    expense_input: Dict[str, Any]
+    expense_id: Optional[str] = None
+    legacy_id: Optional[int] = None
+    status: Optional[str] = None
+    completed: list[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def load_expense_rows(path: Path) -> list[Dict[str, Any]]:
+    """Load bulk expense rows from CSV (one item per row), JSONL or a YAML/JSON array."""
+    return load_rows(path)
+
+
+def _row_get(row: Dict[str, Any], *keys: str) -> Any:
+    for k in keys:
+        if row.get(k) not in (None, ""):
+            return row[k]
+    return None
+
+
+def build_expense_input(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Translate a bulk row into an ``ExpenseCreateInput``; raises ValueError when incomplete."""
+    account = _row_get(row, "account", "account_slug", "accountSlug")
+    payee = _row_get(row, "payee", "payee_slug", "payeeSlug")
+    description = _row_get(row, "description")
+    if not (account and payee and description):
+        raise ValueError("Expense rows require account, payee and description.")
+
+    items = row.get("items")
+    if not items:
+        if _row_get(row, "amount") is None:
+            raise ValueError("Expense rows require an amount (or an items list).")
+        items = [
+            {
+                "description": _row_get(row, "item_description", "itemDescription") or description,
+                "amount": row["amount"],
+                "incurred_at": _row_get(row, "incurred_at", "incurredAt"),
+            }
+        ]
+
+    expense_items = []
+    for it in items:
+        expense_item: Dict[str, Any] = {
+            "description": it.get("description") or description,
+            "amount": {"valueInCents": to_cents(it["amount"])},
+        }
+        incurred_at = it.get("incurred_at") or it.get("incurredAt")
+        if incurred_at:
+            expense_item["incurredAt"] = incurred_at
+        expense_items.append(expense_item)
+
+    payout_method = _row_get(row, "payout_method", "payoutMethod")
+    return {
+        "type": str(_row_get(row, "type") or "INVOICE").upper(),
+        "account": {"slug": account},
+        "payee": {"slug": payee},
+        "currency": str(_row_get(row, "currency") or "NZD").upper(),
+        "description": description,
+        "items": expense_items,
+        "payoutMethod": {"type": str(payout_method or "ACCOUNT_BALANCE").upper()},
+    }
+
+
+def expense_idempotency_key(expense_input: Dict[str, Any], reference: Optional[str] = None) -> str:
+    """Deterministic key for an expense: same input (and reference) -> same key on every run.
+
+    Rows that are otherwise identical (e.g. two equal volunteer reimbursements)
+    must carry distinct ``reference`` values to be treated as separate expenses.
+    """
+    canonical = json.dumps(
+        {"input": expense_input, "reference": reference}, sort_keys=True, separators=(",", ":")
+    )
+    return "oc-opsdevnz-expense-" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+def plan_expense_jobs(rows: Iterable[Dict[str, Any]]) -> list[ExpenseJob]:
+    """Validate every row up front so a bad row fails before any mutation is sent."""
+    jobs = []
+    seen: Dict[str, int] = {}
+    for n, row in enumerate(rows, start=1):
+        try:
+            expense_input = build_expense_input(row)
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Row {n}: {e}") from e
+        reference = _row_get(row, "reference", "idempotency_key", "idempotencyKey")
+        key = expense_idempotency_key(expense_input, str(reference) if reference else None)
+        if key in seen:
+            raise ValueError(
+                f"Row {n} duplicates row {seen[key]}; add a distinct 'reference' to keep both."
+            )
+        seen[key] = n
+        jobs.append(ExpenseJob(key=key, row=row, expense_input=expense_input))
+    return jobs
+
+
+def _resume_jobs(jobs: Sequence[ExpenseJob], journal_state: Dict[str, Dict[str, Any]]) -> None:
+    for job in jobs:
+        prior = journal_state.get(job.key)
+        if not prior:
+            continue
+        job.completed = list(prior["completed"])
+        job.expense_id = prior.get("id")
+        job.legacy_id = prior.get("legacyId")
+        job.status = prior.get("status")
+
+
+def _create(client: OpenCollectiveClient, job: ExpenseJob) -> Dict[str, Any]:
+    data = client.graphql(
+        MUTATION_CREATE_EXPENSE, {"input": job.expense_input}, idempotency_key=job.key
+    )
+    return data["createExpense"]["expense"]
+
+
+def _process(client: OpenCollectiveClient, job: ExpenseJob, action: str) -> Dict[str, Any]:
+    data = client.graphql(
+        MUTATION_PROCESS_EXPENSE,
+        {"id": job.expense_id, "action": action},
+        idempotency_key=f"{job.key}-{action.lower()}",
+    )
+    return data["processExpense"]["expense"]
+
+
+def run_expense_pipeline(
+    client: OpenCollectiveClient,
+    jobs: Sequence[ExpenseJob],
+    *,
+    until: str = "PAY",
+    concurrency: int = 4,
+    journal: Optional[TextIO] = None,
+    journal_state: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> list[ExpenseJob]:
+    """Create, approve and pay expenses as separate bounded-concurrency waves.
+
+    Each wave only starts once the previous one has finished, and only jobs that
+    completed the previous stage move on. Every stage outcome is appended to
+    ``journal`` (JSONL) as it completes; passing a previously written journal's
+    state via ``journal_state`` skips stages that already succeeded.
+    """
+    until = until.upper()
+    if until not in PIPELINE_STAGES:
+        raise ValueError(f"until must be one of {', '.join(PIPELINE_STAGES)}.")
+    stages = PIPELINE_STAGES[: PIPELINE_STAGES.index(until) + 1]
+    if journal_state:
+        _resume_jobs(jobs, journal_state)
+
+    def _run_stage(stage: str, job: ExpenseJob) -> Dict[str, Any]:
+        if stage == "CREATE":
+            return _create(client, job)
+        return _process(client, job, stage)
+
+    for i, stage in enumerate(stages):
+        previous = stages[i - 1] if i else None
+        wave = [
+            job
+            for job in jobs
+            if job.error is None
+            and stage not in job.completed
+            and (previous is None or previous in job.completed)
+        ]
+        outcomes = run_bounded(
+            lambda job, stage=stage: _run_stage(stage, job), wave, max_workers=concurrency
+        )
+        for job, expense, err in outcomes:
+            record: Dict[str, Any] = {"key": job.key, "stage": stage, "ok": err is None}
+            if err is not None:
+                job.error = f"{stage}: {err}"
+                record["error"] = str(err)
+            else:
+                job.completed.append(stage)
+                if expense.get("id") is not None:
+                    job.expense_id = expense["id"]
+                if expense.get("legacyId") is not None:
+                    job.legacy_id = expense["legacyId"]
+                job.status = expense.get("status")
+                record.update(
+                    {"id": job.expense_id, "legacyId": job.legacy_id, "status": job.status}
+                )
+            if journal is not None:
+                append_journal(journal, record)
+    return list(jobs)
@@ -0,0 +1,795 @@
+"""In-memory stand-in for the OpenCollective GraphQL API, for integration and load tests.
+
+Implements the operations this package sends (``account``, ``expenses``,
+``transactions``, ``createOrganization``, ``createCollective``,
+``createProject``, ``editAccount``, ``applyToHost``, ``addFunds``,
+``createExpense``, ``processExpense``) over in-memory state, honours
+``Idempotency-Key``, gzip bodies and automatic persisted queries, and can
+inject latency, jitter, 5xx/429 responses and per-token rate limits. Use it
+in-process via ``FakeTransport`` or over HTTP via ``serve()`` /
+``python -m oc_opsdevnz.fake_oc``.
+
+It models what the CLI relies on, not OpenCollective's business rules:
+hosting applications are approved immediately and ``addFunds`` draws on the
+host's balance.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from collections import Counter, deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, Iterator, Mapping, Optional
+
+import httpx
+
+from . import codec
+from .compression import GZIP_MIN_BYTES, decompress_body
+from .gql import Document, Field, FragmentSpread, InlineFragment, Selection, parse, resolve_value
+from .money import host_fee_cents
+
+JSON_HEADERS = {"content-type": "application/json"}
+
+
+@dataclass
+class Faults:
+    """Latency and failure injection, applied before a request is executed."""
+
+    latency: float = 0.0  # seconds added to every request
+    jitter: float = 0.0  # +/- uniform seconds around ``latency``
+    error_rate: float = 0.0  # fraction of requests answered with ``error_status``
+    error_status: int = 502
+    throttle_rate: float = 0.0  # fraction of requests answered 429 at random
+    rate_limit: Optional[int] = None  # max requests per ``rate_window`` per token
+    rate_window: float = 1.0
+    retry_after: float = 1.0
+    seed: Optional[int] = None
+
+
+class FakeError(Exception):
+    """Becomes a GraphQL ``errors`` entry for the field being resolved."""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds").replace("+00:00", "Z")
+
+
+def _cents(amount: Optional[Mapping[str, Any]]) -> int:
+    amount = amount or {}
+    if amount.get("valueInCents") is not None:
+        return int(amount["valueInCents"])
+    if amount.get("value") is not None:
+        return int(round(float(amount["value"]) * 100))
+    raise FakeError("Amount requires valueInCents or value.")
+
+
+def _page(items: list, limit: Optional[int], offset: Optional[int]) -> Dict[str, Any]:
+    limit = 100 if limit is None else int(limit)
+    offset = int(offset or 0)
+    return {
+        "totalCount": len(items),
+        "limit": limit,
+        "offset": offset,
+        "nodes": items[offset : offset + limit],
+    }
+
+
+def _in_range(created_at: str, date_from: Optional[str], date_to: Optional[str]) -> bool:
+    return (not date_from or created_at >= date_from) and (not date_to or created_at < date_to)
+
+
+class FakeOpenCollective:
+    """Stateful fake API. Thread-safe: requests execute one at a time under a lock."""
+
+    def __init__(self, *, faults: Optional[Faults] = None, persisted_queries: bool = True):
+        self.faults = faults or Faults()
+        self.persisted_queries = persisted_queries
+        self._rng = random.Random(self.faults.seed)
+        self._lock = threading.RLock()
+        self.accounts: Dict[str, Dict[str, Any]] = {}
+        self.expenses: list[Dict[str, Any]] = []
+        self.transactions: list[Dict[str, Any]] = []
+        self.operations: Counter = Counter()  # executed documents by operation name
+        self.responses: Counter = Counter()  # HTTP status -> count
+        self.tokens: Counter = Counter()  # requests by auth token
+        self._ids: Dict[str, str] = {}  # account id -> slug
+        self._idempotent: Dict[str, bytes] = {}
+        self._persisted: Dict[str, str] = {}  # sha256 -> document (automatic persisted queries)
+        self._window: Dict[str, Deque[float]] = {}
+        self._seq = 0
+        self._queries: Dict[str, Callable[..., Any]] = {
+            "account": self._q_account,
+            "expenses": self._q_expenses,
+            "transactions": self._q_transactions,
+        }
+        self._mutations: Dict[str, Callable[..., Any]] = {
+            "createOrganization": self._m_create_organization,
+            "createCollective": self._m_create_collective,
+            "createProject": self._m_create_project,
+            "editAccount": self._m_edit_account,
+            "applyToHost": self._m_apply_to_host,
+            "addFunds": self._m_add_funds,
+            "createExpense": self._m_create_expense,
+            "processExpense": self._m_process_expense,
+        }
+
+    # -- state ------------------------------------------------------------
+
+    def _next(self, prefix: str) -> tuple[str, int]:
+        self._seq += 1
+        return f"{prefix}-{self._seq:08d}", self._seq
+
+    def add_account(
+        self,
+        slug: str,
+        *,
+        type: str = "COLLECTIVE",
+        name: Optional[str] = None,
+        is_host: bool = False,
+        host: Optional[str] = None,
+        parent: Optional[str] = None,
+        currency: str = "NZD",
+        balance: int = 0,
+        **fields: Any,
+    ) -> Dict[str, Any]:
+        """Seed (or create) an account; ``balance`` is in cents."""
+        with self._lock:
+            if slug in self.accounts:
+                raise FakeError(f"An account already exists for slug {slug}.")
+            acc_id, legacy_id = self._next("acc")
+            record = {
+                "id": acc_id,
+                "legacyId": legacy_id,
+                "slug": slug,
+                "name": name or slug,
+                "type": type,
+                "isHost": is_host,
+                "description": fields.get("description") or "",
+                "longDescription": fields.get("longDescription"),
+                "tags": list(fields.get("tags") or []),
+                "socialLinks": list(fields.get("socialLinks") or []),
+                "website": fields.get("website"),
+                "currency": currency,
+                "host": host,
+                "parent": parent,
+                "balance": int(balance),
+                "createdAt": _now(),
+            }
+            if record["website"] and not record["socialLinks"]:
+                record["socialLinks"] = [{"type": "WEBSITE", "url": record["website"]}]
+            self.accounts[slug] = record
+            self._ids[acc_id] = slug
+            return record
+
+    def add_host(self, slug: str, *, balance: int = 0, currency: str = "NZD", **fields: Any):
+        return self.add_account(
+            slug, type="ORGANIZATION", is_host=True, balance=balance, currency=currency, **fields
+        )
+
+    def balance(self, slug: str) -> int:
+        return self.accounts[slug]["balance"]
+
+    def _ref(self, ref: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+        ref = ref or {}
+        slug = ref.get("slug") or self._ids.get(str(ref.get("id")))
+        if slug is None and ref.get("legacyId") is not None:
+            slug = next(
+                (s for s, a in self.accounts.items() if a["legacyId"] == ref["legacyId"]), None
+            )
+        if slug not in self.accounts:
+            raise FakeError(f"Account Not Found: {json.dumps(dict(ref), sort_keys=True)}")
+        return self.accounts[slug]
+
+    def _host_of(self, record: Dict[str, Any]) -> Optional[str]:
+        if record.get("parent"):
+            return self._host_of(self.accounts[record["parent"]])
+        return record.get("host")
+
+    # -- views ------------------------------------------------------------
+
+    def _account_view(self, record: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if record is None:
+            return None
+        typename = "Host" if record["isHost"] else str(record["type"]).title().replace("_", "")
+        types = {"Account", typename}
+        if record["type"] in ("COLLECTIVE", "PROJECT", "EVENT", "FUND"):
+            types.add("AccountWithHost")
+        if record["type"] in ("PROJECT", "EVENT"):
+            types.add("AccountWithParent")
+        if record["isHost"]:
+            types.add("Organization")
+        host = self._host_of(record)
+
+        def hosted(limit: Optional[int] = 100, offset: Optional[int] = 0, **_: Any):
+            nodes = [
+                self._account_view(a)
+                for a in self.accounts.values()
+                if a is not record and self._host_of(a) == record["slug"]
+            ]
+            return _page(nodes, limit, offset)
+
+        return {
+            **{k: v for k, v in record.items() if k not in ("host", "parent", "balance")},
+            "__typename": typename,
+            "__types": types,
+            "host": lambda **_: self._account_view(self.accounts.get(host)) if host else None,
+            "parent": lambda **_: self._account_view(self.accounts.get(record["parent"] or "")),
+            "stats": {
+                "balance": {"valueInCents": record["balance"], "currency": record["currency"]}
+            },
+            "hostedAccounts": hosted if record["isHost"] else None,
+        }
+
+    def _expense_view(self, expense: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            **expense,
+            "__typename": "Expense",
+            "amount": {"valueInCents": expense["amount"], "currency": expense["currency"]},
+            "account": lambda **_: self._account_view(self.accounts[expense["account"]]),
+            "payee": lambda **_: self._account_view(self.accounts[expense["payee"]]),
+        }
+
+    def _transaction_view(self, tx: Dict[str, Any]) -> Dict[str, Any]:
+        money = {"valueInCents": tx["amount"], "currency": tx["currency"]}
+        return {
+            **tx,
+            "__typename": tx["type"].title(),
+            "__types": {"Transaction", tx["type"].title()},
+            "amount": money,
+            "netAmount": money,
+            "account": lambda **_: self._account_view(self.accounts[tx["account"]]),
+            "oppositeAccount": lambda **_: self._account_view(
+                self.accounts.get(tx["oppositeAccount"] or "")
+            ),
+        }
+
+    # -- execution --------------------------------------------------------
+
+    def execute(
+        self,
+        query: str,
+        variables: Optional[Dict[str, Any]] = None,
+        operation_name: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Run a GraphQL document against the state and return the response body."""
+        try:
+            doc = parse(query)
+            op = doc.operation(operation_name)
+        except ValueError as e:
+            return {"errors": [{"message": str(e)}]}
+        values = {name: d.default for name, d in op.variables.items()}
+        values.update(variables or {})
+        roots = self._mutations if op.kind == "mutation" else self._queries
+        root_type = "Mutation" if op.kind == "mutation" else "Query"
+
+        data: Dict[str, Any] = {}
+        errors: list[Dict[str, Any]] = []
+        with self._lock:
+            self.operations[op.name or "anonymous"] += 1
+            for f in self._root_fields(op.selections, doc):
+                key = f.response_key
+                if f.name == "__typename":
+                    data[key] = root_type
+                    continue
+                resolver = roots.get(f.name)
+                if resolver is None:
+                    message = f'Cannot query field "{f.name}" on type "{root_type}".'
+                    return {"errors": [{"message": message}]}
+                try:
+                    value = resolver(**resolve_value(f.arguments, values))
+                    data[key] = self._complete(value, f.selections, doc, values)
+                except FakeError as e:
+                    errors.append({"message": str(e), "path": [key]})
+                    data[key] = None
+        body: Dict[str, Any] = {"data": data}
+        if errors:
+            body["errors"] = errors
+        return body
+
+    def _root_fields(self, selections: list[Selection], doc: Document) -> Iterator[Field]:
+        for sel in selections:
+            if isinstance(sel, Field):
+                yield sel
+            elif isinstance(sel, InlineFragment):
+                yield from self._root_fields(sel.selections, doc)
+            else:
+                yield from self._root_fields(doc.fragments[sel.name].selections, doc)
+
+    def _complete(self, value: Any, selections: list[Selection], doc: Document, variables) -> Any:
+        if value is None or not selections:
+            return value
+        if isinstance(value, list):
+            return [self._complete(v, selections, doc, variables) for v in value]
+        return self._project(value, selections, doc, variables)
+
+    def _project(
+        self, obj: Dict[str, Any], selections: list[Selection], doc: Document, variables
+    ) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        for sel in selections:
+            if isinstance(sel, Field):
+                if sel.name == "__typename":
+                    out[sel.response_key] = obj.get("__typename")
+                    continue
+                value = obj.get(sel.name)
+                if callable(value):
+                    value = value(**resolve_value(sel.arguments, variables))
+                _merge(out, sel.response_key, self._complete(value, sel.selections, doc, variables))
+                continue
+            if isinstance(sel, FragmentSpread):
+                frag = doc.fragments.get(sel.name)
+                if frag is None:
+                    raise FakeError(f'Unknown fragment "{sel.name}".')
+                condition, inner = frag.type_condition, frag.selections
+            else:
+                condition, inner = sel.type_condition, sel.selections
+            if condition is None or condition in obj.get("__types", {obj.get("__typename")}):
+                for key, value in self._project(obj, inner, doc, variables).items():
+                    _merge(out, key, value)
+        return out
+
+    # -- queries ----------------------------------------------------------
+
+    def _q_account(self, slug: Optional[str] = None, id: Optional[str] = None, **_: Any):
+        found = self.accounts.get(slug) if slug else self.accounts.get(self._ids.get(id or ""))
+        if found is None:
+            raise FakeError(f"No account found with slug {slug or id}")
+        return self._account_view(found)
+
+    def _q_expenses(
+        self,
+        account: Optional[Mapping[str, Any]] = None,
+        limit: Optional[int] = 100,
+        offset: Optional[int] = 0,
+        status: Optional[list] = None,
+        type: Optional[str] = None,
+        dateFrom: Optional[str] = None,
+        dateTo: Optional[str] = None,
+        orderBy: Optional[Mapping[str, Any]] = None,
+        **_: Any,
+    ):
+        slug = self._ref(account)["slug"] if account else None
+        statuses = set(status or [])
+        rows = [
+            e
+            for e in self.expenses
+            if (slug is None or e["account"] == slug)
+            and (not statuses or e["status"] in statuses)
+            and (not type or e["type"] == type)
+            and _in_range(e["createdAt"], dateFrom, dateTo)
+        ]
+        if (orderBy or {}).get("direction") != "ASC":
+            rows.reverse()
+        return _page([self._expense_view(e) for e in rows], limit, offset)
+
+    def _q_transactions(
+        self,
+        account: Optional[Mapping[str, Any]] = None,
+        limit: Optional[int] = 100,
+        offset: Optional[int] = 0,
+        dateFrom: Optional[str] = None,
+        dateTo: Optional[str] = None,
+        orderBy: Optional[Mapping[str, Any]] = None,
+        kind: Optional[list] = None,
+        **_: Any,
+    ):
+        refs = account if isinstance(account, list) else [account] if account else []
+        slugs = {self._ref(r)["slug"] for r in refs}
+        kinds = set(kind or [])
+        rows = [
+            t
+            for t in self.transactions
+            if (not slugs or t["account"] in slugs)
+            and (not kinds or t["kind"] in kinds)
+            and _in_range(t["createdAt"], dateFrom, dateTo)
+        ]
+        rows.sort(key=lambda t: (t["createdAt"], t["id"]))
+        if (orderBy or {}).get("direction") != "ASC":
+            rows.reverse()
+        return _page([self._transaction_view(t) for t in rows], limit, offset)
+
+    # -- mutations --------------------------------------------------------
+
+    def _create(self, data: Mapping[str, Any], **kw: Any) -> Dict[str, Any]:
+        if not data.get("slug") or not data.get("name"):
+            raise FakeError("name and slug are required.")
+        fields = {k: data.get(k) for k in ("description", "longDescription", "tags", "website")}
+        return self.add_account(data["slug"], name=data["name"], **fields, **kw)
+
+    def _m_create_organization(self, organization: Mapping[str, Any], **_: Any):
+        return self._account_view(self._create(organization, type="ORGANIZATION"))
+
+    def _m_create_collective(
+        self, collective: Mapping[str, Any], host: Optional[Mapping[str, Any]] = None, **_: Any
+    ):
+        host_slug = self._ref(host)["slug"] if host else None
+        currency = self.accounts[host_slug]["currency"] if host_slug else "NZD"
+        record = self._create(collective, type="COLLECTIVE", host=host_slug, currency=currency)
+        return self._account_view(record)
+
+    def _m_create_project(self, project: Mapping[str, Any], parent: Mapping[str, Any], **_: Any):
+        owner = self._ref(parent)
+        record = self._create(
+            project, type="PROJECT", parent=owner["slug"], currency=owner["currency"]
+        )
+        return self._account_view(record)
+
+    def _m_edit_account(self, account: Mapping[str, Any], **_: Any):
+        record = self._ref({"id": account.get("id")} if account.get("id") else account)
+        for key in ("name", "description", "longDescription", "currency"):
+            if key in account:
+                record[key] = account[key]
+        if "tags" in account:
+            record["tags"] = list(account["tags"] or [])
+        if "socialLinks" in account:
+            record["socialLinks"] = list(account["socialLinks"] or [])
+            record["website"] = next(
+                (
+                    link.get("url")
+                    for link in record["socialLinks"]
+                    if link.get("type") == "WEBSITE"
+                ),
+                None,
+            )
+        return self._account_view(record)
+
+    def _m_apply_to_host(self, collective: Mapping[str, Any], host: Mapping[str, Any], **_: Any):
+        record, host_record = self._ref(collective), self._ref(host)
+        if not host_record["isHost"]:
+            raise FakeError(f"Account {host_record['slug']} is not a host.")
+        record["host"] = host_record["slug"]
+        return self._account_view(record)
+
+    def _record_transfer(
+        self,
+        *,
+        kind: str,
+        debit: Optional[Dict[str, Any]],
+        credit: Dict[str, Any],
+        cents: int,
+        currency: str,
+        description: str,
+        created_at: str,
+        links: Dict[str, Any],
+    ) -> None:
+        pairs = [("CREDIT", credit, debit)] + ([("DEBIT", debit, credit)] if debit else [])
+        for tx_type, account, opposite in pairs:
+            tx_id, legacy_id = self._next("tx")
+            self.transactions.append(
+                {
+                    "id": tx_id,
+                    "legacyId": legacy_id,
+                    "kind": kind,
+                    "type": tx_type,
+                    "description": description,
+                    "createdAt": created_at,
+                    "amount": cents if tx_type == "CREDIT" else -cents,
+                    "currency": currency,
+                    "account": account["slug"],
+                    "oppositeAccount": opposite["slug"] if opposite else None,
+                    "expense": None,
+                    "order": None,
+                    **links,
+                }
+            )
+
+    def _m_add_funds(
+        self,
+        fromAccount: Mapping[str, Any],
+        account: Mapping[str, Any],
+        amount: Mapping[str, Any],
+        description: str,
+        hostFeePercent: float = 0,
+        processedAt: Optional[str] = None,
+        **_: Any,
+    ):
+        source, target = self._ref(fromAccount), self._ref(account)
+        if target is not source and self._host_of(target) != source["slug"]:
+            raise FakeError(f"{target['slug']} is not hosted by {source['slug']}.")
+        currency = (amount.get("currency") or target["currency"]).upper()
+        if currency != target["currency"]:
+            raise FakeError(f"{target['slug']} is in {target['currency']}, not {currency}.")
+        cents = _cents(amount)
+        if cents <= 0:
+            raise FakeError("Amount must be positive.")
+        # The host keeps its fee, so only the net amount leaves it.
+        net = cents - host_fee_cents(cents, hostFeePercent)
+        if target is not source:
+            source["balance"] -= net
+        target["balance"] += net
+        order_id, legacy_id = self._next("order")
+        self._record_transfer(
+            kind="ADDED_FUNDS",
+            debit=source if target is not source else None,
+            credit=target,
+            cents=cents,
+            currency=currency,
+            description=description,
+            created_at=processedAt or _now(),
+            links={"order": {"id": order_id, "legacyId": legacy_id}},
+        )
+        return {
+            "__typename": "Order",
+            "id": order_id,
+            "legacyId": legacy_id,
+            "status": "PAID",
+            "description": description,
+            "amount": {"valueInCents": cents, "currency": currency},
+        }
+
+    def _find_expense(self, ref: Mapping[str, Any]) -> Dict[str, Any]:
+        for expense in self.expenses:
+            if expense["id"] == ref.get("id") or (
+                ref.get("legacyId") is not None and expense["legacyId"] == ref["legacyId"]
+            ):
+                return expense
+        raise FakeError(f"Expense not found: {json.dumps(dict(ref), sort_keys=True)}")
+
+    def _m_create_expense(self, expense: Mapping[str, Any], **_: Any):
+        account, payee = self._ref(expense.get("account")), self._ref(expense.get("payee"))
+        items = expense.get("items") or []
+        if not items:
+            raise FakeError("Expense must have at least one item.")
+        expense_id, legacy_id = self._next("expense")
+        record = {
+            "id": expense_id,
+            "legacyId": legacy_id,
+            "status": "PENDING",
+            "type": expense.get("type") or "INVOICE",
+            "description": expense.get("description") or "",
+            "amount": sum(_cents(it.get("amount")) for it in items),
+            "currency": (expense.get("currency") or account["currency"]).upper(),
+            "account": account["slug"],
+            "payee": payee["slug"],
+            "createdAt": _now(),
+        }
+        self.expenses.append(record)
+        return {"expense": self._expense_view(record)}
+
+    _TRANSITIONS = {
+        "APPROVE": ("PENDING", "APPROVED"),
+        "UNAPPROVE": ("APPROVED", "PENDING"),
+        "REJECT": ("PENDING", "REJECTED"),
+        "PAY": ("APPROVED", "PAID"),
+    }
+
+    def _m_process_expense(self, expense: Mapping[str, Any], action: str, **_: Any):
+        record = self._find_expense(expense)
+        if action not in self._TRANSITIONS:
+            raise FakeError(f"Unsupported action {action}.")
+        before, after = self._TRANSITIONS[action]
+        if record["status"] != before:
+            raise FakeError(f"Expense is {record['status']}; cannot {action}.")
+        if action == "PAY":
+            account, payee = self.accounts[record["account"]], self.accounts[record["payee"]]
+            if account["balance"] < record["amount"]:
+                raise FakeError("Collective does not have enough funds to pay this expense.")
+            account["balance"] -= record["amount"]
+            payee["balance"] += record["amount"]
+            self._record_transfer(
+                kind="EXPENSE",
+                debit=account,
+                credit=payee,
+                cents=record["amount"],
+                currency=record["currency"],
+                description=record["description"],
+                created_at=_now(),
+                links={"expense": {"id": record["id"], "legacyId": record["legacyId"]}},
+            )
+        record["status"] = after
+        return {"expense": self._expense_view(record)}
+
+    # -- transport --------------------------------------------------------
+
+    def _throttled(self, token: str) -> bool:
+        faults = self.faults
+        if faults.throttle_rate and self._rng.random() < faults.throttle_rate:
+            return True
+        if faults.rate_limit is None:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            hits = self._window.setdefault(token, deque())
+            while hits and now - hits[0] >= faults.rate_window:
+                hits.popleft()
+            if len(hits) >= faults.rate_limit:
+                return True
+            hits.append(now)
+        return False
+
+    def handle(self, body: bytes, headers: Mapping[str, str]) -> tuple[int, Dict[str, str], bytes]:
+        """Answer one HTTP request; ``headers`` must be case-insensitive (httpx/http.server)."""
+        faults = self.faults
+        delay = faults.latency + (self._rng.uniform(-1, 1) * faults.jitter if faults.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+        token = headers.get("Personal-Token") or headers.get("Authorization") or ""
+        with self._lock:
+            self.tokens[token] += 1
+        if self._throttled(token):
+            return self._respond(
+                429,
+                {"retry-after": str(math.ceil(faults.retry_after))},
+                b'{"error":"Rate limit exceeded"}',
+            )
+        if faults.error_rate and self._rng.random() < faults.error_rate:
+            return self._respond(faults.error_status, {}, b"injected failure")
+        try:
+            payload = codec.loads(decompress_body(body, headers.get("Content-Encoding")) or b"{}")
+        except (ValueError, OSError, zlib.error):
+            return self._respond(400, JSON_HEADERS, b'{"errors":[{"message":"Invalid JSON"}]}')
+
+        query, apq_error = self._persisted_query(payload)
+        if apq_error is not None:
+            return self._respond_json(codec.dumpb({"errors": [apq_error]}), headers)
+
+        key = headers.get("Idempotency-Key")
+        with self._lock:
+            if key and key in self._idempotent:
+                return self._respond_json(self._idempotent[key], headers)
+            result = self.execute(
+                query,
+                payload.get("variables"),
+                payload.get("operationName"),
+            )
+            out = codec.dumpb(result)
+            if key:
+                self._idempotent[key] = out
+        return self._respond_json(out, headers)
+
+    def _persisted_query(self, payload: Mapping[str, Any]) -> tuple[str, Optional[Dict[str, Any]]]:
+        """Resolve the document to run, Apollo APQ style; returns (query, protocol error)."""
+        query = payload.get("query") or ""
+        ext = (payload.get("extensions") or {}).get("persistedQuery")
+        if not ext:
+            return query, None
+        if not self.persisted_queries:
+            return query, _apq_error("PersistedQueryNotSupported", "PERSISTED_QUERY_NOT_SUPPORTED")
+        digest = ext.get("sha256Hash") or ""
+        if query:
+            if hashlib.sha256(query.encode("utf-8")).hexdigest() != digest:
+                return query, _apq_error("provided sha does not match query", "BAD_USER_INPUT")
+            with self._lock:
+                self._persisted[digest] = query
+            return query, None
+        with self._lock:
+            known = self._persisted.get(digest)
+        if known is None:
+            return "", _apq_error("PersistedQueryNotFound", "PERSISTED_QUERY_NOT_FOUND")
+        return known, None
+
+    def _respond_json(
+        self, out: bytes, request_headers: Mapping[str, str]
+    ) -> tuple[int, Dict[str, str], bytes]:
+        # Gzip larger bodies when the client accepts it, like a real CDN/proxy would.
+        accept = request_headers.get("Accept-Encoding") or ""
+        if "gzip" in accept and len(out) >= GZIP_MIN_BYTES:
+            headers = {**JSON_HEADERS, "content-encoding": "gzip"}
+            return self._respond(200, headers, gzip.compress(out, compresslevel=6))
+        return self._respond(200, JSON_HEADERS, out)
+
+    def _respond(
+        self, status: int, headers: Dict[str, str], body: bytes
+    ) -> tuple[int, Dict[str, str], bytes]:
+        with self._lock:
+            self.responses[status] += 1
+        return status, headers, body
+
+
+def _apq_error(message: str, code: str) -> Dict[str, Any]:
+    return {"message": message, "extensions": {"code": code}}
+
+
+def _merge(out: Dict[str, Any], key: str, value: Any) -> None:
+    """Merge a projected field into ``out`` (fragments may select the same object twice)."""
+    current = out.get(key)
+    if isinstance(current, dict) and isinstance(value, dict):
+        for k, v in value.items():
+            _merge(current, k, v)
+    else:
+        out[key] = value
+
+
+class FakeTransport(httpx.BaseTransport):
+    """Route an ``httpx.Client`` (or ``OpenCollectiveClient(transport=...)``) to a fake."""
+
+    def __init__(self, fake: FakeOpenCollective):
+        self.fake = fake
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        status, headers, body = self.fake.handle(request.read(), request.headers)
+        # An unread stream, as from the network, so the client decodes it and counts wire bytes.
+        return httpx.Response(
+            status, headers=headers, stream=httpx.ByteStream(body), request=request
+        )
+
+
+def _handler_for(fake: FakeOpenCollective) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; without this, delayed ACKs add ~40ms.
+        disable_nagle_algorithm = True
+
+        def do_POST(self) -> None:
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            status, headers, out = fake.handle(body, self.headers)
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(out)))
+            self.end_headers()
+            self.wfile.write(out)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return Handler
+
+
+@contextmanager
+def serve(fake: FakeOpenCollective, host: str = "127.0.0.1", port: int = 0) -> Iterator[str]:
+    """Serve ``fake`` over HTTP on a background thread; yields the GraphQL URL."""
+    server = ThreadingHTTPServer((host, port), _handler_for(fake))
+    server.daemon_threads = True
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, name="fake-oc", daemon=True
+    )
+    thread.start()
+    try:
+        yield f"http://{host}:{server.server_address[1]}/graphql/v2"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(
+        prog="python -m oc_opsdevnz.fake_oc", description="Run a local fake OpenCollective API."
+    )
+    ap.add_argument("--bind", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--host", action="append", default=[], help="Seed a fiscal host (repeatable).")
+    ap.add_argument("--host-balance", type=int, default=0, help="Seeded host balance in cents.")
+    ap.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request.")
+    ap.add_argument("--jitter", type=float, default=0.0, help="+/- seconds around --latency.")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="Fraction answered with 502.")
+    ap.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction answered 429.")
+    ap.add_argument("--rate-limit", type=int, help="Max requests per second per token.")
+    ap.add_argument("--seed", type=int, help="Seed for jitter and fault injection.")
+    args = ap.parse_args(argv)
+
+    fake = FakeOpenCollective(
+        faults=Faults(
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate,
+            rate_limit=args.rate_limit,
+            seed=args.seed,
+        )
+    )
+    for slug in args.host:
+        fake.add_host(slug, balance=args.host_balance)
+    with serve(fake, args.bind, args.port) as url:
+        print(f"fake OpenCollective API at {url} (Ctrl-C to stop)", flush=True)
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
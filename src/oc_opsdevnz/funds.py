@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Optional, Sequence, TextIO
+
+from .balances import Balance, fetch_balances
+from .concurrency import run_bounded
+from .journal import append_journal
+from .money import host_fee_cents, to_cents, to_decimal
+from .oc_client import OpenCollectiveClient
+
+MUTATION_ADD_FUNDS = """
+mutation AddFunds(
+  $from: AccountReferenceInput!
+  $to: AccountReferenceInput!
+  $amount: AmountInput!
+  $description: String!
+  $hostFeePercent: Float!
+  $processedAt: DateTime
+) {
+  addFunds(
+    fromAccount: $from
+    account: $to
+    amount: $amount
+    description: $description
+    hostFeePercent: $hostFeePercent
+    processedAt: $processedAt
+  ) {
+    id
+    status
+    amount { valueInCents currency }
+  }
+}
+"""
+
+
+@dataclass
+class Allocation:
+    """One ledger line: move ``amount`` from the host to ``project``."""
+
+    project: str
+    amount: Decimal
+    description: str
+    processed_at: Optional[str] = None
+    host_fee_percent: float = 0.0
+    key: str = ""
+    transaction_id: Optional[str] = None
+    status: Optional[str] = None
+    done: bool = False
+    error: Optional[str] = None
+
+    @property
+    def cents(self) -> int:
+        return to_cents(self.amount)
+
+    @property
+    def net_cents(self) -> int:
+        """What reaches the project once the host has kept ``host_fee_percent``."""
+        return self.cents - host_fee_cents(self.cents, self.host_fee_percent)
+
+
+@dataclass
+class AllocationReport:
+    host: str
+    currency: str
+    allocations: list[Allocation]
+    before: Dict[str, Balance] = field(default_factory=dict)
+    after: Dict[str, Balance] = field(default_factory=dict)
+    mismatches: list[str] = field(default_factory=list)
+
+    @property
+    def failed(self) -> list[Allocation]:
+        return [a for a in self.allocations if a.error is not None]
+
+
+def allocation_idempotency_key(host: str, currency: str, allocation: Allocation) -> str:
+    """Deterministic key: the same ledger line always maps to the same key."""
+    canonical = json.dumps(
+        {
+            "from": host,
+            "to": allocation.project,
+            "cents": allocation.cents,
+            "currency": currency,
+            "description": allocation.description,
+            "processedAt": allocation.processed_at,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return "oc-opsdevnz-addfunds-" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+def plan_allocations(
+    rows: Iterable[Dict[str, Any]], *, host: str, currency: str = "NZD"
+) -> list[Allocation]:
+    """Parse ledger rows (project, amount, description, processedAt) and assign keys.
+
+    Raises ValueError on incomplete rows, non-positive amounts or duplicate lines
+    before any request is sent.
+    """
+    allocations = []
+    seen: Dict[str, int] = {}
+    for n, row in enumerate(rows, start=1):
+        project = row.get("project") or row.get("project_slug") or row.get("projectSlug")
+        description = row.get("description")
+        if not project or not description or row.get("amount") in (None, ""):
+            raise ValueError(f"Row {n}: ledger rows require project, amount and description.")
+        try:
+            amount = to_decimal(row["amount"])
+            to_cents(amount)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Row {n}: {e}") from e
+        if amount <= 0:
+            raise ValueError(f"Row {n}: amount must be positive (got {amount}).")
+        allocation = Allocation(
+            project=str(project),
+            amount=amount,
+            description=str(description),
+            processed_at=row.get("processedAt") or row.get("processed_at") or None,
+            host_fee_percent=float(row.get("hostFeePercent") or row.get("host_fee_percent") or 0),
+        )
+        allocation.key = allocation_idempotency_key(host, currency, allocation)
+        if allocation.key in seen:
+            raise ValueError(f"Row {n} duplicates row {seen[allocation.key]}.")
+        seen[allocation.key] = n
+        allocations.append(allocation)
+    return allocations
+
+
+def _check_before(
+    host: str, currency: str, pending: Sequence[Allocation], before: Dict[str, Balance]
+) -> None:
+    missing = sorted(slug for slug, bal in before.items() if not bal.found)
+    if missing:
+        raise RuntimeError(f"Accounts not found in this environment: {', '.join(missing)}.")
+    host_balance = before[host]
+    if host_balance.currency and host_balance.currency.upper() != currency:
+        raise RuntimeError(f"Host '{host}' holds {host_balance.currency}, ledger is in {currency}.")
+    # Self-referencing lines (host -> host) seed the host rather than draw on it.
+    needed = sum(a.cents for a in pending if a.project != host)
+    available = host_balance.value_in_cents or 0
+    if needed > available:
+        raise RuntimeError(
+            f"Ledger needs {needed / 100:,.2f} {currency} but host '{host}'"
+            f" only holds {available / 100:,.2f}."
+        )
+
+
+def allocate_funds(
+    client: OpenCollectiveClient,
+    allocations: Sequence[Allocation],
+    *,
+    host: str,
+    currency: str = "NZD",
+    concurrency: int = 4,
+    journal: Optional[TextIO] = None,
+    journal_state: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> AllocationReport:
+    """Run ``addFunds`` for every pending allocation and verify balances afterwards.
+
+    Balances for the host and every project are read with one batched query
+    before (to validate accounts and the host total) and one after (to verify
+    each project moved by exactly what this run allocated, less host fees). Lines already
+    recorded as done in ``journal_state`` are skipped, so reruns are safe.
+    """
+    currency = currency.upper()
+    for allocation in allocations:
+        prior = (journal_state or {}).get(allocation.key)
+        if prior and "ADD_FUNDS" in prior["completed"]:
+            allocation.done = True
+            allocation.transaction_id = prior.get("id")
+            allocation.status = prior.get("status")
+    pending = [a for a in allocations if not a.done]
+
+    slugs = [host, *(a.project for a in allocations)]
+    report = AllocationReport(host=host, currency=currency, allocations=list(allocations))
+    report.before = fetch_balances(client, slugs)
+    _check_before(host, currency, pending, report.before)
+
+    def _add_funds(allocation: Allocation) -> Dict[str, Any]:
+        variables = {
+            "from": {"slug": host},
+            "to": {"slug": allocation.project},
+            "amount": {"valueInCents": allocation.cents, "currency": currency},
+            "description": allocation.description,
+            "hostFeePercent": allocation.host_fee_percent,
+            "processedAt": allocation.processed_at,
+        }
+        data = client.graphql(MUTATION_ADD_FUNDS, variables, idempotency_key=allocation.key)
+        return data["addFunds"]
+
+    for allocation, tx, err in run_bounded(_add_funds, pending, max_workers=concurrency):
+        record: Dict[str, Any] = {"key": allocation.key, "stage": "ADD_FUNDS", "ok": err is None}
+        if err is not None:
+            allocation.error = str(err)
+            record["error"] = str(err)
+        else:
+            allocation.done = True
+            allocation.transaction_id = tx.get("id")
+            allocation.status = tx.get("status")
+            record.update({"id": allocation.transaction_id, "status": allocation.status})
+        if journal is not None:
+            append_journal(journal, {**record, "project": allocation.project})
+
+    report.after = fetch_balances(client, slugs)
+    expected: Dict[str, int] = {}
+    for allocation in pending:
+        if allocation.error is None and allocation.project != host:
+            expected[allocation.project] = (
+                expected.get(allocation.project, 0) + allocation.net_cents
+            )
+    for slug, delta in expected.items():
+        moved = (report.after[slug].value_in_cents or 0) - (report.before[slug].value_in_cents or 0)
+        if moved != delta:
+            report.mismatches.append(
+                f"{slug}: expected +{delta / 100:,.2f} {currency},"
+                f" balance moved {moved / 100:+,.2f}"
+            )
+    return report
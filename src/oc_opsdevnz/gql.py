@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Mapping, Optional, Union
+
+
+class GraphQLSyntaxError(ValueError):
+    """Raised when a document does not parse; carries the character offset."""
+
+    def __init__(self, message: str, position: int):
+        super().__init__(f"{message} (at offset {position})")
+        self.position = position
+
+
+@dataclass(frozen=True)
+class Variable:
+    name: str
+
+
+class EnumValue(str):
+    """An unquoted enum literal such as ``CREATED_AT``."""
+
+
+@dataclass
+class VariableDefinition:
+    name: str
+    type: str
+    default: Any = None
+
+
+@dataclass
+class Field:
+    name: str
+    alias: Optional[str] = None
+    arguments: Dict[str, Any] = field(default_factory=dict)
+    selections: list["Selection"] = field(default_factory=list)
+    directives: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    @property
+    def response_key(self) -> str:
+        return self.alias or self.name
+
+
+@dataclass
+class InlineFragment:
+    type_condition: Optional[str]
+    selections: list["Selection"] = field(default_factory=list)
+
+
+@dataclass
+class FragmentSpread:
+    name: str
+
+
+Selection = Union[Field, InlineFragment, FragmentSpread]
+
+
+@dataclass
+class Operation:
+    kind: str
+    name: Optional[str]
+    variables: Dict[str, VariableDefinition] = field(default_factory=dict)
+    selections: list[Selection] = field(default_factory=list)
+
+
+@dataclass
+class FragmentDefinition:
+    name: str
+    type_condition: str
+    selections: list[Selection] = field(default_factory=list)
+
+
+@dataclass
+class Document:
+    operations: list[Operation] = field(default_factory=list)
+    fragments: Dict[str, FragmentDefinition] = field(default_factory=dict)
+
+    def operation(self, name: Optional[str] = None) -> Operation:
+        """The named operation, or the only one when ``name`` is None."""
+        if name is not None:
+            for op in self.operations:
+                if op.name == name:
+                    return op
+            raise ValueError(f"Unknown operation named '{name}'.")
+        if len(self.operations) != 1:
+            raise ValueError("Document has several operations; pass an operation name.")
+        return self.operations[0]
+
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<ignored>[\s,﻿]+|\#[^\n\r]*)
+    | (?P<spread>\.\.\.)
+    | (?P<punct>[!$():=@\[\]{|}&])
+    | (?P<block>\"\"\"(?:\\\"\"\"|[^"]|"(?!""))*\"\"\")
+    | (?P<string>"(?:\\.|[^"\\\n\r])*")
+    | (?P<number>-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?)
+    | (?P<name>[_A-Za-z][_0-9A-Za-z]*)
+    """,
+    re.VERBOSE,
+)
+
+
+def _tokenize(text: str) -> list[tuple[str, str, int]]:
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if match is None:
+            raise GraphQLSyntaxError(f"Unexpected character {text[pos]!r}", pos)
+        kind = match.lastgroup or ""
+        if kind != "ignored":
+            tokens.append((kind, match.group(), pos))
+        pos = match.end()
+    tokens.append(("eof", "", pos))
+    return tokens
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self.tokens = _tokenize(text)
+        self.i = 0
+
+    def peek(self, value: Optional[str] = None) -> bool:
+        _, tok, _ = self.tokens[self.i]
+        return tok == value if value is not None else True
+
+    def kind(self) -> str:
+        return self.tokens[self.i][0]
+
+    def advance(self) -> tuple[str, str, int]:
+        tok = self.tokens[self.i]
+        self.i += 1
+        return tok
+
+    def expect(self, value: str) -> None:
+        kind, tok, pos = self.advance()
+        if tok != value or kind in ("string", "block"):
+            raise GraphQLSyntaxError(f"Expected {value!r}, found {tok or 'end of document'!r}", pos)
+
+    def name(self) -> str:
+        kind, tok, pos = self.advance()
+        if kind != "name":
+            raise GraphQLSyntaxError(f"Expected a name, found {tok or 'end of document'!r}", pos)
+        return tok
+
+    def document(self) -> Document:
+        doc = Document()
+        while self.kind() != "eof":
+            if self.peek("fragment"):
+                frag = self.fragment_definition()
+                doc.fragments[frag.name] = frag
+            else:
+                doc.operations.append(self.operation())
+        if not doc.operations:
+            raise GraphQLSyntaxError("Document has no operation", 0)
+        return doc
+
+    def operation(self) -> Operation:
+        if self.peek("{"):
+            return Operation(kind="query", name=None, selections=self.selection_set())
+        kind = self.name()
+        if kind not in ("query", "mutation", "subscription"):
+            raise GraphQLSyntaxError(f"Unknown operation type {kind!r}", self.tokens[self.i - 1][2])
+        op = Operation(kind=kind, name=self.name() if self.kind() == "name" else None)
+        if self.peek("("):
+            self.advance()
+            while not self.peek(")"):
+                self.expect("$")
+                var = self.name()
+                self.expect(":")
+                definition = VariableDefinition(name=var, type=self.type_ref())
+                if self.peek("="):
+                    self.advance()
+                    definition.default = self.value(const=True)
+                self.directives()
+                op.variables[var] = definition
+            self.advance()
+        self.directives()
+        op.selections = self.selection_set()
+        return op
+
+    def fragment_definition(self) -> FragmentDefinition:
+        self.expect("fragment")
+        name = self.name()
+        self.expect("on")
+        type_condition = self.name()
+        self.directives()
+        return FragmentDefinition(name, type_condition, self.selection_set())
+
+    def type_ref(self) -> str:
+        if self.peek("["):
+            self.advance()
+            inner = self.type_ref()
+            self.expect("]")
+            out = f"[{inner}]"
+        else:
+            out = self.name()
+        if self.peek("!"):
+            self.advance()
+            out += "!"
+        return out
+
+    def selection_set(self) -> list[Selection]:
+        self.expect("{")
+        selections: list[Selection] = []
+        while not self.peek("}"):
+            if self.kind() == "eof":
+                raise GraphQLSyntaxError("Unterminated selection set", self.tokens[self.i][2])
+            selections.append(self.selection())
+        self.advance()
+        if not selections:
+            raise GraphQLSyntaxError("Empty selection set", self.tokens[self.i - 1][2])
+        return selections
+
+    def selection(self) -> Selection:
+        if self.kind() == "spread":
+            self.advance()
+            if self.peek("on"):
+                self.advance()
+                type_condition: Optional[str] = self.name()
+            elif self.kind() == "name":
+                spread = FragmentSpread(self.name())
+                self.directives()
+                return spread
+            else:
+                type_condition = None
+            self.directives()
+            return InlineFragment(type_condition, self.selection_set())
+        name = self.name()
+        alias = None
+        if self.peek(":"):
+            self.advance()
+            alias, name = name, self.name()
+        f = Field(name=name, alias=alias, arguments=self.arguments())
+        f.directives = self.directives()
+        if self.peek("{"):
+            f.selections = self.selection_set()
+        return f
+
+    def arguments(self, const: bool = False) -> Dict[str, Any]:
+        args: Dict[str, Any] = {}
+        if not self.peek("("):
+            return args
+        self.advance()
+        while not self.peek(")"):
+            key = self.name()
+            self.expect(":")
+            args[key] = self.value(const)
+        self.advance()
+        return args
+
+    def directives(self) -> Dict[str, Dict[str, Any]]:
+        found = {}
+        while self.peek("@"):
+            self.advance()
+            name = self.name()
+            found[name] = self.arguments()
+        return found
+
+    def value(self, const: bool = False) -> Any:
+        kind, tok, pos = self.advance()
+        if tok == "$" and kind == "punct":
+            if const:
+                raise GraphQLSyntaxError("Variables are not allowed here", pos)
+            return Variable(self.name())
+        if tok == "[" and kind == "punct":
+            items = []
+            while not self.peek("]"):
+                items.append(self.value(const))
+            self.advance()
+            return items
+        if tok == "{" and kind == "punct":
+            obj = {}
+            while not self.peek("}"):
+                key = self.name()
+                self.expect(":")
+                obj[key] = self.value(const)
+            self.advance()
+            return obj
+        if kind == "number":
+            return float(tok) if any(c in tok for c in ".eE") else int(tok)
+        if kind == "string":
+            return json.loads(tok)
+        if kind == "block":
+            return tok[3:-3].replace('\\"""', '"""')
+        if kind == "name":
+            return {"true": True, "false": False, "null": None}.get(tok, EnumValue(tok))
+        raise GraphQLSyntaxError(f"Unexpected {tok or 'end of document'!r}", pos)
+
+
+@lru_cache(maxsize=512)
+def parse(text: str) -> Document:
+    """Parse an executable GraphQL document (memoized: each distinct text is parsed once).
+
+    Treat the result as read-only; it is shared between callers.
+    """
+    return _Parser(text).document()
+
+
+def resolve_value(value: Any, variables: Mapping[str, Any]) -> Any:
+    """Substitute variables in a parsed argument value."""
+    if isinstance(value, Variable):
+        return variables.get(value.name)
+    if isinstance(value, list):
+        return [resolve_value(v, variables) for v in value]
+    if isinstance(value, dict):
+        return {k: resolve_value(v, variables) for k, v in value.items()}
+    if isinstance(value, EnumValue):
+        return str(value)
+    return value
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+R = TypeVar("R")
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """When a slow read gets a duplicate request.
+
+    The threshold is the ``quantile`` of the operation's last ``window``
+    response times, never below ``min_delay`` seconds; an operation is not
+    hedged until ``min_samples`` responses have been seen. ``max_workers``
+    bounds the threads that carry hedged requests, abandoned ones included.
+    """
+
+    quantile: float = 0.95
+    min_samples: int = 20
+    min_delay: float = 0.02
+    window: int = 200
+    max_workers: int = 32
+
+
+class LatencyTracker:
+    """Recent response times per operation, for adaptive hedging thresholds."""
+
+    def __init__(self, policy: HedgePolicy):
+        self.policy = policy
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, operation: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(operation)
+            if samples is None:
+                samples = self._samples[operation] = deque(maxlen=self.policy.window)
+            samples.append(seconds)
+
+    def threshold(self, operation: str) -> Optional[float]:
+        """Seconds to wait before hedging ``operation``, or None while samples are too few."""
+        with self._lock:
+            samples = sorted(self._samples.get(operation, ()))
+        if len(samples) < max(1, self.policy.min_samples):
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(self.policy.quantile * len(samples)) - 1))
+        return max(self.policy.min_delay, samples[index])
+
+
+class HedgePool:
+    """Threads for hedged reads that refuses work rather than queueing it.
+
+    A slot is held from ``reserve()`` until the submitted call finishes, so at
+    most ``max_workers`` requests (abandoned ones included) are ever in flight.
+    """
+
+    def __init__(self, max_workers: int):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="oc-hedge")
+        self._slots = threading.BoundedSemaphore(max_workers)
+
+    def reserve(self) -> bool:
+        return self._slots.acquire(blocking=False)
+
+    def release(self) -> None:
+        self._slots.release()
+
+    def submit(self, fn: Callable[[], R]) -> "Future[R]":
+        """Run ``fn`` on a reserved slot; the slot is released when it finishes."""
+        future = self._pool.submit(fn)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False)
+
+
+def first_of(
+    pool: HedgePool,
+    send: Callable[[], R],
+    threshold: float,
+    before_hedge: Callable[[], bool] = lambda: True,
+) -> Tuple[R, Optional[str]]:
+    """Run ``send``; if it is still running after ``threshold`` seconds, run it again.
+
+    A hedge needs two slots. When ``pool`` has none free, ``send`` runs once on
+    the caller's thread; when only the duplicate's slot is missing, or
+    ``before_hedge`` vetoes it by returning False, no duplicate is sent.
+
+    Returns the first successful result and ``None`` (no duplicate sent),
+    ``"won"`` (the duplicate finished first) or ``"lost"``. The slower request
+    is abandoned: it runs to completion on its thread and its result is dropped.
+    If both fail, the original request's error is raised.
+    """
+    if not pool.reserve():
+        return send(), None
+    primary = pool.submit(send)
+    done, _ = wait([primary], timeout=threshold)
+    if done or not pool.reserve():
+        return primary.result(), None
+    if not before_hedge():
+        pool.release()
+        return primary.result(), None
+    hedge = pool.submit(send)
+    pending = {primary, hedge}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for fut in (f for f in (primary, hedge) if f in done):
+            if fut.exception() is None:
+                return fut.result(), "won" if fut is hedge else "lost"
+    raise primary.exception()  # type: ignore[misc]
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, TextIO
+
+from . import codec
+
+
+def append_journal(fp: TextIO, record: Dict[str, Any]) -> None:
+    """Append one compact JSON record and flush so an interrupted run loses nothing."""
+    fp.write(codec.dumps(record) + "\n")
+    fp.flush()
+
+
+def read_journal(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Fold a JSONL results journal into the latest successful state per job key.
+
+    Each entry carries ``completed`` (the stages that succeeded, in order) plus the
+    last non-null ``id``/``legacyId``/``status`` recorded for that key.
+    """
+    state: Dict[str, Dict[str, Any]] = {}
+    if not path.exists():
+        return state
+    with path.open() as fp:
+        for line in fp:
+            if not line.strip():
+                continue
+            rec = codec.loads(line)
+            if not rec.get("ok"):
+                continue
+            entry = state.setdefault(rec["key"], {"completed": []})
+            entry["completed"].append(rec["stage"])
+            for k in ("id", "legacyId", "status"):
+                if rec.get(k) is not None:
+                    entry[k] = rec[k]
+    return state
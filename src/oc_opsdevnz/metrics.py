@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import os
+import threading
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+PREFIX = "oc_opsdevnz"
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _labels(**labels: object) -> Labels:
+    return tuple((k, str(v)) for k, v in labels.items())
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt(labels: Labels, extra: Optional[tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _num(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metrics:
+    """Run metrics rendered in the Prometheus text exposition format.
+
+    Thread-safe; every update is a dict increment under one lock. Write the
+    result with ``write_textfile()`` for node_exporter's textfile collector or
+    push it from CI.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self.requests: Dict[Labels, int] = {}
+        self.retries: Dict[Labels, int] = {}
+        self.rate_limited: Dict[Labels, int] = {}
+        self.cache: Dict[Labels, int] = {}
+        self.items: Dict[Labels, int] = {}
+        self.transfer: Dict[Labels, int] = {}
+        self.hedges: Dict[Labels, int] = {}
+        # labels -> [per-bucket counts..., +Inf count], sum
+        self._hist: Dict[Labels, list[int]] = {}
+        self._hist_sum: Dict[Labels, float] = {}
+
+    @staticmethod
+    def _inc(counter: Dict[Labels, int], key: Labels, by: int = 1) -> None:
+        counter[key] = counter.get(key, 0) + by
+
+    def observe_request(
+        self, operation: str, status: Optional[int], seconds: float, *, attempt: int = 1
+    ) -> None:
+        """Count one HTTP attempt; ``status`` is None for transport errors."""
+        key = _labels(operation=operation, status=status if status is not None else "error")
+        with self._lock:
+            self._inc(self.requests, key)
+            counts = self._hist.setdefault(key, [0] * (len(self.buckets) + 1))
+            counts[bisect_left(self.buckets, seconds)] += 1
+            self._hist_sum[key] = self._hist_sum.get(key, 0.0) + seconds
+            if attempt > 1:
+                self._inc(self.retries, _labels(operation=operation))
+            if status == 429:
+                self._inc(self.rate_limited, _labels(operation=operation))
+
+    def observe_cache(self, operation: str, *, hit: bool) -> None:
+        with self._lock:
+            self._inc(self.cache, _labels(operation=operation, result="hit" if hit else "miss"))
+
+    def observe_transfer(self, direction: str, raw: int, wire: int) -> None:
+        """Body bytes for one request or response, before (raw) and after content encoding."""
+        with self._lock:
+            self._inc(self.transfer, _labels(direction=direction, form="raw"), raw)
+            self._inc(self.transfer, _labels(direction=direction, form="wire"), wire)
+
+    def observe_hedge(self, operation: str, *, won: bool) -> None:
+        """Count a duplicate read sent after the hedging threshold, and whether it won."""
+        with self._lock:
+            self._inc(self.hedges, _labels(operation=operation, result="won" if won else "lost"))
+
+    def count_item(self, kind: str, result: str) -> None:
+        """Count a reconciled item, e.g. ``("collective", "created")``."""
+        with self._lock:
+            self._inc(self.items, _labels(kind=kind, result=result))
+
+    def render(self) -> str:
+        with self._lock:
+            lines: list[str] = []
+            counters = (
+                ("requests_total", "GraphQL HTTP attempts by operation and status.", self.requests),
+                ("retries_total", "Attempts after the first, by operation.", self.retries),
+                ("rate_limited_total", "HTTP 429 responses by operation.", self.rate_limited),
+                (
+                    "cache_lookups_total",
+                    "Client cache lookups by operation and result.",
+                    self.cache,
+                ),
+                ("items_total", "Reconciled items by kind and result.", self.items),
+                (
+                    "transfer_bytes_total",
+                    "Body bytes by direction, raw vs on the wire (compressed).",
+                    self.transfer,
+                ),
+                ("hedges_total", "Hedged duplicate reads by operation and result.", self.hedges),
+            )
+            for name, help_text, counter in counters:
+                lines += [f"# HELP {PREFIX}_{name} {help_text}", f"# TYPE {PREFIX}_{name} counter"]
+                lines += [f"{PREFIX}_{name}{_fmt(k)} {v}" for k, v in sorted(counter.items())]
+
+            name = f"{PREFIX}_request_duration_seconds"
+            lines += [
+                f"# HELP {name} GraphQL request latency by operation and status.",
+                f"# TYPE {name} histogram",
+            ]
+            for key, counts in sorted(self._hist.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts, strict=False):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_fmt(key, ('le', _num(bound)))} {cumulative}")
+                total = cumulative + counts[-1]
+                lines.append(f"{name}_bucket{_fmt(key, ('le', '+Inf'))} {total}")
+                lines.append(f"{name}_sum{_fmt(key)} {self._hist_sum[key]:.6f}")
+                lines.append(f"{name}_count{_fmt(key)} {total}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Path | str) -> None:
+        """Write atomically (temp file + rename) so scrapers never read a partial file."""
+        path = Path(path)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(self.render())
+        os.replace(tmp, path)
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Any
+
+# AmountInput.valueInCents is a GraphQL Int (32-bit signed).
+MAX_CENTS = 2**31 - 1
+
+
+def to_decimal(value: Any) -> Decimal:
+    """Parse a dollar amount without ever passing through float."""
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, float):
+        raise TypeError("Refusing float amount; pass a string or Decimal (e.g. '650.00').")
+    try:
+        amount = Decimal(str(value).strip().replace(",", ""))
+    except InvalidOperation as e:
+        raise ValueError(f"Invalid amount: {value!r}") from e
+    if not amount.is_finite():
+        raise ValueError(f"Invalid amount: {value!r}")
+    return amount
+
+
+def to_cents(value: Any) -> int:
+    """Convert a dollar amount to integer cents, rejecting sub-cent precision."""
+    cents = to_decimal(value) * 100
+    if cents != cents.to_integral_value():
+        raise ValueError(f"Amount {value!r} has more than two decimal places.")
+    if abs(cents) > MAX_CENTS:
+        raise ValueError(f"Amount {value!r} exceeds {MAX_CENTS / 100:,.2f}.")
+    return int(cents)
+
+
+def host_fee_cents(cents: int, percent: Any) -> int:
+    """The host's share of ``cents`` at ``percent``, rounded half-up to a whole cent."""
+    fee = Decimal(cents) * Decimal(str(percent or 0)) / 100
+    return int(fee.quantize(Decimal(1), rounding=ROUND_HALF_UP))
@@ -3,13 +3,28 @@ from __future__ import annotations
 
 import hashlib
 import os
+import sys
+import threading
 import time
-from typing import Any, Dict, Iterable, Literal, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Literal, Optional
 
 import httpx
 
+from . import codec
+from .cache import NOT_FOUND_TTL, NotFoundCache, slugs_in
+from .compression import ACCEPT_ENCODING, compress_body
+from .connections import PoolSettings, build_transport, proxy_mounts, shared_transport
+from .deadline import Deadline, OperationTimeouts
+from .hedging import HedgePolicy, HedgePool, LatencyTracker, first_of
+from .metrics import Metrics
+from .ratelimit import RateLimiter
+from .request_log import RequestLog, operation_name
 from .secrets import get_oc_token
 
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .schema import Validator
+
 PROD_URL = "https://api.opencollective.com/graphql/v2"
 STAGING_URL = "https://api-staging.opencollective.com/graphql/v2"
 
@@ -42,10 +57,13 @@ class GraphQLError(OpenCollectiveError):
         *,
         errors: Optional[list[dict[str, Any]]] = None,
         status_code: Optional[int] = None,
+        data: Optional[dict[str, Any]] = None,
     ):
         super().__init__(message)
         self.errors = errors or []
         self.status_code = status_code
+        # Partial ``data`` returned alongside the errors (e.g. aliased batch queries).
+        self.data = data or {}
 
 
 class HTTPRequestError(OpenCollectiveError):
@@ -58,6 +76,18 @@ class TransportError(OpenCollectiveError):
     """Network/transport failure."""
 
 
+class DeadlineExceeded(OpenCollectiveError):
+    """The run deadline or the operation's total timeout left no time for an attempt.
+
+    ``attempted`` is True when a request had already been sent: a mutation may
+    then have been applied, so rerun it with the same idempotency key.
+    """
+
+    def __init__(self, message: str, *, attempted: bool = False):
+        super().__init__(message)
+        self.attempted = attempted
+
+
 def _redact(text: str, secrets: Iterable[str]) -> str:
     """Best-effort redaction to avoid echoing tokens in errors."""
     if not text:
@@ -69,6 +99,44 @@ def _redact(text: str, secrets: Iterable[str]) -> str:
     return redacted
 
 
+def _is_mutation(query: str) -> bool:
+    return query.lstrip().startswith("mutation")
+
+
+@lru_cache(maxsize=512)
+def _query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+# Endpoint -> whether it accepts automatic persisted queries (absent until probed).
+_PERSISTED_QUERY_SUPPORT: Dict[str, bool] = {}
+_PERSISTED_QUERY_LOCK = threading.Lock()
+
+
+def _persisted_query_support(api_url: str) -> Optional[bool]:
+    with _PERSISTED_QUERY_LOCK:
+        return _PERSISTED_QUERY_SUPPORT.get(api_url)
+
+
+def _remember_persisted_query_support(api_url: str, supported: bool) -> None:
+    with _PERSISTED_QUERY_LOCK:
+        _PERSISTED_QUERY_SUPPORT[api_url] = supported
+
+
+def _persisted_query_error(exc: OpenCollectiveError) -> Optional[str]:
+    """PERSISTED_QUERY_NOT_FOUND / _NOT_SUPPORTED when ``exc`` is an APQ protocol error."""
+    for error in getattr(exc, "errors", None) or []:
+        if not isinstance(error, dict):
+            continue
+        code = (error.get("extensions") or {}).get("code")
+        message = error.get("message")
+        if code == "PERSISTED_QUERY_NOT_FOUND" or message == "PersistedQueryNotFound":
+            return "PERSISTED_QUERY_NOT_FOUND"
+        if code == "PERSISTED_QUERY_NOT_SUPPORTED" or message == "PersistedQueryNotSupported":
+            return "PERSISTED_QUERY_NOT_SUPPORTED"
+    return None
+
+
 def _token_fingerprint(token: Optional[str]) -> str:
     if not token:
         return ""
@@ -88,6 +156,19 @@ class OpenCollectiveClient:
         transport: Optional[httpx.BaseTransport] = None,
         http_client: Optional[httpx.Client] = None,
         log_requests: bool = DEBUG,
+        request_log: Optional[RequestLog] = None,
+        metrics: Optional[Metrics] = None,
+        pool: Optional[PoolSettings] = None,
+        shared_pool: bool = False,
+        compress_requests: bool = False,
+        persisted_queries: bool = False,
+        validator: Optional["Validator"] = None,
+        query_timeouts: Optional[OperationTimeouts] = None,
+        mutation_timeouts: Optional[OperationTimeouts] = None,
+        deadline: Optional[Deadline] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        hedge: Optional[HedgePolicy] = None,
+        not_found_ttl: float = NOT_FOUND_TTL,
         **kwargs,
     ):
         api_url = api_url or kwargs.pop("base_url", None)
@@ -104,12 +185,60 @@ class OpenCollectiveClient:
         self.app_name = app_name
         self.auth_mode = auth_mode
         self.log_requests = log_requests
-
+        if request_log is None and log_requests:
+            request_log = RequestLog(sys.stderr)
+        self.request_log = request_log
+        self.metrics = metrics
+        # Gzip request bodies of GZIP_MIN_BYTES or more (large aliased batch documents).
+        self.compress_requests = compress_requests
+        # Send query hashes instead of full documents where the endpoint supports it.
+        self.persisted_queries = persisted_queries
+        # Checks documents/variables against a cached schema before anything is sent.
+        self.validator = validator
+        # Per operation class; ``timeout`` is the connect/read default for both.
+        self.timeouts = {
+            "query": query_timeouts or OperationTimeouts(connect=timeout, read=timeout),
+            "mutation": mutation_timeouts or OperationTimeouts(connect=timeout, read=timeout),
+        }
+        # Run-level budget: no attempt or retry backoff is started past it.
+        self.deadline = deadline
+        # Every HTTP attempt (retries and hedged duplicates too) takes a token from it.
+        self.rate_limiter = rate_limiter
+        # Reads still running after their operation's adaptive threshold get a duplicate.
+        self.hedge = hedge
+        self._latency = LatencyTracker(hedge) if hedge is not None else None
+        self._hedge_pool: Optional[HedgePool] = None
+        self._hedge_lock = threading.Lock()
+        # Slugs recently answered "not found" (0 disables); mutations naming a slug drop it.
+        self.not_found = NotFoundCache(not_found_ttl)
+        # Time spent waiting on the API, split by reads vs mutations (for --timings), and
+        # bytes before (raw) and after (wire) content encoding.
+        self.network: Dict[str, Any] = {
+            "requests": 0,
+            "query_seconds": 0.0,
+            "mutation_seconds": 0.0,
+            "request_bytes": 0,
+            "request_wire_bytes": 0,
+            "response_bytes": 0,
+            "response_wire_bytes": 0,
+            "hedges": 0,
+        }
+        self._network_lock = threading.Lock()
+
+        # ``shared_pool`` reuses the process-wide connection pool for ``pool``; closing
+        # this client then leaves the pool open for other clients.
+        shared = shared_pool and http_client is None and transport is None
+        mounts = None
+        if http_client is None and transport is None:
+            transport = shared_transport(pool) if shared else build_transport(pool)
+            # Environment proxies, as httpx would apply them without an explicit transport.
+            mounts = proxy_mounts(pool, shared=shared)
         self._client = http_client or httpx.Client(
             timeout=timeout,
             transport=transport,
+            mounts=mounts,
         )
-        self._owns_client = http_client is None
+        self._owns_client = http_client is None and not shared
 
     @classmethod
     def for_prod(
@@ -161,6 +290,8 @@ class OpenCollectiveClient:
         )
 
     def close(self) -> None:
+        if self._hedge_pool is not None:
+            self._hedge_pool.shutdown()
         if self._owns_client:
             self._client.close()
 
@@ -173,6 +304,7 @@ class OpenCollectiveClient:
     def _headers(self) -> Dict[str, str]:
         headers = {
             "User-Agent": self.app_name,
+            "Accept-Encoding": ACCEPT_ENCODING,
         }
         if self.auth_mode == "personal":
             headers["Personal-Token"] = self.token
@@ -187,29 +319,109 @@ class OpenCollectiveClient:
         retry: int = 2,
         idempotency_key: Optional[str] = None,
     ) -> Dict[str, Any]:
-        payload = {"query": query, "variables": variables or {}}
+        variables = variables or {}
+        if self.validator is not None:
+            self.validator.check(query, variables)
+        kind = "mutation" if _is_mutation(query) else "query"
+        if kind == "mutation" and len(self.not_found):
+            for slug in slugs_in(variables):
+                self.not_found.discard(slug)
+        total = self.timeouts[kind].total
+        until = time.monotonic() + total if total is not None else None
+        if self.deadline is not None:
+            until = self.deadline.at if until is None else min(until, self.deadline.at)
+        support = _persisted_query_support(self.api_url)
+        if not self.persisted_queries or support is False:
+            payload = {"query": query, "variables": variables}
+            return self._send(query, kind, payload, retry, idempotency_key, until)
+
+        # Automatic persisted query: the hash alone first; the server answers
+        # PERSISTED_QUERY_NOT_FOUND without executing, so resending is safe even for mutations.
+        extensions = {"persistedQuery": {"version": 1, "sha256Hash": _query_hash(query)}}
+        try:
+            payload = {"variables": variables, "extensions": extensions}
+            data = self._send(query, kind, payload, retry, idempotency_key, until)
+        except (GraphQLError, HTTPRequestError) as exc:
+            code = _persisted_query_error(exc)
+            if code is None and not (support is None and exc.status_code == 400):
+                if isinstance(exc, GraphQLError):
+                    _remember_persisted_query_support(self.api_url, True)
+                raise
+            supported = code == "PERSISTED_QUERY_NOT_FOUND"
+            _remember_persisted_query_support(self.api_url, supported)
+            payload = {"query": query, "variables": variables}
+            if supported:
+                payload["extensions"] = extensions
+            return self._send(query, kind, payload, retry, idempotency_key, until)
+        _remember_persisted_query_support(self.api_url, True)
+        return data
+
+    def _send(
+        self,
+        query: str,
+        kind: str,
+        payload: Dict[str, Any],
+        retry: int,
+        idempotency_key: Optional[str],
+        until: Optional[float] = None,
+    ) -> Dict[str, Any]:
         headers = self._headers()
+        headers["Content-Type"] = "application/json"
         if idempotency_key:
             headers["Idempotency-Key"] = idempotency_key
+        raw = codec.dumpb(payload)
+        body, encoding = compress_body(raw) if self.compress_requests else (raw, None)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        sizes = (len(raw), len(body))
 
+        limits = self.timeouts[kind]
         last_err: Optional[Exception] = None
         for attempt in range(retry + 1):
+            budget = None if until is None else until - time.monotonic()
+            if budget is not None and budget <= 0:
+                raise self._out_of_time(query, attempt, last_err)
+            if self.rate_limiter is not None:
+                # Never wait for a token past the budget, nor spend one on an unsent request.
+                if self.rate_limiter.acquire(max_wait=budget) is None:
+                    raise self._out_of_time(query, attempt, last_err)
+                if budget is not None:
+                    budget = until - time.monotonic()
+            timeout = httpx.Timeout(
+                limits.read if budget is None else min(limits.read, budget),
+                connect=limits.connect if budget is None else min(limits.connect, budget),
+            )
             try:
-                resp = self._client.post(self.api_url, json=payload, headers=headers)
-                if self.log_requests:
-                    print(f"[oc_opsdevnz] POST {self.api_url} status={resp.status_code}")
+                started = time.perf_counter()
+                try:
+                    resp, hedge = self._post(query, kind, body, headers, timeout, until)
+                except httpx.HTTPError as exc:
+                    self._after_request(
+                        query, kind, started, attempt, idempotency_key, sizes, error=exc
+                    )
+                    raise
+                self._after_request(
+                    query,
+                    kind,
+                    started,
+                    attempt,
+                    idempotency_key,
+                    sizes,
+                    response=resp,
+                    hedge=hedge,
+                )
                 resp.raise_for_status()
-                data = resp.json()
+                data = codec.loads(resp.content)
             except httpx.HTTPStatusError as exc:
                 last_err = self._handle_http_error(exc.response)
                 if exc.response.status_code >= 500 and attempt < retry:
-                    time.sleep(0.5 * (attempt + 1))
+                    self._backoff(query, attempt, until, last_err)
                     continue
                 break
             except httpx.HTTPError as exc:
                 last_err = TransportError(str(exc))
                 if attempt < retry:
-                    time.sleep(0.5 * (attempt + 1))
+                    self._backoff(query, attempt, until, last_err)
                     continue
                 break
             else:
@@ -224,10 +436,150 @@ class OpenCollectiveClient:
                         _redact(str(message), [self.token]),
                         errors=errors,
                         status_code=resp.status_code,
+                        data=data.get("data"),
                     )
                 return data.get("data", {})
         raise last_err  # type: ignore
 
+    def _post(
+        self,
+        query: str,
+        kind: str,
+        body: bytes,
+        headers: Dict[str, str],
+        timeout: httpx.Timeout,
+        until: Optional[float] = None,
+    ) -> tuple[httpx.Response, Optional[str]]:
+        """POST once, or hedged for reads when a latency threshold is known."""
+        op = operation_name(query)
+
+        def send() -> httpx.Response:
+            started = time.perf_counter()
+            resp = self._client.post(self.api_url, content=body, headers=headers, timeout=timeout)
+            if self._latency is not None:
+                self._latency.observe(op, time.perf_counter() - started)
+            return resp
+
+        # Mutations are never duplicated: only reads are safe to send twice.
+        threshold = None
+        if self._latency is not None and kind == "query":
+            threshold = self._latency.threshold(op)
+        if threshold is None:
+            return send(), None
+
+        def may_hedge() -> bool:
+            # A duplicate only goes out if it can still start within the budget.
+            budget = None if until is None else until - time.monotonic()
+            if budget is not None and budget <= 0:
+                return False
+            limiter = self.rate_limiter
+            return limiter is None or limiter.acquire(max_wait=budget) is not None
+
+        resp, hedge = first_of(self._hedge_executor(), send, threshold, before_hedge=may_hedge)
+        if hedge is not None:
+            with self._network_lock:
+                self.network["hedges"] += 1
+            if self.metrics is not None:
+                self.metrics.observe_hedge(op, won=hedge == "won")
+        return resp, hedge
+
+    def _hedge_executor(self) -> HedgePool:
+        with self._hedge_lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = HedgePool(self.hedge.max_workers)
+            return self._hedge_pool
+
+    def _backoff(
+        self, query: str, attempt: int, until: Optional[float], last_err: Exception
+    ) -> None:
+        delay = 0.5 * (attempt + 1)
+        if until is not None and time.monotonic() + delay >= until:
+            raise self._out_of_time(query, attempt + 1, last_err)
+        time.sleep(delay)
+
+    def _out_of_time(
+        self, query: str, attempts: int, last_err: Optional[Exception]
+    ) -> DeadlineExceeded:
+        op = operation_name(query)
+        if attempts == 0:
+            return DeadlineExceeded(f"Out of time budget before {op}; not sent.")
+        return DeadlineExceeded(
+            f"Out of time budget after {attempts} attempt(s) of {op}: {last_err}",
+            attempted=True,
+        )
+
+    def _after_request(
+        self,
+        query: str,
+        kind: str,
+        started: float,
+        attempt: int,
+        idempotency_key: Optional[str],
+        sizes: tuple[int, int],
+        *,
+        response: Optional[httpx.Response] = None,
+        error: Optional[Exception] = None,
+        hedge: Optional[str] = None,
+    ) -> None:
+        elapsed = time.perf_counter() - started
+        request_raw, request_wire = sizes
+        response_raw = response_wire = 0
+        if response is not None:
+            response_raw = len(response.content)
+            response_wire = response.num_bytes_downloaded or response_raw
+        with self._network_lock:
+            network = self.network
+            network["requests"] += 1
+            network[f"{kind}_seconds"] += elapsed
+            network["request_bytes"] += request_raw
+            network["request_wire_bytes"] += request_wire
+            network["response_bytes"] += response_raw
+            network["response_wire_bytes"] += response_wire
+        status = response.status_code if response is not None else None
+        if self.metrics is not None:
+            self.metrics.observe_request(
+                operation_name(query), status, elapsed, attempt=attempt + 1
+            )
+            self.metrics.observe_transfer("request", request_raw, request_wire)
+            if response is not None:
+                self.metrics.observe_transfer("response", response_raw, response_wire)
+        if self.request_log is None:
+            return
+        # Only sizes, timings and identifiers are logged; headers and bodies carry the token.
+        record: Dict[str, Any] = {
+            "endpoint": self.api_url,
+            "operation": operation_name(query),
+            "kind": kind,
+            "status": status,
+            "duration_ms": round(elapsed * 1000, 3),
+            "request_bytes": request_raw,
+            "request_wire_bytes": request_wire,
+            "response_bytes": response_raw if response is not None else None,
+            "response_wire_bytes": response_wire if response is not None else None,
+            "attempt": attempt + 1,
+            "idempotency_key": idempotency_key,
+            "cache": None,
+        }
+        if error is not None:
+            record["error"] = type(error).__name__
+        if hedge is not None:
+            record["hedge"] = hedge
+        self.request_log.emit(record)
+
+    def log_cache(self, query: str, *, hit: bool) -> None:
+        """Record a cache lookup answered (``hit``) or not (``miss``) without a request."""
+        if self.metrics is not None:
+            self.metrics.observe_cache(operation_name(query), hit=hit)
+        if self.request_log is not None:
+            self.request_log.emit(
+                {
+                    "endpoint": self.api_url,
+                    "operation": operation_name(query),
+                    "kind": "mutation" if _is_mutation(query) else "query",
+                    "cache": "hit" if hit else "miss",
+                }
+            )
+
     def _handle_http_error(self, response: httpx.Response) -> HTTPRequestError:
         raw_body = response.text or ""
         redacted_body = _redact(raw_body, [self.token])
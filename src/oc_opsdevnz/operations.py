@@ -1,43 +1,28 @@
 from __future__ import annotations
 
-import json
+import csv
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Dict, Optional, Sequence
 
 import yaml
 
+from . import codec
 from .oc_client import GraphQLError, OpenCollectiveClient
-
-Q_ACCOUNT = """
-query Account($slug: String!) {
-  account(slug: $slug) {
-    __typename
-    id
-    slug
-    name
-    type
-    isHost
-    ... on Account { description longDescription tags website currency }
-    ... on AccountWithHost { host { slug name } }
-    ... on Account { socialLinks { type url } }
-    stats { balance { currency } }
-  }
-}
-"""
-
-Q_HOST = """
-query Host($slug: String!) {
-  account(slug: $slug) {
-    __typename
-    id
-    slug
-    name
-    type
-    isHost
-  }
-}
-"""
+from .queries import (
+    ACCOUNT_SELECTIONS,
+    COLLECTIVE_FIELDS,
+    EXISTS_FIELDS,
+    HOST_FIELDS,
+    IS_HOST_FIELDS,
+    PROJECT_FIELDS,
+    account_query,
+    edit_account_mutation,
+)
+
+# Every field upserts can compare or return; each operation selects its own subset.
+Q_ACCOUNT = account_query("Account", tuple(ACCOUNT_SELECTIONS))
+Q_HOST = account_query("Host", IS_HOST_FIELDS)
 
 MUTATION_CREATE_ORG = """
 mutation CreateOrganization($input: OrganizationCreateInput!) {
@@ -50,22 +35,7 @@ mutation CreateOrganization($input: OrganizationCreateInput!) {
 }
 """
 
-MUTATION_EDIT_ACCOUNT = """
-mutation EditAccount($account: AccountUpdateInput!) {
-  editAccount(account: $account) {
-    id
-    slug
-    name
-    description
-    longDescription
-    currency
-    tags
-    website
-    socialLinks { type url }
-    ... on AccountWithHost { host { slug name } }
-  }
-}
-"""
+MUTATION_EDIT_ACCOUNT = edit_account_mutation("EditAccount", tuple(ACCOUNT_SELECTIONS))
 
 MUTATION_CREATE_COLLECTIVE = """
 mutation CreateCollective($input: CollectiveCreateInput!) {
@@ -105,6 +75,12 @@ mutation ApplyToHost(
 }
 """
 
+NOT_FOUND_MESSAGES = (
+    "No collective found with slug",
+    "No account found with slug",
+    "No organization found with slug",
+)
+
 
 @dataclass
 class UpsertResult:
@@ -119,12 +95,25 @@ class UpsertResult:
 def load_items(path: Path) -> list[Dict[str, Any]]:
     """Load YAML or JSON list-of-dicts."""
     text = path.read_text()
-    data = yaml.safe_load(text) if path.suffix.lower() in (".yaml", ".yml") else json.loads(text)
+    data = yaml.safe_load(text) if path.suffix.lower() in (".yaml", ".yml") else codec.loads(text)
     if not isinstance(data, list):
         raise ValueError("Input file must contain a top-level array/list.")
     return data
 
 
+def load_rows(path: Path) -> list[Dict[str, Any]]:
+    """Load tabular rows from CSV or JSONL/NDJSON; anything else goes through ``load_items``."""
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        with path.open(newline="") as fp:
+            return [dict(r) for r in csv.DictReader(fp)]
+    if suffix in (".jsonl", ".ndjson"):
+        with path.open() as fp:
+            # Decimal-safe: a JSON amount like 25.10 must not round-trip through float.
+            return [codec.loads(line, decimal=True) for line in fp if line.strip()]
+    return load_items(path)
+
+
 def _arrays_equal(a: Optional[Sequence[Any]], b: Optional[Sequence[Any]]) -> bool:
     if a is None and b is None:
         return True
@@ -181,20 +170,25 @@ def _extract_currency(acc: Dict[str, Any]) -> Optional[str]:
     return _upper_or_none(((acc.get("stats") or {}).get("balance") or {}).get("currency"))
 
 
-def _get_account_if_exists(client: OpenCollectiveClient, slug: str) -> Optional[Dict[str, Any]]:
+def _get_account_if_exists(
+    client: OpenCollectiveClient, slug: str, query: str = Q_ACCOUNT
+) -> Optional[Dict[str, Any]]:
+    # Not-found answers come back as GraphQL errors; remember them briefly instead of re-asking.
+    if slug in client.not_found:
+        client.log_cache(query, hit=True)
+        return None
+    client.log_cache(query, hit=False)
     try:
-        data = client.graphql(Q_ACCOUNT, {"slug": slug})
-        return data.get("account")
+        account = client.graphql(query, {"slug": slug}).get("account")
     except GraphQLError as e:
         msg = str(e)
-        not_found = (
-            "No collective found with slug",
-            "No account found with slug",
-            "No organization found with slug",
-        )
-        if any(sig in msg for sig in not_found):
+        if any(sig in msg for sig in NOT_FOUND_MESSAGES):
+            client.not_found.add(slug)
             return None
         raise
+    if account is None:
+        client.not_found.add(slug)
+    return account
 
 
 def _get_host_or_die(client: OpenCollectiveClient, slug: str) -> Dict[str, Any]:
@@ -220,7 +214,8 @@ def upsert_host(client: OpenCollectiveClient, item: Dict[str, Any]) -> UpsertRes
     updated = False
     warnings: list[str] = []
 
-    acc = _get_account_if_exists(client, slug)
+    fields = HOST_FIELDS + (("longDescription",) if desired_long_desc is not None else ())
+    acc = _get_account_if_exists(client, slug, account_query("HostAccount", fields))
 
     if not acc:
         org_input: Dict[str, Any] = {
@@ -257,7 +252,8 @@ def upsert_host(client: OpenCollectiveClient, item: Dict[str, Any]) -> UpsertRes
         }
         if desired_long_desc is not None:
             patch["longDescription"] = str(desired_long_desc)
-        acc = client.graphql(MUTATION_EDIT_ACCOUNT, {"account": patch})["editAccount"]
+        mutation = edit_account_mutation("EditHost", fields)
+        acc = client.graphql(mutation, {"account": patch})["editAccount"]
         updated = True
 
     # Currency comparison is informational only.
@@ -293,7 +289,9 @@ def upsert_collective(client: OpenCollectiveClient, item: Dict[str, Any]) -> Ups
     if apply_flag and host_slug:
         _get_host_or_die(client, host_slug)
 
-    acc = _get_account_if_exists(client, slug)
+    acc = _get_account_if_exists(
+        client, slug, account_query("CollectiveAccount", COLLECTIVE_FIELDS)
+    )
     if not acc:
         create_input = {
             "name": desired_name,
@@ -320,7 +318,8 @@ def upsert_collective(client: OpenCollectiveClient, item: Dict[str, Any]) -> Ups
             "description": desired_desc,
             "tags": desired_tags,
         }
-        acc = client.graphql(MUTATION_EDIT_ACCOUNT, {"account": patch})["editAccount"]
+        mutation = edit_account_mutation("EditCollective", COLLECTIVE_FIELDS)
+        acc = client.graphql(mutation, {"account": patch})["editAccount"]
         updated = True
 
     if apply_flag and host_slug:
@@ -353,14 +352,14 @@ def upsert_project(client: OpenCollectiveClient, item: Dict[str, Any]) -> Upsert
     desired_tags = _norm_tags(item.get("tags"))
 
     # Ensure parent exists
-    parent = _get_account_if_exists(client, parent_slug)
+    parent = _get_account_if_exists(client, parent_slug, account_query("Parent", EXISTS_FIELDS))
     if not parent:
         raise RuntimeError(f"Parent collective '{parent_slug}' not found; create it first.")
 
     created = False
     updated = False
 
-    acc = _get_account_if_exists(client, slug)
+    acc = _get_account_if_exists(client, slug, account_query("ProjectAccount", PROJECT_FIELDS))
     if not acc:
         project_input: Dict[str, Any] = {
             "name": desired_name,
@@ -386,7 +385,8 @@ def upsert_project(client: OpenCollectiveClient, item: Dict[str, Any]) -> Upsert
             "description": desired_desc,
             "tags": desired_tags,
         }
-        acc = client.graphql(MUTATION_EDIT_ACCOUNT, {"account": patch})["editAccount"]
+        mutation = edit_account_mutation("EditProject", PROJECT_FIELDS)
+        acc = client.graphql(mutation, {"account": patch})["editAccount"]
         updated = True
 
     return UpsertResult(slug=slug, created=created, updated=updated, account=acc)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import csv
+import sys
+from typing import Any, Dict, Iterable, Optional, Sequence, TextIO
+
+from . import codec
+from .operations import UpsertResult
+
+
+def write_ndjson(records: Iterable[Dict[str, Any]], fp: TextIO) -> int:
+    """Write one compact JSON object per line; returns the number of records written."""
+    count = 0
+    for record in records:
+        fp.write(codec.dumps(record))
+        fp.write("\n")
+        count += 1
+    return count
+
+
+def write_csv(records: Iterable[Dict[str, Any]], fp: TextIO, fields: Sequence[str]) -> int:
+    """Write records as CSV with a fixed header; unknown keys are ignored."""
+    writer = csv.DictWriter(fp, fieldnames=list(fields), extrasaction="ignore")
+    writer.writeheader()
+    count = 0
+    for record in records:
+        writer.writerow(record)
+        count += 1
+    return count
+
+
+OUTPUT_MODES = ("pretty", "ndjson", "summary", "quiet")
+SUMMARY_COUNTS = ("created", "updated", "applied", "unchanged", "failed", "skipped")
+
+
+def result_outcomes(result: UpsertResult) -> list[str]:
+    """Which of ``SUMMARY_COUNTS`` an upsert contributes to (``unchanged`` when nothing ran)."""
+    outcomes = [
+        name
+        for name, flag in (
+            ("created", result.created),
+            ("updated", result.updated),
+            ("applied", result.applied_to_host),
+        )
+        if flag
+    ]
+    return outcomes or ["unchanged"]
+
+
+def format_counts(counts: Dict[str, int]) -> str:
+    """``created=1 updated=0 ...``; ``skipped`` only when a deadline actually cut a run short."""
+    return " ".join(f"{k}={v}" for k, v in counts.items() if v or k != "skipped")
+
+
+class ResultPrinter:
+    """Print upsert results in one of ``OUTPUT_MODES`` while keeping aggregate counts.
+
+    ``pretty`` keeps the per-item summary plus indented account dump; ``ndjson``
+    writes one compact record per item, batched into a single write every
+    ``buffer_size`` records; ``summary`` prints only the counts on ``close()``;
+    ``quiet`` prints nothing. With ``group`` set (one printer per environment or
+    client in a fan-out run) NDJSON records carry it as ``group_field``, pretty
+    lines are tagged ``[group/kind]`` and the summary line starts with ``group:``.
+    """
+
+    def __init__(
+        self,
+        mode: str = "pretty",
+        fp: Optional[TextIO] = None,
+        *,
+        buffer_size: int = 64,
+        group: Optional[str] = None,
+        group_field: str = "env",
+    ):
+        if mode not in OUTPUT_MODES:
+            raise ValueError(f"output mode must be one of {', '.join(OUTPUT_MODES)}.")
+        self.mode = mode
+        self.group = group
+        self.group_field = group_field
+        self.fp = fp if fp is not None else sys.stdout
+        self.buffer_size = max(1, buffer_size)
+        self.counts: Dict[str, int] = dict.fromkeys(SUMMARY_COUNTS, 0)
+        self._pending: list[str] = []
+
+    def add(self, label: str, result: UpsertResult) -> None:
+        for outcome in result_outcomes(result):
+            self.counts[outcome] += 1
+
+        if self.mode == "pretty":
+            summary = {
+                "slug": result.slug,
+                "created": result.created,
+                "updated": result.updated,
+                "applied_to_host": result.applied_to_host,
+                "warnings": result.warnings,
+            }
+            self.fp.write(f"[{self._tag(label)}] {codec.dumps(summary)}\n")
+            self.fp.write(codec.dumps({"account": result.account}, indent=True) + "\n")
+        elif self.mode == "ndjson":
+            self._emit(
+                {
+                    **self._group,
+                    "kind": label,
+                    "slug": result.slug,
+                    "created": result.created,
+                    "updated": result.updated,
+                    "applied_to_host": result.applied_to_host,
+                    "warnings": result.warnings,
+                    "account": result.account,
+                }
+            )
+
+    def fail(self, label: str, slug: Optional[str], error: BaseException) -> None:
+        self.counts["failed"] += 1
+        if self.mode == "ndjson":
+            self._emit({**self._group, "kind": label, "slug": slug, "error": str(error)})
+
+    def skip(self, label: str, slug: Optional[str], reason: str) -> None:
+        """Record an item left alone because the run ran out of time."""
+        self.counts["skipped"] += 1
+        if self.mode == "pretty":
+            self.fp.write(
+                f"[{self._tag(label)}] {codec.dumps({'slug': slug, 'skipped': reason})}\n"
+            )
+        elif self.mode == "ndjson":
+            self._emit({**self._group, "kind": label, "slug": slug, "skipped": reason})
+
+    @property
+    def _group(self) -> Dict[str, str]:
+        return {self.group_field: self.group} if self.group else {}
+
+    def _tag(self, label: str) -> str:
+        return f"{self.group}/{label}" if self.group else label
+
+    def _emit(self, record: Dict[str, Any]) -> None:
+        self._pending.append(codec.dumps(record))
+        if len(self._pending) >= self.buffer_size:
+            self._drain()
+
+    def _drain(self) -> None:
+        if self._pending:
+            self.fp.write("\n".join(self._pending) + "\n")
+            self._pending.clear()
+
+    def close(self) -> None:
+        """Flush buffered NDJSON and, in ``summary`` mode, print the aggregate counts."""
+        self._drain()
+        if self.mode == "summary":
+            prefix = f"{self.group}: " if self.group else ""
+            self.fp.write(prefix + format_counts(self.counts) + "\n")
+        self.fp.flush()
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, Iterable
+
+# Declared account field -> selection. Order here is the order fields are emitted in.
+ACCOUNT_SELECTIONS: Dict[str, str] = {
+    "__typename": "__typename",
+    "id": "id",
+    "legacyId": "legacyId",
+    "slug": "slug",
+    "name": "name",
+    "type": "type",
+    "isHost": "isHost",
+    "description": "description",
+    "longDescription": "longDescription",
+    "tags": "tags",
+    "website": "website",
+    "currency": "currency",
+    "socialLinks": "socialLinks { type url }",
+    "balance": "stats { balance { valueInCents currency } }",
+    "host": "host { slug name }",
+    "parent": "parent { slug }",
+}
+
+# Fields that only exist on some account types are selected through these fragments.
+FRAGMENT_TYPES: Dict[str, str] = {
+    "host": "AccountWithHost",
+    "parent": "AccountWithParent",
+}
+
+HOST_FIELDS = (
+    "__typename",
+    "id",
+    "slug",
+    "name",
+    "type",
+    "isHost",
+    "description",
+    "tags",
+    "website",
+    "currency",
+    "socialLinks",
+    "balance",
+)
+COLLECTIVE_FIELDS = ("__typename", "id", "slug", "name", "type", "description", "tags", "host")
+PROJECT_FIELDS = ("__typename", "id", "slug", "name", "type", "description", "tags", "parent")
+EXISTS_FIELDS = ("id", "slug")
+IS_HOST_FIELDS = ("id", "slug", "isHost")
+
+
+def account_selection(fields: Iterable[str], indent: str = "    ") -> str:
+    """Selection-set body for an account: plain fields, then one fragment per type condition."""
+    wanted = set(fields)
+    unknown = wanted - ACCOUNT_SELECTIONS.keys()
+    if unknown:
+        raise ValueError(f"Unknown account field(s): {', '.join(sorted(unknown))}")
+    lines: list[str] = []
+    fragments: Dict[str, list[str]] = {}
+    for name, selection in ACCOUNT_SELECTIONS.items():
+        if name not in wanted:
+            continue
+        type_condition = FRAGMENT_TYPES.get(name)
+        if type_condition:
+            fragments.setdefault(type_condition, []).append(selection)
+        else:
+            lines.append(selection)
+    lines += [f"... on {t} {{ {' '.join(sels)} }}" for t, sels in fragments.items()]
+    return "\n".join(indent + line for line in lines)
+
+
+@lru_cache(maxsize=64)
+def account_query(operation: str, fields: tuple[str, ...]) -> str:
+    """``query <operation>($slug: String!) { account(slug: $slug) { ... } }`` for ``fields``."""
+    return (
+        f"query {operation}($slug: String!) {{\n"
+        "  account(slug: $slug) {\n"
+        f"{account_selection(fields)}\n"
+        "  }\n"
+        "}\n"
+    )
+
+
+@lru_cache(maxsize=64)
+def edit_account_mutation(operation: str, fields: tuple[str, ...]) -> str:
+    """``editAccount`` returning only ``fields`` of the updated account."""
+    return (
+        f"mutation {operation}($account: AccountUpdateInput!) {{\n"
+        "  editAccount(account: $account) {\n"
+        f"{account_selection(fields)}\n"
+        "  }\n"
+        "}\n"
+    )
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """Token bucket allowing ``rate`` requests per second in bursts of up to ``burst``.
+
+    Thread-safe. A client takes one token per HTTP attempt it sends, retries
+    and hedged duplicates included, so requests that are abandoned still count
+    against the budget. Callers reserve in arrival order: a token taken while
+    the bucket is empty is paid for by sleeping until it has refilled.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive.")
+        self.rate = float(rate)
+        self.burst = float(burst) if burst is not None else max(1.0, self.rate)
+        self.acquired = 0
+        self.waited = 0.0
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cost: float = 1.0, max_wait: Optional[float] = None) -> Optional[float]:
+        """Take ``cost`` tokens, sleeping while the bucket refills; returns seconds waited.
+
+        When the wait would exceed ``max_wait`` nothing is taken and None is returned.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            left = self._tokens - cost
+            wait = -left / self.rate if left < 0 else 0.0
+            if max_wait is not None and wait > max_wait:
+                return None
+            self._tokens = left
+            self.acquired += 1
+            self.waited += wait
+        if wait > 0:
+            time.sleep(wait)
+        return wait
@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Deque, Dict, Iterable, Mapping, Optional, Sequence
+
+from .money import to_cents
+from .oc_client import OpenCollectiveClient
+from .transactions import LedgerStore, iter_transactions, transaction_row
+
+# Match strength, strongest first. Each pass only sees what earlier passes left over.
+MATCH_BY_ID = "id"
+MATCH_BY_DESCRIPTION = "description"
+MATCH_BY_AMOUNT = "amount"
+
+
+@dataclass
+class LedgerEntry:
+    """One line of our books: signed cents on an account at a date."""
+
+    line: int
+    account: str
+    cents: int
+    day: date
+    description: str = ""
+    reference: Optional[str] = None
+    row: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class OCTransaction:
+    id: str
+    account: str
+    cents: int
+    day: date
+    description: str = ""
+    kind: Optional[str] = None
+    refs: tuple[str, ...] = ()
+    created_at: str = ""
+
+
+@dataclass
+class Match:
+    entry: LedgerEntry
+    transaction: OCTransaction
+    how: str
+
+
+@dataclass
+class ReconcileReport:
+    matched: list[Match] = field(default_factory=list)
+    missing: list[LedgerEntry] = field(default_factory=list)
+    unexpected: list[OCTransaction] = field(default_factory=list)
+
+    @property
+    def clean(self) -> bool:
+        return not self.missing and not self.unexpected
+
+    def records(self) -> Iterable[Dict[str, Any]]:
+        """Flat records (``result`` = matched/missing/unexpected) for NDJSON output."""
+        for m in self.matched:
+            yield {
+                "result": "matched",
+                "how": m.how,
+                "line": m.entry.line,
+                "account": m.entry.account,
+                "amountInCents": m.entry.cents,
+                "date": m.entry.day.isoformat(),
+                "description": m.entry.description,
+                "transactionId": m.transaction.id,
+                "transactionDate": m.transaction.created_at,
+            }
+        for e in self.missing:
+            yield {
+                "result": "missing",
+                "line": e.line,
+                "account": e.account,
+                "amountInCents": e.cents,
+                "date": e.day.isoformat(),
+                "description": e.description,
+            }
+        for t in self.unexpected:
+            yield {
+                "result": "unexpected",
+                "account": t.account,
+                "amountInCents": t.cents,
+                "date": t.created_at,
+                "description": t.description,
+                "kind": t.kind,
+                "transactionId": t.id,
+            }
+
+
+def _day(value: Any) -> date:
+    return date.fromisoformat(str(value).strip()[:10])
+
+
+def _norm(text: Optional[str]) -> str:
+    return " ".join(str(text or "").lower().split())
+
+
+def _first(row: Mapping[str, Any], *keys: str) -> Any:
+    for k in keys:
+        if row.get(k) not in (None, ""):
+            return row[k]
+    return None
+
+
+def ledger_entries(
+    rows: Iterable[Dict[str, Any]], *, journal_state: Optional[Dict[str, Dict[str, Any]]] = None
+) -> list[LedgerEntry]:
+    """Parse ledger rows (account/project, signed Decimal amount, date, description).
+
+    Rows may carry an OC id (``transaction_id``/``order_id``/``expense_id``) or an
+    ``idempotency_key``; keys are resolved to ids through an ``allocate``/
+    ``expenses bulk`` journal when ``journal_state`` is given.
+    """
+    entries = []
+    for n, row in enumerate(rows, start=1):
+        account = _first(row, "account", "project", "account_slug", "accountSlug")
+        when = _first(row, "date", "processedAt", "processed_at", "createdAt", "created_at")
+        if not account or when is None or _first(row, "amount") is None:
+            raise ValueError(f"Row {n}: ledger rows require account, amount and date.")
+        try:
+            cents = to_cents(row["amount"])
+            day = _day(when)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Row {n}: {e}") from e
+        reference = _first(row, "transaction_id", "transactionId", "order_id", "expense_id", "id")
+        key = _first(row, "idempotency_key", "idempotencyKey", "key")
+        if reference is None and key and journal_state:
+            reference = (journal_state.get(str(key)) or {}).get("id")
+        entries.append(
+            LedgerEntry(
+                line=n,
+                account=str(account),
+                cents=cents,
+                day=day,
+                description=str(row.get("description") or ""),
+                reference=str(reference) if reference is not None else None,
+                row=row,
+            )
+        )
+    return entries
+
+
+def oc_transaction(row: Mapping[str, Any]) -> OCTransaction:
+    """Build from a ``LedgerStore`` row or ``transaction_row()`` dict (signed by CREDIT/DEBIT)."""
+    amount = abs(int(row["amount_cents"]))
+    cents = amount if str(row["type"] or "").upper() == "CREDIT" else -amount
+    refs = tuple(
+        str(row[k]) for k in ("id", "order_id", "expense_id") if k in row.keys() and row[k]
+    )
+    return OCTransaction(
+        id=str(row["id"]),
+        account=str(row["account"]),
+        cents=cents,
+        day=_day(row["created_at"]),
+        description=str(row["description"] or ""),
+        kind=row["kind"],
+        refs=refs,
+        created_at=str(row["created_at"]),
+    )
+
+
+def _window(day: date, days: int) -> list[date]:
+    """Candidate days nearest-first: d, d-1, d+1, d-2, d+2, ..."""
+    out = [day]
+    for i in range(1, days + 1):
+        out += [day - timedelta(days=i), day + timedelta(days=i)]
+    return out
+
+
+def _take(bucket: Optional[Deque[OCTransaction]], used: set[str]) -> Optional[OCTransaction]:
+    while bucket:
+        tx = bucket.popleft()
+        if tx.id not in used:
+            return tx
+    return None
+
+
+def reconcile(
+    entries: Sequence[LedgerEntry],
+    transactions: Iterable[OCTransaction],
+    *,
+    window_days: int = 3,
+) -> ReconcileReport:
+    """Match ledger entries to OC transactions in O(n) using hash-indexed keys.
+
+    Three passes, strongest first: OC id (transaction/order/expense) on the same
+    account and amount; (account, cents, day, description) within
+    ``window_days``; then (account, cents, day) within the window. Each lookup
+    probes at most ``2 * window_days + 1`` buckets, and each transaction is
+    consumed at most once, so the cost is linear in rows for a fixed window.
+    """
+    by_ref: Dict[tuple, Deque[OCTransaction]] = defaultdict(deque)
+    by_desc: Dict[tuple, Deque[OCTransaction]] = defaultdict(deque)
+    by_amount: Dict[tuple, Deque[OCTransaction]] = defaultdict(deque)
+    ordered: list[OCTransaction] = []
+    for tx in transactions:
+        ordered.append(tx)
+        for ref in tx.refs:
+            by_ref[(ref, tx.account, tx.cents)].append(tx)
+        by_desc[(tx.account, tx.cents, tx.day, _norm(tx.description))].append(tx)
+        by_amount[(tx.account, tx.cents, tx.day)].append(tx)
+
+    report = ReconcileReport()
+    used: set[str] = set()
+    pending: list[LedgerEntry] = []
+    for entry in entries:
+        tx = None
+        if entry.reference:
+            tx = _take(by_ref.get((entry.reference, entry.account, entry.cents)), used)
+        if tx is None:
+            pending.append(entry)
+            continue
+        used.add(tx.id)
+        report.matched.append(Match(entry, tx, MATCH_BY_ID))
+
+    for how, index, key_of in (
+        (MATCH_BY_DESCRIPTION, by_desc, lambda e, d: (e.account, e.cents, d, _norm(e.description))),
+        (MATCH_BY_AMOUNT, by_amount, lambda e, d: (e.account, e.cents, d)),
+    ):
+        still_pending = []
+        for entry in pending:
+            tx = None
+            for day in _window(entry.day, window_days):
+                tx = _take(index.get(key_of(entry, day)), used)
+                if tx is not None:
+                    break
+            if tx is None:
+                still_pending.append(entry)
+                continue
+            used.add(tx.id)
+            report.matched.append(Match(entry, tx, how))
+        pending = still_pending
+
+    report.missing = pending
+    report.unexpected = [tx for tx in ordered if tx.id not in used]
+    report.matched.sort(key=lambda m: m.entry.line)
+    return report
+
+
+def load_oc_transactions(
+    entries: Sequence[LedgerEntry],
+    *,
+    store: Optional[LedgerStore] = None,
+    client: Optional[OpenCollectiveClient] = None,
+    window_days: int = 3,
+    kinds: Optional[Iterable[str]] = None,
+) -> list[OCTransaction]:
+    """Fetch OC transactions for the ledger's accounts and date span (plus the window).
+
+    Reads from a synced ``store`` when given, otherwise live through ``client``.
+    """
+    if not entries:
+        return []
+    if store is None and client is None:
+        raise ValueError("Pass a LedgerStore or an OpenCollectiveClient.")
+    date_from = (min(e.day for e in entries) - timedelta(days=window_days)).isoformat()
+    date_to = (max(e.day for e in entries) + timedelta(days=window_days + 1)).isoformat()
+    wanted_kinds = {k.upper() for k in kinds or []}
+
+    out: list[OCTransaction] = []
+    for account in dict.fromkeys(e.account for e in entries):
+        if store is not None:
+            rows: Iterable[Mapping[str, Any]] = store.iter_transactions(
+                account, date_from=date_from, date_to=date_to
+            )
+        else:
+            rows = (
+                transaction_row(node, account)
+                for page in iter_transactions(client, account, date_from=date_from, date_to=date_to)
+                for node in page
+            )
+        for row in rows:
+            if wanted_kinds and str(row["kind"] or "").upper() not in wanted_kinds:
+                continue
+            out.append(oc_transaction(row))
+    return out
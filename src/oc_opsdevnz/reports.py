@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, Optional, Sequence
+
+from .transactions import LedgerStore
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    import numpy as np
+
+# Ledger categories; transactions map onto these by kind (see ``_LEDGER_ROWS_SQL``).
+CATEGORIES = ("income", "expenses", "allocations", "other")
+
+
+def _require_numpy():
+    try:
+        import numpy as np
+    except ImportError as e:  # pragma: no cover - depends on environment
+        raise RuntimeError(
+            "Rollups need NumPy; install with `pip install oc-opsdevnz[reports]`."
+        ) from e
+    return np
+
+
+@dataclass
+class LedgerArrays:
+    """Columnar rows: categorical codes into ``slugs``/``months``/``categories``, int64 cents."""
+
+    slugs: list[str]
+    months: list[str]
+    categories: list[str]
+    slug_codes: "np.ndarray"
+    month_codes: "np.ndarray"
+    category_codes: "np.ndarray"
+    cents: "np.ndarray"
+
+    def __len__(self) -> int:
+        return int(self.cents.shape[0])
+
+
+@dataclass
+class Rollup:
+    """Dense (slug, month, category) grids of summed cents and row counts."""
+
+    slugs: list[str]
+    months: list[str]
+    categories: list[str]
+    sums: "np.ndarray"  # int64 [slug, month, category]
+    counts: "np.ndarray"  # int64 [slug, month, category]
+    net: "np.ndarray"  # int64 [slug, month]
+    balance: "np.ndarray"  # int64 [slug, month], running total of net over months
+
+    def records(self, *, include_empty: bool = False) -> Iterator[Dict[str, Any]]:
+        """Flat per-(slug, month) records for CSV/JSON output."""
+        counts_any = self.counts.sum(axis=2)
+        for s, slug in enumerate(self.slugs):
+            for m, month in enumerate(self.months):
+                if not include_empty and counts_any[s, m] == 0:
+                    continue
+                record: Dict[str, Any] = {"slug": slug, "month": month}
+                for c, category in enumerate(self.categories):
+                    record[f"{category}Cents"] = int(self.sums[s, m, c])
+                    record[f"{category}Count"] = int(self.counts[s, m, c])
+                record["netCents"] = int(self.net[s, m])
+                record["balanceCents"] = int(self.balance[s, m])
+                yield record
+
+    @property
+    def fields(self) -> list[str]:
+        fields = ["slug", "month"]
+        for category in self.categories:
+            fields += [f"{category}Cents", f"{category}Count"]
+        return fields + ["netCents", "balanceCents"]
+
+
+def build_arrays(
+    slugs: Sequence[str],
+    months: Sequence[str],
+    categories: Sequence[str],
+    cents: Sequence[int],
+    *,
+    category_order: Sequence[str] = (),
+) -> LedgerArrays:
+    """Encode parallel columns as categorical int codes plus an int64 cents array."""
+    np = _require_numpy()
+    slug_values, slug_codes = _encode(np, slugs)
+    month_values, month_codes = _encode(np, months)
+    category_values, category_codes = _encode(np, categories, order=category_order)
+    return LedgerArrays(
+        slugs=slug_values,
+        months=month_values,
+        categories=category_values,
+        slug_codes=slug_codes,
+        month_codes=month_codes,
+        category_codes=category_codes,
+        cents=np.asarray(cents, dtype=np.int64),
+    )
+
+
+def _encode(np, values: Sequence[str], *, order: Sequence[str] = ()) -> tuple[list[str], Any]:
+    """Categorical-encode strings: hash once per row, then relabel codes in sorted order.
+
+    ``np.unique`` on object arrays sorts with Python comparisons, which dominates
+    the load for large ledgers; a dict lookup plus an int permutation does not.
+    """
+    seen: Dict[str, int] = {}
+    codes = np.fromiter(
+        (seen.setdefault(v, len(seen)) for v in values), dtype=np.int64, count=len(values)
+    )
+    labels = list(order) + sorted(set(seen) - set(order))
+    remap = np.empty(len(seen), dtype=np.int64)
+    for new_code, label in enumerate(labels):
+        if label in seen:
+            remap[seen[label]] = new_code
+    return labels, remap[codes] if len(seen) else codes
+
+
+def rollup(arrays: LedgerArrays) -> Rollup:
+    """Grouped sums/counts and running balances without a Python-level loop over rows.
+
+    Rows are grouped by a flattened (slug, month, category) index; sorting that
+    index and reducing contiguous runs with ``np.add.reduceat`` keeps sums in
+    exact int64 (``np.bincount`` would round-trip through float64).
+    """
+    np = _require_numpy()
+    n_slugs, n_months, n_cats = len(arrays.slugs), len(arrays.months), len(arrays.categories)
+    sums = np.zeros((n_slugs, n_months, n_cats), dtype=np.int64)
+    counts = np.zeros_like(sums)
+
+    if len(arrays):
+        flat = (arrays.slug_codes * n_months + arrays.month_codes) * n_cats + arrays.category_codes
+        order = np.argsort(flat, kind="stable")
+        sorted_flat = flat[order]
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(sorted_flat)) + 1))
+        group_ids = sorted_flat[starts]
+        sums.reshape(-1)[group_ids] = np.add.reduceat(arrays.cents[order], starts)
+        counts.reshape(-1)[group_ids] = np.diff(np.append(starts, sorted_flat.shape[0]))
+
+    net = sums.sum(axis=2)
+    balance = np.cumsum(net, axis=1)
+    return Rollup(
+        slugs=arrays.slugs,
+        months=arrays.months,
+        categories=arrays.categories,
+        sums=sums,
+        counts=counts,
+        net=net,
+        balance=balance,
+    )
+
+
+_LEDGER_ROWS_SQL = """
+SELECT
+  account,
+  substr(created_at, 1, 7) AS month,
+  CASE upper(coalesce(kind, ''))
+    WHEN 'CONTRIBUTION' THEN 'income'
+    WHEN 'EXPENSE' THEN 'expenses'
+    WHEN 'ADDED_FUNDS' THEN 'allocations'
+    ELSE 'other'
+  END AS category,
+  CASE upper(coalesce(type, '')) WHEN 'CREDIT' THEN abs(amount_cents) ELSE -abs(amount_cents) END
+FROM transactions
+"""
+
+
+def ledger_arrays(
+    store: LedgerStore,
+    *,
+    accounts: Optional[Iterable[str]] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+) -> LedgerArrays:
+    """Load synced transactions as signed cents (CREDIT positive, DEBIT negative).
+
+    Categorisation and signing happen in SQLite, so Python only transposes the
+    result columns before handing them to NumPy.
+    """
+    clauses: list[str] = []
+    params: list[Any] = []
+    wanted = list(dict.fromkeys(accounts or []))
+    if wanted:
+        clauses.append(f"account IN ({','.join('?' * len(wanted))})")
+        params.extend(wanted)
+    if date_from:
+        clauses.append("created_at >= ?")
+        params.append(date_from)
+    if date_to:
+        clauses.append("created_at < ?")
+        params.append(date_to)
+    sql = _LEDGER_ROWS_SQL + (f" WHERE {' AND '.join(clauses)}" if clauses else "")
+    rows = store.query(sql, params)
+    columns = list(zip(*rows, strict=True)) if rows else [(), (), (), ()]
+    return build_arrays(*columns, category_order=CATEGORIES)
+
+
+def expense_arrays(
+    expenses: Iterable[Dict[str, Any]], *, account: Optional[str] = None
+) -> LedgerArrays:
+    """Load expense nodes (as streamed by ``iter_expenses``/``expenses list``) grouped by status.
+
+    Categories are lower-cased expense statuses; ``net``/``balance`` then total
+    every status, so read the per-status columns for paid vs outstanding.
+    """
+    slugs: list[str] = []
+    months: list[str] = []
+    categories: list[str] = []
+    cents: list[int] = []
+    for node in expenses:
+        slug = (node.get("account") or {}).get("slug") or node.get("accountSlug") or account
+        amount = node.get("amount")
+        value = (
+            amount.get("valueInCents") if isinstance(amount, dict) else node.get("amountInCents")
+        )
+        slugs.append(slug or "")
+        months.append(str(node.get("createdAt") or "")[:7])
+        categories.append(str(node.get("status") or "UNKNOWN").lower())
+        cents.append(int(value or 0))
+    return build_arrays(slugs, months, categories, cents)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import atexit
+import queue
+import re
+import sys
+import threading
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, TextIO
+
+from . import codec
+
+_OPERATION_RE = re.compile(r"^\s*(query|mutation|subscription)\b\s*([_A-Za-z][_0-9A-Za-z]*)?")
+_STOP = object()
+
+
+@lru_cache(maxsize=256)
+def operation_name(query: str) -> str:
+    """Name of a GraphQL document's operation (``anonymous`` when unnamed), parsed once per text."""
+    match = _OPERATION_RE.match(query)
+    if match is None:
+        return "anonymous"
+    return match.group(2) or "anonymous"
+
+
+class RequestLog:
+    """Non-blocking JSON-lines sink for per-request records.
+
+    ``emit()`` only enqueues, so worker threads never wait on the file; a single
+    writer thread drains whatever has queued up into one write and flushes when
+    the queue runs dry. Records are written as given: callers must keep token
+    values out of them.
+    """
+
+    def __init__(self, fp: TextIO, *, close_fp: bool = False):
+        self.fp = fp
+        self._close_fp = close_fp
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._drain, name="oc-request-log", daemon=True)
+        self._closed = False
+        self._thread.start()
+        atexit.register(self.close)
+
+    @classmethod
+    def open(cls, target: str = "-") -> "RequestLog":
+        """``-`` logs to stderr; anything else is a path appended to."""
+        if target == "-":
+            return cls(sys.stderr)
+        return cls(open(target, "a", encoding="utf-8"), close_fp=True)
+
+    def emit(self, record: Dict[str, Any]) -> None:
+        if not self._closed:
+            self._queue.put({"ts": datetime.now(timezone.utc).isoformat(), **record})
+
+    def _drain(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(r is _STOP for r in batch)
+            lines = [codec.dumps(r) for r in batch if r is not _STOP]
+            if lines:
+                self.fp.write("\n".join(lines) + "\n")
+            self.fp.flush()
+            if stop:
+                return
+
+    def close(self) -> None:
+        """Write everything queued so far and stop the writer thread (idempotent)."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        if self._close_fp:
+            self.fp.close()
+        atexit.unregister(self.close)
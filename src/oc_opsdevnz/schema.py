@@ -0,0 +1,440 @@
+from __future__ import annotations
+
+import importlib
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping, Optional
+from urllib.parse import urlparse
+
+from . import codec
+from .gql import (
+    Document,
+    EnumValue,
+    Field,
+    FragmentSpread,
+    GraphQLSyntaxError,
+    InlineFragment,
+    Selection,
+    Variable,
+    VariableDefinition,
+    parse,
+)
+from .oc_client import PROD_URL, STAGING_URL, OpenCollectiveClient
+
+INTROSPECTION_QUERY = """
+query Introspection {
+  __schema {
+    queryType { name }
+    mutationType { name }
+    types {
+      kind
+      name
+      fields(includeDeprecated: true) {
+        name
+        args { name defaultValue type { ...TypeRef } }
+        type { ...TypeRef }
+      }
+      inputFields { name defaultValue type { ...TypeRef } }
+      possibleTypes { name }
+      enumValues(includeDeprecated: true) { name }
+    }
+  }
+}
+
+fragment TypeRef on __Type {
+  kind
+  name
+  ofType {
+    kind
+    name
+    ofType {
+      kind
+      name
+      ofType { kind name ofType { kind name ofType { kind name ofType { kind name } } } }
+    }
+  }
+}
+"""
+
+# Modules whose Q_*/MUTATION_* constants are checked up front by ``builtin_documents``.
+DOCUMENT_MODULES = ("operations", "expenses", "funds", "balances", "transactions", "reconcile")
+
+_COMPOSITE = ("OBJECT", "INTERFACE", "UNION")
+_INPUT = ("SCALAR", "ENUM", "INPUT_OBJECT")
+_BUILTIN_SCALARS: Dict[str, tuple[type, ...]] = {
+    "String": (str,),
+    "ID": (str, int),
+    "Int": (int,),
+    "Float": (int, float),
+    "Boolean": (bool,),
+}
+
+
+class QueryValidationError(ValueError):
+    """A document or its variables do not fit the cached schema; ``problems`` lists why."""
+
+    def __init__(self, operation: str, problems: Iterable[str]):
+        self.problems = list(problems)
+        super().__init__(f"{operation} failed schema validation: " + "; ".join(self.problems))
+
+
+@dataclass
+class InputValue:
+    name: str
+    type: str
+    has_default: bool = False
+
+
+@dataclass
+class FieldInfo:
+    name: str
+    type: str
+    args: Dict[str, InputValue] = field(default_factory=dict)
+
+
+@dataclass
+class TypeInfo:
+    kind: str
+    name: str
+    fields: Dict[str, FieldInfo] = field(default_factory=dict)
+    input_fields: Dict[str, InputValue] = field(default_factory=dict)
+    possible_types: frozenset[str] = frozenset()
+    enum_values: frozenset[str] = frozenset()
+
+
+def _type_str(ref: Mapping[str, Any]) -> str:
+    if ref["kind"] == "NON_NULL":
+        return _type_str(ref["ofType"]) + "!"
+    if ref["kind"] == "LIST":
+        return f"[{_type_str(ref['ofType'])}]"
+    return ref["name"]
+
+
+def _named(type_str: str) -> str:
+    return type_str.strip("[]!")
+
+
+def _input_value(raw: Mapping[str, Any]) -> InputValue:
+    return InputValue(raw["name"], _type_str(raw["type"]), raw.get("defaultValue") is not None)
+
+
+class Schema:
+    """The parts of an introspected schema that document validation needs."""
+
+    def __init__(self, introspection: Mapping[str, Any]):
+        self.raw = dict(introspection)
+        self.query_type = (introspection.get("queryType") or {}).get("name")
+        self.mutation_type = (introspection.get("mutationType") or {}).get("name")
+        self.types: Dict[str, TypeInfo] = {}
+        for raw in introspection.get("types") or []:
+            info = TypeInfo(kind=raw["kind"], name=raw["name"])
+            for f in raw.get("fields") or []:
+                args = {a["name"]: _input_value(a) for a in f.get("args") or []}
+                info.fields[f["name"]] = FieldInfo(f["name"], _type_str(f["type"]), args)
+            info.input_fields = {v["name"]: _input_value(v) for v in raw.get("inputFields") or []}
+            info.possible_types = frozenset(t["name"] for t in raw.get("possibleTypes") or [])
+            info.enum_values = frozenset(v["name"] for v in raw.get("enumValues") or [])
+            self.types[info.name] = info
+
+    def root(self, kind: str) -> Optional[str]:
+        return self.mutation_type if kind == "mutation" else self.query_type
+
+
+def environment_name(api_url: str) -> str:
+    """``prod``/``staging`` for the OpenCollective endpoints, else a filename-safe host/path."""
+    url = api_url.rstrip("/")
+    if url == PROD_URL.rstrip("/"):
+        return "prod"
+    if url == STAGING_URL.rstrip("/"):
+        return "staging"
+    parsed = urlparse(url)
+    return re.sub(r"[^A-Za-z0-9.-]+", "_", f"{parsed.netloc}{parsed.path}").strip("_")
+
+
+def default_cache_dir() -> Path:
+    base = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "oc-opsdevnz"
+
+
+def schema_path(api_url: str, cache_dir: Optional[Path | str] = None) -> Path:
+    return Path(cache_dir or default_cache_dir()) / "schema" / f"{environment_name(api_url)}.json"
+
+
+def fetch_schema(client: OpenCollectiveClient) -> Dict[str, Any]:
+    """Introspect ``client``'s endpoint; returns the raw ``__schema`` object."""
+    return client.graphql(INTROSPECTION_QUERY)["__schema"]
+
+
+def save_schema(
+    api_url: str, introspection: Mapping[str, Any], cache_dir: Optional[Path | str] = None
+) -> Path:
+    path = schema_path(api_url, cache_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    doc = {
+        "api_url": api_url,
+        "fetched_at": datetime.now(timezone.utc).isoformat(),
+        "schema": introspection,
+    }
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(codec.dumpb(doc))
+    os.replace(tmp, path)
+    return path
+
+
+def load_schema(api_url: str, cache_dir: Optional[Path | str] = None) -> Optional[Schema]:
+    path = schema_path(api_url, cache_dir)
+    if not path.exists():
+        return None
+    return Schema(codec.loads(path.read_bytes())["schema"])
+
+
+def builtin_documents() -> Dict[str, str]:
+    """Every static query/mutation this package sends, keyed by ``module.CONSTANT``."""
+    found: Dict[str, str] = {}
+    for module_name in DOCUMENT_MODULES:
+        module = importlib.import_module(f"{__package__}.{module_name}")
+        for attr, value in vars(module).items():
+            if not (attr.startswith(("Q_", "MUTATION_")) and isinstance(value, str)):
+                continue
+            if value.lstrip().startswith(("query", "mutation")):
+                found[f"{module_name}.{attr}"] = value
+    return found
+
+
+def _allowed(var_type: str, location: str, has_default: bool) -> bool:
+    """GraphQL's "variables in allowed position" rule."""
+    if location.endswith("!") and not var_type.endswith("!"):
+        if not has_default:
+            return False
+        location = location[:-1]
+    if var_type.endswith("!"):
+        var_type = var_type[:-1]
+        location = location.rstrip("!")
+    if var_type.startswith("[") != location.startswith("["):
+        return False
+    if var_type.startswith("["):
+        return _allowed(var_type[1:-1], location[1:-1], False)
+    return var_type == location
+
+
+class _DocumentCheck:
+    def __init__(self, schema: Schema, doc: Document):
+        self.schema = schema
+        self.doc = doc
+        self.problems: list[str] = []
+        self.variables: Dict[str, VariableDefinition] = {}
+        self.used: set[str] = set()
+
+    def run(self) -> list[str]:
+        for op in self.doc.operations:
+            label = op.name or "anonymous"
+            root = self.schema.root(op.kind)
+            if root is None or root not in self.schema.types:
+                self.problems.append(f"{label}: schema has no {op.kind} type")
+                continue
+            self.variables, self.used = op.variables, set()
+            for name, definition in op.variables.items():
+                info = self.schema.types.get(_named(definition.type))
+                if info is None or info.kind not in _INPUT:
+                    self.problems.append(f"${name}: '{definition.type}' is not an input type")
+            self.selections(root, op.selections, label, set())
+            for name in op.variables.keys() - self.used:
+                self.problems.append(f"${name} is declared but never used")
+        return self.problems
+
+    def selections(self, type_name: str, selections: list[Selection], path: str, seen: set[str]):
+        info = self.schema.types[type_name]
+        for sel in selections:
+            if isinstance(sel, Field):
+                self.field(info, sel, f"{path}.{sel.response_key}", seen)
+            elif isinstance(sel, InlineFragment):
+                self.fragment(sel.type_condition or type_name, sel.selections, path, seen)
+            elif isinstance(sel, FragmentSpread):
+                fragment = self.doc.fragments.get(sel.name)
+                if fragment is None:
+                    self.problems.append(f"{path}: unknown fragment '{sel.name}'")
+                elif sel.name not in seen:
+                    self.fragment(
+                        fragment.type_condition, fragment.selections, path, seen | {sel.name}
+                    )
+
+    def fragment(self, type_name: str, selections: list[Selection], path: str, seen: set[str]):
+        info = self.schema.types.get(type_name)
+        if info is None or info.kind not in _COMPOSITE:
+            self.problems.append(f"{path}: unknown fragment type '{type_name}'")
+            return
+        self.selections(type_name, selections, path, seen)
+
+    def field(self, parent: TypeInfo, f: Field, path: str, seen: set[str]) -> None:
+        if f.name == "__typename":
+            return
+        if f.name in ("__schema", "__type") and parent.name == self.schema.query_type:
+            return
+        info = parent.fields.get(f.name)
+        if info is None:
+            self.problems.append(f"{path}: no field '{f.name}' on type '{parent.name}'")
+            return
+        for arg_name, value in f.arguments.items():
+            arg = info.args.get(arg_name)
+            if arg is None:
+                self.problems.append(f"{path}: unknown argument '{arg_name}'")
+            else:
+                self.value(value, arg.type, f"{path}({arg_name})")
+        for arg in info.args.values():
+            if arg.type.endswith("!") and not arg.has_default and arg.name not in f.arguments:
+                self.problems.append(f"{path}: missing required argument '{arg.name}'")
+        target = self.schema.types.get(_named(info.type))
+        composite = target is not None and target.kind in _COMPOSITE
+        if composite and not f.selections:
+            self.problems.append(f"{path}: '{target.name}' needs a selection set")
+        elif f.selections and not composite:
+            self.problems.append(f"{path}: '{info.type}' has no fields to select")
+        elif composite:
+            self.selections(target.name, f.selections, path, seen)
+
+    def value(self, value: Any, type_str: str, path: str) -> None:
+        if isinstance(value, Variable):
+            self.used.add(value.name)
+            definition = self.variables.get(value.name)
+            if definition is None:
+                self.problems.append(f"{path}: ${value.name} is not declared")
+            elif not _allowed(definition.type, type_str, definition.default is not None):
+                self.problems.append(
+                    f"{path}: ${value.name} is {definition.type}, expected {type_str}"
+                )
+            return
+        if value is None:
+            if type_str.endswith("!"):
+                self.problems.append(f"{path}: null for non-null {type_str}")
+            return
+        inner = type_str.rstrip("!")
+        if inner.startswith("["):
+            for item in value if isinstance(value, list) else [value]:
+                self.value(item, inner[1:-1], path)
+            return
+        info = self.schema.types.get(inner)
+        if info is None:
+            return
+        if info.kind == "INPUT_OBJECT":
+            if not isinstance(value, dict):
+                self.problems.append(f"{path}: expected an {inner} object")
+                return
+            for key, item in value.items():
+                spec = info.input_fields.get(key)
+                if spec is None:
+                    self.problems.append(f"{path}: no field '{key}' on input {inner}")
+                else:
+                    self.value(item, spec.type, f"{path}.{key}")
+            for spec in info.input_fields.values():
+                if spec.type.endswith("!") and not spec.has_default and spec.name not in value:
+                    self.problems.append(f"{path}: missing required field '{spec.name}'")
+        elif info.kind == "ENUM":
+            if not isinstance(value, EnumValue) or str(value) not in info.enum_values:
+                self.problems.append(f"{path}: {value!r} is not a {inner} value")
+
+
+def _input_problems(schema: Schema, value: Any, type_str: str, path: str) -> list[str]:
+    """Check a JSON variable value against its declared input type."""
+    if value is None:
+        return [f"{path}: null for non-null {type_str}"] if type_str.endswith("!") else []
+    inner = type_str.rstrip("!")
+    if inner.startswith("["):
+        items = value if isinstance(value, (list, tuple)) else [value]
+        return [p for item in items for p in _input_problems(schema, item, inner[1:-1], path)]
+    info = schema.types.get(inner)
+    if info is None:
+        return []
+    if info.kind == "INPUT_OBJECT":
+        if not isinstance(value, Mapping):
+            return [f"{path}: expected an {inner} object, got {type(value).__name__}"]
+        problems = []
+        for key, item in value.items():
+            spec = info.input_fields.get(key)
+            if spec is None:
+                problems.append(f"{path}: no field '{key}' on input {inner}")
+            else:
+                problems += _input_problems(schema, item, spec.type, f"{path}.{key}")
+        for spec in info.input_fields.values():
+            if spec.type.endswith("!") and not spec.has_default and spec.name not in value:
+                problems.append(f"{path}: missing required field '{spec.name}'")
+        return problems
+    if info.kind == "ENUM":
+        if not isinstance(value, str):
+            return [f"{path}: expected a {inner} value, got {type(value).__name__}"]
+        if value not in info.enum_values:
+            return [f"{path}: {value!r} is not a {inner} value"]
+        return []
+    accepted = _BUILTIN_SCALARS.get(inner)
+    if accepted is None:  # custom scalar (JSON, DateTime, ...): the server decides
+        return []
+    if isinstance(value, bool) and inner != "Boolean":
+        return [f"{path}: expected {inner}, got bool"]
+    if not isinstance(value, accepted):
+        return [f"{path}: expected {inner}, got {type(value).__name__}"]
+    return []
+
+
+class Validator:
+    """Check documents and variables against a cached ``Schema`` before any request.
+
+    Document checks run once per distinct text (parses are memoized by
+    ``gql.parse`` and results here), so a repeated operation costs a dict
+    lookup plus a walk over its variables. Thread-safe.
+    """
+
+    def __init__(self, schema: Schema):
+        self.schema = schema
+        self._documents: Dict[str, tuple[str, ...]] = {}
+        self._lock = threading.Lock()
+
+    def document_problems(self, query: str) -> tuple[str, ...]:
+        with self._lock:
+            cached = self._documents.get(query)
+        if cached is not None:
+            return cached
+        try:
+            problems = tuple(_DocumentCheck(self.schema, parse(query)).run())
+        except GraphQLSyntaxError as e:
+            problems = (str(e),)
+        with self._lock:
+            self._documents[query] = problems
+        return problems
+
+    def variable_problems(self, query: str, variables: Optional[Mapping[str, Any]]) -> list[str]:
+        variables = variables or {}
+        problems = []
+        for op in parse(query).operations:
+            for name, definition in op.variables.items():
+                if name not in variables:
+                    if definition.type.endswith("!") and definition.default is None:
+                        problems.append(f"${name}: missing required {definition.type}")
+                    continue
+                problems += _input_problems(
+                    self.schema, variables[name], definition.type, f"${name}"
+                )
+        return problems
+
+    def check(self, query: str, variables: Optional[Mapping[str, Any]] = None) -> None:
+        """Raise ``QueryValidationError`` if ``query`` or ``variables`` don't fit the schema."""
+        problems = self.document_problems(query)
+        if not problems:
+            problems = tuple(self.variable_problems(query, variables))
+        if problems:
+            raise QueryValidationError(_label(query), problems)
+
+    def check_all(self, documents: Mapping[str, str]) -> Dict[str, tuple[str, ...]]:
+        """Document problems for each named document (only those with problems)."""
+        results = {name: self.document_problems(text) for name, text in documents.items()}
+        return {name: problems for name, problems in results.items() if problems}
+
+
+def _label(query: str) -> str:
+    try:
+        names = [op.name or "anonymous" for op in parse(query).operations]
+    except GraphQLSyntaxError:
+        return "document"
+    return ", ".join(names)
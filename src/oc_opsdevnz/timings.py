@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import cProfile
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, TextIO
+
+from . import codec
+
+# Reported in this order; phases that never ran are left out.
+PHASES = ("load", "validate", "prefetch", "diff", "mutate", "network", "print")
+
+
+class PhaseTimer:
+    """Accumulate wall-clock and CPU seconds per named phase."""
+
+    def __init__(self) -> None:
+        self.wall: Dict[str, float] = {}
+        self.cpu: Dict[str, float] = {}
+        self._started = (time.perf_counter(), time.process_time())
+
+    def add(self, name: str, wall: float, cpu: float = 0.0) -> None:
+        self.wall[name] = self.wall.get(name, 0.0) + wall
+        self.cpu[name] = self.cpu.get(name, 0.0) + cpu
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - wall0, time.process_time() - cpu0)
+
+    def report(self, network: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Per-phase breakdown plus totals; ``network`` is ``OpenCollectiveClient.network``."""
+        names = [p for p in PHASES if p in self.wall] + [p for p in self.wall if p not in PHASES]
+        wall = time.perf_counter() - self._started[0]
+        cpu = time.process_time() - self._started[1]
+        network = dict(network or {})
+        wait = float(network.get("query_seconds", 0.0)) + float(
+            network.get("mutation_seconds", 0.0)
+        )
+        return {
+            "phases": {
+                n: {"wall": round(self.wall[n], 6), "cpu": round(self.cpu[n], 6)} for n in names
+            },
+            "network": network,
+            "total": {
+                "wall": round(wall, 6),
+                "cpu": round(cpu, 6),
+                "network_wait": round(wait, 6),
+            },
+        }
+
+
+def write_timings(report: Dict[str, Any], target: str, *, stream: Optional[TextIO] = None) -> None:
+    """Print a readable table to stderr (``target == "-"``) or write JSON to a path."""
+    if target != "-":
+        Path(target).write_text(codec.dumps(report, indent=True) + "\n", encoding="utf-8")
+        return
+    out = stream if stream is not None else sys.stderr
+    out.write(f"{'phase':<10} {'wall s':>10} {'cpu s':>10}\n")
+    for name, t in report["phases"].items():
+        out.write(f"{name:<10} {t['wall']:>10.3f} {t['cpu']:>10.3f}\n")
+    total = report["total"]
+    out.write(f"{'total':<10} {total['wall']:>10.3f} {total['cpu']:>10.3f}\n")
+    network = report.get("network") or {}
+    out.write(
+        f"network wait {total['network_wait']:.3f}s over {network.get('requests', 0)} requests,"
+        f" local cpu {total['cpu']:.3f}s\n"
+    )
+
+
+@contextmanager
+def profiled(path: Optional[str]) -> Iterator[None]:
+    """Run the block under cProfile and dump stats to ``path`` (no-op when ``path`` is None)."""
+    if not path:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
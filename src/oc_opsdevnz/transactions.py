@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+from . import codec
+from .oc_client import OpenCollectiveClient
+
+Q_TRANSACTIONS = """
+query Transactions(
+  $slug: String!
+  $limit: Int!
+  $offset: Int!
+  $dateFrom: DateTime
+  $dateTo: DateTime
+) {
+  transactions(
+    account: { slug: $slug }
+    limit: $limit
+    offset: $offset
+    dateFrom: $dateFrom
+    dateTo: $dateTo
+    orderBy: { field: CREATED_AT, direction: ASC }
+  ) {
+    totalCount
+    nodes {
+      id
+      legacyId
+      kind
+      type
+      description
+      createdAt
+      amount { valueInCents currency }
+      netAmount { valueInCents currency }
+      account { slug }
+      oppositeAccount { slug }
+      expense { id legacyId }
+      order { id legacyId }
+    }
+  }
+}
+"""
+
+DEFAULT_PAGE_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+  id TEXT PRIMARY KEY,
+  legacy_id INTEGER,
+  account TEXT NOT NULL,
+  opposite_account TEXT,
+  kind TEXT,
+  type TEXT,
+  description TEXT,
+  created_at TEXT NOT NULL,
+  amount_cents INTEGER NOT NULL,
+  net_amount_cents INTEGER,
+  currency TEXT,
+  expense_id TEXT,
+  expense_legacy_id INTEGER,
+  order_id TEXT,
+  order_legacy_id INTEGER,
+  raw TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_transactions_account_created
+  ON transactions (account, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_transactions_created ON transactions (created_at);
+CREATE INDEX IF NOT EXISTS ix_transactions_kind ON transactions (kind);
+CREATE TABLE IF NOT EXISTS sync_state (
+  account TEXT PRIMARY KEY,
+  last_created_at TEXT NOT NULL,
+  last_id TEXT NOT NULL,
+  synced_at TEXT NOT NULL
+);
+"""
+
+# Columns added after the first ledger release: (name, type, JSON path in ``raw``).
+# Older files get them on open, backfilled from each row's stored node.
+ADDED_COLUMNS = (
+    ("expense_id", "TEXT", "$.expense.id"),
+    ("order_id", "TEXT", "$.order.id"),
+)
+
+UPSERT = """
+INSERT INTO transactions (
+  id, legacy_id, account, opposite_account, kind, type, description, created_at,
+  amount_cents, net_amount_cents, currency, expense_id, expense_legacy_id, order_id,
+  order_legacy_id, raw
+) VALUES (
+  :id, :legacy_id, :account, :opposite_account, :kind, :type, :description, :created_at,
+  :amount_cents, :net_amount_cents, :currency, :expense_id, :expense_legacy_id, :order_id,
+  :order_legacy_id, :raw
+)
+ON CONFLICT(id) DO UPDATE SET
+  legacy_id = excluded.legacy_id,
+  account = excluded.account,
+  opposite_account = excluded.opposite_account,
+  kind = excluded.kind,
+  type = excluded.type,
+  description = excluded.description,
+  created_at = excluded.created_at,
+  amount_cents = excluded.amount_cents,
+  net_amount_cents = excluded.net_amount_cents,
+  currency = excluded.currency,
+  expense_id = excluded.expense_id,
+  expense_legacy_id = excluded.expense_legacy_id,
+  order_id = excluded.order_id,
+  order_legacy_id = excluded.order_legacy_id,
+  raw = excluded.raw
+"""
+
+UPSERT_MARK = """
+INSERT INTO sync_state (account, last_created_at, last_id, synced_at) VALUES (?, ?, ?, ?)
+ON CONFLICT(account) DO UPDATE SET
+  last_created_at = excluded.last_created_at,
+  last_id = excluded.last_id,
+  synced_at = excluded.synced_at
+"""
+
+
+@dataclass
+class SyncResult:
+    account: str
+    since: Optional[str]
+    fetched: int = 0
+    inserted: int = 0
+    high_water: Optional[str] = None
+
+
+def transaction_row(node: Dict[str, Any], account: str) -> Dict[str, Any]:
+    """Flatten a transaction node into the ledger table's column shape."""
+    amount = node.get("amount") or {}
+    net = node.get("netAmount") or {}
+    expense = node.get("expense") or {}
+    order = node.get("order") or {}
+    return {
+        "id": node["id"],
+        "legacy_id": node.get("legacyId"),
+        "account": (node.get("account") or {}).get("slug") or account,
+        "opposite_account": (node.get("oppositeAccount") or {}).get("slug"),
+        "kind": node.get("kind"),
+        "type": node.get("type"),
+        "description": node.get("description"),
+        "created_at": node["createdAt"],
+        "amount_cents": int(amount.get("valueInCents") or 0),
+        "net_amount_cents": net.get("valueInCents"),
+        "currency": amount.get("currency"),
+        "expense_id": expense.get("id"),
+        "expense_legacy_id": expense.get("legacyId"),
+        "order_id": order.get("id"),
+        "order_legacy_id": order.get("legacyId"),
+        "raw": codec.dumps(node),
+    }
+
+
+class LedgerStore:
+    """Local SQLite copy of OpenCollective transactions with per-account high-water marks."""
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(transactions)")}
+        with self._conn:
+            for name, kind, path in ADDED_COLUMNS:
+                if name not in columns:
+                    self._conn.execute(f"ALTER TABLE transactions ADD COLUMN {name} {kind}")
+                    self._conn.execute(
+                        f"UPDATE transactions SET {name} = json_extract(raw, ?)", (path,)
+                    )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "LedgerStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def high_water(self, account: str) -> Optional[tuple[str, str]]:
+        row = self._conn.execute(
+            "SELECT last_created_at, last_id FROM sync_state WHERE account = ?", (account,)
+        ).fetchone()
+        return (row["last_created_at"], row["last_id"]) if row else None
+
+    def reset(self, account: str) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM sync_state WHERE account = ?", (account,))
+
+    def count(self, account: Optional[str] = None) -> int:
+        if account is None:
+            return self._conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM transactions WHERE account = ?", (account,)
+        ).fetchone()[0]
+
+    def upsert_page(self, account: str, nodes: Sequence[Dict[str, Any]]) -> int:
+        """Upsert one page and advance the account's mark in the same transaction.
+
+        Returns how many rows were new. Committing page by page means an
+        interrupted sync resumes from the last page that landed.
+        """
+        if not nodes:
+            return 0
+        rows = [transaction_row(n, account) for n in nodes]
+        last = max(rows, key=lambda r: (r["created_at"], r["id"]))
+        ids = [r["id"] for r in rows]
+        placeholders = ",".join("?" * len(ids))
+        existing = self._conn.execute(
+            f"SELECT COUNT(*) FROM transactions WHERE id IN ({placeholders})", ids
+        ).fetchone()[0]
+        with self._conn:
+            self._conn.executemany(UPSERT, rows)
+            mark = self.high_water(account)
+            if mark is None or (last["created_at"], last["id"]) > mark:
+                self._conn.execute(
+                    UPSERT_MARK,
+                    (
+                        account,
+                        last["created_at"],
+                        last["id"],
+                        datetime.now(timezone.utc).isoformat(),
+                    ),
+                )
+        return len(set(ids)) - existing
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> list[tuple]:
+        """Run a read-only query and return plain tuples (for columnar loading)."""
+        cursor = self._conn.cursor()
+        cursor.row_factory = None
+        return cursor.execute(sql, params).fetchall()
+
+    def iter_transactions(
+        self,
+        account: Optional[str] = None,
+        *,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> Iterator[sqlite3.Row]:
+        """Stream stored rows in (created_at, id) order, optionally filtered."""
+        clauses, params = [], []
+        if account:
+            clauses.append("account = ?")
+            params.append(account)
+        if date_from:
+            clauses.append("created_at >= ?")
+            params.append(date_from)
+        if date_to:
+            clauses.append("created_at < ?")
+            params.append(date_to)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        yield from self._conn.execute(
+            f"SELECT * FROM transactions {where} ORDER BY created_at, id", params
+        )
+
+
+def iter_transactions(
+    client: OpenCollectiveClient,
+    slug: str,
+    *,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> Iterator[list[Dict[str, Any]]]:
+    """Yield pages of an account's transactions in [date_from, date_to), oldest first."""
+    variables = {"slug": slug, "limit": page_size, "dateFrom": date_from, "dateTo": date_to}
+    offset = 0
+    while True:
+        data = client.graphql(Q_TRANSACTIONS, {**variables, "offset": offset})
+        page = data.get("transactions") or {}
+        nodes = page.get("nodes") or []
+        if nodes:
+            yield nodes
+        offset += len(nodes)
+        total = page.get("totalCount")
+        if len(nodes) < page_size or (total is not None and offset >= total):
+            return
+
+
+def sync_transactions(
+    client: OpenCollectiveClient,
+    store: LedgerStore,
+    slug: str,
+    *,
+    full: bool = False,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> SyncResult:
+    """Pull an account's transactions newer than its stored mark into ``store``.
+
+    The query starts at the mark's ``createdAt`` (inclusive) so rows sharing
+    that timestamp are re-read and upserted rather than skipped; everything
+    older never leaves the server.
+    """
+    if full:
+        store.reset(slug)
+    mark = store.high_water(slug)
+    since = mark[0] if mark else None
+    result = SyncResult(account=slug, since=since)
+    for nodes in iter_transactions(client, slug, date_from=since, page_size=page_size):
+        result.fetched += len(nodes)
+        result.inserted += store.upsert_page(slug, nodes)
+    new_mark = store.high_water(slug)
+    result.high_water = new_mark[0] if new_mark else None
+    return result
@@ -0,0 +1,89 @@
+import json
+import re
+
+import respx
+from httpx import Response
+
+from oc_opsdevnz import OpenCollectiveClient
+from oc_opsdevnz.balances import fetch_balances, iter_hosted_balances
+
+
+def _account(slug: str, cents: int) -> dict:
+    return {
+        "slug": slug,
+        "name": slug.title(),
+        "stats": {"balance": {"valueInCents": cents, "currency": "NZD"}},
+    }
+
+
+@respx.mock
+def test_fetch_balances_chunks_aliased_queries():
+    requests = []
+
+    def _handler(request):
+        payload = json.loads(request.content)
+        requests.append(payload)
+        data = {}
+        for alias in re.findall(r"(b\d+): account", payload["query"]):
+            slug = payload["variables"]["s" + alias[1:]]
+            data[alias] = _account(slug, int(slug.split("-")[-1]) * 100)
+        return Response(200, json={"data": data})
+
+    respx.post().mock(side_effect=_handler)
+
+    client = OpenCollectiveClient(token="t")
+    slugs = [f"example-project-{n}" for n in range(250)]
+    balances = fetch_balances(client, slugs, chunk_size=100, concurrency=2)
+
+    assert len(requests) == 3
+    assert list(balances) == slugs
+    assert balances["example-project-249"].value_in_cents == 24900
+    assert balances["example-project-249"].currency == "NZD"
+    client.close()
+
+
+@respx.mock
+def test_fetch_balances_keeps_partial_results_for_unknown_slugs():
+    respx.post().mock(
+        return_value=Response(
+            200,
+            json={
+                "errors": [{"message": "No account found with slug missing", "path": ["b1"]}],
+                "data": {"b0": _account("example-host", 500), "b1": None},
+            },
+        )
+    )
+
+    client = OpenCollectiveClient(token="t")
+    balances = fetch_balances(client, ["example-host", "missing"])
+
+    assert balances["example-host"].value_in_cents == 500
+    assert balances["missing"].found is False
+    assert balances["missing"].as_record()["valueInCents"] is None
+    client.close()
+
+
+@respx.mock
+def test_iter_hosted_balances_pages_through_host():
+    def _handler(request):
+        offset = json.loads(request.content)["variables"]["offset"]
+        nodes = [_account(f"example-project-{n}", n) for n in range(offset, min(offset + 2, 3))]
+        return Response(
+            200,
+            json={
+                "data": {
+                    "account": {
+                        "slug": "example-host",
+                        "hostedAccounts": {"totalCount": 3, "nodes": nodes},
+                    }
+                }
+            },
+        )
+
+    respx.post().mock(side_effect=_handler)
+
+    client = OpenCollectiveClient(token="t")
+    balances = list(iter_hosted_balances(client, "example-host", page_size=2))
+
+    assert [b.slug for b in balances] == [f"example-project-{n}" for n in range(3)]
+    client.close()
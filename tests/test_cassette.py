@@ -0,0 +1,60 @@
+import gzip
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from oc_opsdevnz import OpenCollectiveClient
+from oc_opsdevnz.cassette import CassetteMiss, RecordingTransport, ReplayTransport
+from oc_opsdevnz.fake_oc import FakeOpenCollective, FakeTransport
+from oc_opsdevnz.operations import upsert_collective
+
+API = "http://fake.local/graphql/v2"
+ITEM = {"name": "Example Collective", "slug": "example-collective", "description": "d"}
+
+
+def _record(path: Path, token: str) -> dict:
+    fake = FakeOpenCollective()
+    transport = RecordingTransport(path, FakeTransport(fake))
+    client = OpenCollectiveClient(api_url=API, token=token, transport=transport)
+    result = upsert_collective(client, ITEM)
+    client.graphql(
+        'query Echo { account(slug: "example-collective") { id } }', idempotency_key="k-1"
+    )
+    transport.close()
+    return result.account
+
+
+def test_record_redacts_tokens_and_replays(tmp_path: Path):
+    path = tmp_path / "run.cassette.jsonl"
+    recorded_account = _record(path, "sekret-token-value")
+
+    text = path.read_text()
+    assert "sekret-token-value" not in text
+    header, *entries = (json.loads(line) for line in text.splitlines())
+    assert header["cassette"] == 1
+    assert entries[0]["request"]["headers"]["personal-token"] == "***REDACTED***"
+    assert entries[-1]["request"]["headers"]["idempotency-key"] == "k-1"
+
+    replay = ReplayTransport(path)
+    client = OpenCollectiveClient(api_url=API, token="another-token", transport=replay)
+    assert upsert_collective(client, ITEM).account == recorded_account
+    assert replay.remaining == 1
+
+    with pytest.raises(CassetteMiss):
+        client.graphql('query Other { account(slug: "x") { id } }', retry=0)
+
+
+def test_replay_scales_recorded_timings(tmp_path: Path):
+    path = tmp_path / "run.cassette.jsonl.gz"
+    _record(path, "sekret-token-value")
+    with gzip.open(path, "rt") as fp:
+        durations = [json.loads(line)["d"] for line in list(fp)[1:]]
+
+    client = OpenCollectiveClient(
+        api_url=API, token="t0k3n", transport=ReplayTransport(path, speed=0.5)
+    )
+    with patch("oc_opsdevnz.cassette.time.sleep") as sleep:
+        upsert_collective(client, ITEM)
+    assert [c.args[0] for c in sleep.call_args_list] == [d * 0.5 for d in durations[:-1]]
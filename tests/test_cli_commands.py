@@ -1,10 +1,13 @@
+import json
 from pathlib import Path
 from types import SimpleNamespace
 
+import pytest
 import respx
 from httpx import Response
 
 from oc_opsdevnz.cli import cmd_collectives, cmd_hosts, cmd_projects, cmd_whoami
+from oc_opsdevnz.deadline import Deadline
 
 
 def _args(file: Path) -> SimpleNamespace:
@@ -229,3 +232,96 @@ def test_cmd_whoami_prints_account(tmp_path: Path):
 def test_cmd_hosts_missing_file_returns_error(tmp_path: Path):
     args = _args(tmp_path / "does-not-exist.yaml")
     assert cmd_hosts(args) == 2
+
+
+def _host_responses():
+    return [
+        Response(200, json={"data": {"account": None}}),
+        Response(
+            200,
+            json={
+                "data": {
+                    "createOrganization": {
+                        "id": "org1",
+                        "slug": "example-org",
+                        "name": "Example Org",
+                        "type": "ORGANIZATION",
+                    }
+                }
+            },
+        ),
+        Response(
+            200, json={"data": {"editAccount": {"id": "org1", "slug": "example-org", "tags": []}}}
+        ),
+    ]
+
+
+@respx.mock
+def test_cmd_hosts_ndjson_output(tmp_path: Path, capsys):
+    respx.post("http://localhost:8765/graphql/v2").mock(side_effect=_host_responses())
+    path = tmp_path / "hosts.yaml"
+    path.write_text("- name: Example Org\n  slug: example-org\n  description: d\n")
+    args = _args(path)
+    args.output = "ndjson"
+    assert cmd_hosts(args) == 0
+
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1
+    record = json.loads(lines[0])
+    assert record["kind"] == "host"
+    assert record["slug"] == "example-org"
+    assert record["created"] is True
+    assert record["account"]["id"] == "org1"
+
+
+@respx.mock
+def test_cmd_hosts_summary_output_counts_failures(tmp_path: Path, capsys):
+    respx.post("http://localhost:8765/graphql/v2").mock(side_effect=_host_responses())
+    path = tmp_path / "hosts.yaml"
+    path.write_text(
+        "- name: Example Org\n  slug: example-org\n  description: d\n"
+        "- name: Bad\n  slug: bad\n  parent_slug: example-org\n"
+    )
+    args = _args(path)
+    args.output = "summary"
+    with pytest.raises(ValueError):
+        cmd_hosts(args)
+
+    out = capsys.readouterr().out
+    assert out == "created=1 updated=1 applied=0 unchanged=0 failed=1\n"
+
+
+@respx.mock
+def test_cmd_hosts_writes_timings_and_profile(tmp_path: Path):
+    respx.post("http://localhost:8765/graphql/v2").mock(side_effect=_host_responses())
+    path = tmp_path / "hosts.yaml"
+    path.write_text("- name: Example Org\n  slug: example-org\n  description: d\n")
+    args = _args(path)
+    args.output = "quiet"
+    args.timings_file = str(tmp_path / "timings.json")
+    args.profile = str(tmp_path / "run.prof")
+    assert cmd_hosts(args) == 0
+
+    report = json.loads((tmp_path / "timings.json").read_text())
+    assert list(report["phases"]) == ["load", "validate", "prefetch", "diff", "mutate", "print"]
+    assert report["network"]["requests"] == 3
+    assert report["total"]["network_wait"] >= 0
+    assert (tmp_path / "run.prof").stat().st_size > 0
+
+
+@respx.mock
+def test_cmd_hosts_skips_items_past_deadline(tmp_path: Path, capsys):
+    route = respx.post("http://localhost:8765/graphql/v2")
+    path = tmp_path / "hosts.yaml"
+    path.write_text("- name: Example Org\n  slug: example-org\n  description: d\n")
+    args = _args(path)
+    args.output = "ndjson"
+    args.run_deadline = Deadline(0)
+
+    assert cmd_hosts(args) == 3
+    captured = capsys.readouterr()
+    record = json.loads(captured.out)
+    assert record == {"kind": "host", "slug": "example-org", "skipped": record["skipped"]}
+    assert "deadline" in record["skipped"]
+    assert "1 host(s) skipped" in captured.err
+    assert route.call_count == 0
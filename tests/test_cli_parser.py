@@ -31,6 +31,24 @@ def test_projects_accepts_config_alias():
     assert args.prod is False
 
 
+def test_log_requests_is_a_flag_before_positionals():
+    args = _parse(["whoami", "--log-requests", "example-collective"])
+    assert args.log_requests is True
+    assert args.slug == "example-collective"
+    assert args.request_log is None
+
+    args = _parse(["balance", "--request-log", "requests.jsonl", "a", "b"])
+    assert args.request_log == "requests.jsonl"
+    assert args.slugs == ["a", "b"]
+
+
+def test_timings_is_a_flag_before_positionals():
+    args = _parse(["transactions", "sync", "--timings", "acct-a", "acct-b"])
+    assert args.timings is True
+    assert args.timings_file is None
+    assert args.slugs == ["acct-a", "acct-b"]
+
+
 def test_version_command_outputs_version(capsys):
     args = _parse(["version"])
     assert args.command == "version"
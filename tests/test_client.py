@@ -1,8 +1,29 @@
+import io
+import json
+from unittest.mock import patch
+
 import pytest
 import respx
-from httpx import Response
+from httpx import HTTPTransport, Response
 
-from oc_opsdevnz import PROD_URL, STAGING_URL, GraphQLError, HTTPRequestError, OpenCollectiveClient
+from oc_opsdevnz import (
+    PROD_URL,
+    STAGING_URL,
+    DeadlineExceeded,
+    GraphQLError,
+    HTTPRequestError,
+    OpenCollectiveClient,
+)
+from oc_opsdevnz.connections import (
+    PoolSettings,
+    close_shared_transports,
+    http2_available,
+    shared_transport,
+)
+from oc_opsdevnz.deadline import Deadline, parse_duration
+from oc_opsdevnz.fake_oc import FakeOpenCollective, serve
+from oc_opsdevnz.ratelimit import RateLimiter
+from oc_opsdevnz.request_log import RequestLog
 
 
 def test_prod_guard():
@@ -42,3 +63,127 @@ def test_graphql_error_surfaces_message():
 
     assert "No account found with slug" in str(excinfo.value)
     client.close()
+
+
+@respx.mock
+def test_request_log_records_without_token():
+    respx.post(STAGING_URL).mock(
+        side_effect=[
+            Response(502, text="bad gateway secret-token-123"),
+            Response(200, json={"data": {"createCollective": {"id": "c1"}}}),
+        ]
+    )
+    sink = io.StringIO()
+    log = RequestLog(sink)
+    client = OpenCollectiveClient(token="secret-token-123", request_log=log)
+    with patch("oc_opsdevnz.oc_client.time.sleep"):
+        client.graphql(
+            "mutation CreateCollective($input: CollectiveCreateInput!) { x }",
+            {"input": {}},
+            idempotency_key="key-1",
+        )
+    client.log_cache("query Account($slug: String!) { x }", hit=True)
+    log.close()
+
+    text = sink.getvalue()
+    assert "secret-token-123" not in text
+    first, second, cached = (json.loads(line) for line in text.splitlines())
+    assert first["operation"] == "CreateCollective"
+    assert first["kind"] == "mutation"
+    assert (first["status"], first["attempt"]) == (502, 1)
+    assert (second["status"], second["attempt"]) == (200, 2)
+    assert second["idempotency_key"] == "key-1"
+    assert second["request_bytes"] > 0 and second["response_bytes"] > 0
+    assert cached == {**cached, "operation": "Account", "cache": "hit"}
+    client.close()
+
+
+def test_shared_pool_reuses_connections_across_clients():
+    fake = FakeOpenCollective()
+    fake.add_account("example-collective")
+    settings = PoolSettings(max_connections=2, keepalive_expiry=60)
+    query = 'query { account(slug: "example-collective") { id } }'
+    try:
+        with serve(fake) as url:
+            for token in ("token-one", "token-two"):
+                with OpenCollectiveClient(
+                    api_url=url, token=token, pool=settings, shared_pool=True
+                ) as client:
+                    client.graphql(query)
+            transport = shared_transport(settings)
+            assert transport is shared_transport(
+                PoolSettings(max_connections=2, keepalive_expiry=60)
+            )
+            # Both clients (closed in between) went over the same kept-alive socket.
+            assert len(transport._pool.connections) == 1
+    finally:
+        close_shared_transports()
+
+
+def test_clients_honour_environment_proxies(monkeypatch):
+    for name in ("NO_PROXY", "no_proxy", "ALL_PROXY", "all_proxy", "https_proxy"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.example:3128")
+    try:
+        for shared in (False, True):
+            client = OpenCollectiveClient(token="mock-token", shared_pool=shared)
+            mounts = {p.pattern: t for p, t in client._client._mounts.items()}
+            assert isinstance(mounts["https://"], HTTPTransport)
+            assert mounts["https://"] is not client._client._transport
+            client.close()
+    finally:
+        close_shared_transports()
+
+
+def test_http2_requires_h2_extra():
+    if http2_available():
+        pytest.skip("h2 is installed")
+    with pytest.raises(RuntimeError, match="http2"):
+        OpenCollectiveClient(token="secret-token", pool=PoolSettings(http2=True))
+
+
+def test_parse_duration():
+    assert parse_duration("90") == 90
+    assert parse_duration("1h30m") == 5400
+    assert parse_duration("250ms") == 0.25
+    with pytest.raises(ValueError):
+        parse_duration("ten minutes")
+
+
+@respx.mock
+def test_deadline_stops_retries_and_unsent_requests():
+    route = respx.post("http://localhost:8765/graphql/v2").mock(return_value=Response(502))
+    client = OpenCollectiveClient(
+        api_url="http://localhost:8765/graphql/v2", token="mock-token", deadline=Deadline(0.7)
+    )
+    # 502, 0.5s backoff, 502; the next 1s backoff would overrun the deadline.
+    with pytest.raises(DeadlineExceeded, match="after 2 attempt") as exc:
+        client.graphql("query Account { account { id } }", retry=5)
+    assert exc.value.attempted is True
+    assert route.call_count == 2
+
+    client.deadline = Deadline(0)
+    with pytest.raises(DeadlineExceeded, match="not sent") as exc:
+        client.graphql("query Account { account { id } }")
+    assert exc.value.attempted is False
+    assert route.call_count == 2
+    client.close()
+
+
+@respx.mock
+def test_rate_limit_wait_never_runs_past_the_deadline():
+    route = respx.post("http://localhost:8765/graphql/v2").mock(
+        return_value=Response(200, json={"data": {"account": None}})
+    )
+    limiter = RateLimiter(rate=0.5, burst=1)
+    client = OpenCollectiveClient(
+        api_url="http://localhost:8765/graphql/v2", token="mock-token", rate_limiter=limiter
+    )
+    client.graphql("query Account { account { id } }")
+
+    # The next token is ~2s away but only 0.2s of budget is left: fail now, spend nothing.
+    client.deadline = Deadline(0.2)
+    with pytest.raises(DeadlineExceeded, match="not sent"):
+        client.graphql("query Account { account { id } }")
+    assert (route.call_count, limiter.acquired, limiter.waited) == (1, 1, 0.0)
+    client.close()
@@ -0,0 +1,93 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from oc_opsdevnz.cli import main
+from oc_opsdevnz.clients import ClientPool
+from oc_opsdevnz.connections import close_shared_transports
+from oc_opsdevnz.fake_oc import FakeOpenCollective, serve
+
+
+def test_pool_routes_items_and_keeps_one_budget_per_token():
+    pool = ClientPool(rate=5, api_url="http://fake.local/graphql/v2")
+    try:
+        host_a = pool.add("host-a", token="fake-token-a")
+        host_b = pool.add("host-b", token="fake-token-b")
+        alias = pool.add("OC_SECRET_REF_A", token="fake-token-a")
+        default = pool.add("default", token="fake-token")
+
+        assert alias is host_a and host_a is not host_b
+        assert host_a.rate_limiter is not host_b.rate_limiter
+        # Separate budgets, one set of connections.
+        assert host_a._client._transport is host_b._client._transport
+
+        assert pool.route({"slug": "c1", "host_slug": "host-b"}) == ("host-b", host_b)
+        assert pool.route({"slug": "p1", "parent_slug": "host-a"}) == ("host-a", host_a)
+        assert pool.route({"slug": "host-a"}) == ("host-a", host_a)
+        assert pool.route({"slug": "other", "host_slug": "host-c"}) == ("default", default)
+        with pytest.raises(ValueError, match="needs a token"):
+            pool.add("host-c")
+    finally:
+        pool.close()
+        close_shared_transports()
+
+
+def test_cli_sends_each_host_items_with_that_host_token(tmp_path: Path, monkeypatch, capsys):
+    fake = FakeOpenCollective()
+    fake.add_host("host-a")
+    fake.add_host("host-b")
+    collectives = tmp_path / "collectives.yaml"
+    collectives.write_text(
+        "".join(
+            f"- name: Collective {n}\n  slug: collective-{n}\n"
+            f"  host_slug: host-{h}\n  apply_to_host: true\n"
+            for n, h in ((1, "a"), (2, "b"), (3, "a"))
+        )
+    )
+    monkeypatch.setenv("HOST_A_TOKEN", "fake-token-a")
+    monkeypatch.setenv("HOST_B_TOKEN", "fake-token-b")
+    with serve(fake) as url:
+        argv = ["collectives", "--file", str(collectives), "--api-url", url, "--output", "ndjson"]
+        argv += ["--host-token", "host-a=HOST_A_TOKEN", "--host-token", "host-b=HOST_B_TOKEN"]
+        assert main([*argv, "--rate-limit", "50"]) == 0
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(r["client"], r["slug"]) for r in records] == [
+        ("host-a", "collective-1"),
+        ("host-a", "collective-3"),
+        ("host-b", "collective-2"),
+    ]
+    assert fake.accounts["collective-2"]["host"] == "host-b"
+    # Two tokens, so two rate budgets drawn: each item's requests carried its host's token.
+    assert set(fake.tokens) == {"fake-token-a", "fake-token-b"}
+    assert fake.tokens["fake-token-a"] > fake.tokens["fake-token-b"] > 0
+
+
+def test_cli_routes_projects_by_their_parent_collective_host(tmp_path: Path, monkeypatch, capsys):
+    fake = FakeOpenCollective()
+    fake.add_host("host-a")
+    fake.add_host("host-b")
+    for slug, host in (("collective-a", "host-a"), ("collective-b", "host-b")):
+        fake.add_account(slug, host=host)
+    projects = tmp_path / "projects.yaml"
+    projects.write_text(
+        "".join(
+            f"- name: Project {n}\n  slug: project-{n}\n  parent_slug: {parent}\n"
+            for n, parent in ((1, "collective-a"), (2, "collective-b"), (3, "collective-c"))
+        )
+    )
+    monkeypatch.setenv("HOST_A_TOKEN", "fake-token-a")
+    monkeypatch.setenv("HOST_B_TOKEN", "fake-token-b")
+    monkeypatch.setenv("OC_TOKEN", "main-token")
+    with serve(fake) as url:
+        argv = ["projects", "--file", str(projects), "--api-url", url, "--output", "ndjson"]
+        argv += ["--host-token", "host-a=HOST_A_TOKEN", "--host-token", "host-b=HOST_B_TOKEN"]
+        # project-3's parent does not exist, and there is no default token to fall back on.
+        assert main(argv) == 1
+        assert "No --host-token for project-3" in capsys.readouterr().err
+        assert "main-token" not in fake.tokens
+
+        assert main([*argv, "--only", "project-2"]) == 0
+    [record] = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert (record["client"], record["slug"]) == ("host-b", "project-2")
+    assert fake.accounts["project-2"]["parent"] == "collective-b"
@@ -0,0 +1,36 @@
+import json
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from oc_opsdevnz import codec
+from oc_opsdevnz.funds import plan_allocations
+from oc_opsdevnz.operations import load_rows
+
+
+@pytest.fixture(params=codec.BACKENDS)
+def backend(request):
+    previous = codec.backend()
+    try:
+        codec.use_backend(request.param)
+    except ValueError:
+        pytest.skip(f"{request.param} is not installed")
+    yield request.param
+    codec.use_backend(previous)
+
+
+def test_backends_agree_and_keep_money_exact(backend):
+    record = {"slug": "café", "amount": Decimal("1234567890.10"), "cents": 123, "ok": True}
+    assert codec.dumps(record) == '{"slug":"café","amount":"1234567890.10","cents":123,"ok":true}'
+    assert codec.dumps({"a": [1]}, indent=True) == json.dumps({"a": [1]}, indent=2)
+    assert codec.loads(codec.dumpb(record))["amount"] == "1234567890.10"
+    assert codec.loads(b'{"amount": 0.1}', decimal=True) == {"amount": Decimal("0.1")}
+
+
+def test_jsonl_rows_load_amounts_as_decimal(tmp_path: Path):
+    path = tmp_path / "ledger.jsonl"
+    path.write_text('{"project": "example-project", "amount": 25.10, "description": "grant"}\n')
+    rows = load_rows(path)
+    assert rows[0]["amount"] == Decimal("25.10")
+    assert plan_allocations(rows, host="example-host")[0].cents == 2510
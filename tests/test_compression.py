@@ -0,0 +1,39 @@
+from oc_opsdevnz import OpenCollectiveClient
+from oc_opsdevnz.balances import fetch_balances
+from oc_opsdevnz.compression import compress_body, decompress_body
+from oc_opsdevnz.fake_oc import FakeOpenCollective, FakeTransport
+from oc_opsdevnz.metrics import Metrics
+
+
+def test_compress_body_skips_small_or_incompressible_bodies():
+    assert compress_body(b'{"query":"{ a }"}') == (b'{"query":"{ a }"}', None)
+    big = b'{"query":"' + b"account { id slug } " * 200 + b'"}'
+    packed, encoding = compress_body(big)
+    assert encoding == "gzip" and len(packed) < len(big) // 10
+    assert decompress_body(packed, "gzip") == big
+
+
+def test_batched_queries_travel_compressed_both_ways():
+    fake = FakeOpenCollective()
+    slugs = [f"example-collective-{i}" for i in range(60)]
+    for slug in slugs:
+        fake.add_account(slug, balance=100)
+    metrics = Metrics()
+    client = OpenCollectiveClient(
+        api_url="http://fake.local/graphql/v2",
+        token="fake-token",
+        transport=FakeTransport(fake),
+        compress_requests=True,
+        metrics=metrics,
+    )
+
+    balances = fetch_balances(client, slugs, chunk_size=60)
+
+    assert all(b.value_in_cents == 100 for b in balances.values())
+    net = client.network
+    assert net["request_wire_bytes"] < net["request_bytes"] // 4
+    assert net["response_wire_bytes"] < net["response_bytes"] // 4
+    rendered = metrics.render()
+    assert f'transfer_bytes_total{{direction="request",form="raw"}} {net["request_bytes"]}' in (
+        rendered
+    )
@@ -0,0 +1,182 @@
+import csv
+import io
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import respx
+from httpx import Response
+
+from oc_opsdevnz import OpenCollectiveClient, iter_expenses
+from oc_opsdevnz.cli import cmd_expenses_list
+
+
+def _expense(n: int) -> dict:
+    return {
+        "id": f"exp{n}",
+        "legacyId": n,
+        "status": "PAID",
+        "type": "INVOICE",
+        "description": f"Expense {n}",
+        "amount": {"valueInCents": 1000 + n, "currency": "NZD"},
+        "payee": {"slug": "example-payee", "name": "Example Payee"},
+        "createdAt": "2026-07-01T00:00:00Z",
+    }
+
+
+def _page(nodes: list[dict], total: int) -> Response:
+    return Response(200, json={"data": {"expenses": {"totalCount": total, "nodes": nodes}}})
+
+
+@respx.mock
+def test_iter_expenses_pages_until_total_and_passes_filters():
+    seen = []
+
+    def _handler(request):
+        variables = json.loads(request.content)["variables"]
+        seen.append(variables)
+        start = variables["offset"]
+        return _page([_expense(n) for n in range(start, min(start + 2, 5))], 5)
+
+    respx.post().mock(side_effect=_handler)
+
+    client = OpenCollectiveClient(token="t")
+    expenses = list(
+        iter_expenses(
+            client,
+            "example-collective",
+            statuses=["paid"],
+            expense_type="invoice",
+            date_from="2026-07-01",
+            page_size=2,
+        )
+    )
+
+    assert [e["legacyId"] for e in expenses] == [0, 1, 2, 3, 4]
+    assert [v["offset"] for v in seen] == [0, 2, 4]
+    assert seen[0]["status"] == ["PAID"]
+    assert seen[0]["type"] == "INVOICE"
+    assert seen[0]["dateFrom"] == "2026-07-01"
+    client.close()
+
+
+@respx.mock
+def test_cmd_expenses_list_writes_csv(tmp_path: Path):
+    respx.post("http://localhost:8765/graphql/v2").mock(
+        side_effect=[_page([_expense(1), _expense(2)], 2)]
+    )
+    out = tmp_path / "expenses.csv"
+    args = SimpleNamespace(
+        token="mock-token",
+        auth_mode="personal",
+        log_requests=False,
+        api_url="http://localhost:8765/graphql/v2",
+        staging=False,
+        test=False,
+        prod=False,
+        slug="example-collective",
+        status=None,
+        type=None,
+        date_from=None,
+        date_to=None,
+        page_size=100,
+        format="csv",
+        out=str(out),
+    )
+    assert cmd_expenses_list(args) == 0
+
+    rows = list(csv.DictReader(io.StringIO(out.read_text())))
+    assert [r["legacyId"] for r in rows] == ["1", "2"]
+    assert rows[0]["amountInCents"] == "1001"
+    assert rows[0]["payeeSlug"] == "example-payee"
+
+
+def _pipeline_handler(calls: list):
+    def _handler(request):
+        payload = json.loads(request.content)
+        variables = payload["variables"]
+        calls.append((payload["query"], variables, request.headers.get("Idempotency-Key")))
+        if "createExpense" in payload["query"]:
+            n = int(variables["input"]["description"].split()[-1])
+            expense = {"id": f"exp{n}", "legacyId": n, "status": "PENDING"}
+            return Response(200, json={"data": {"createExpense": {"expense": expense}}})
+        status = {"APPROVE": "APPROVED", "PAY": "PAID"}[variables["action"]]
+        expense = {"id": variables["id"], "status": status}
+        return Response(200, json={"data": {"processExpense": {"expense": expense}}})
+
+    return _handler
+
+
+def _rows(count: int) -> list[dict]:
+    return [
+        {
+            "account": "example-collective",
+            "payee": "example-payee",
+            "description": f"Volunteer {n}",
+            "amount": "12.34",
+        }
+        for n in range(count)
+    ]
+
+
+@respx.mock
+def test_expense_pipeline_runs_waves_and_journals(tmp_path: Path):
+    from oc_opsdevnz.expenses import plan_expense_jobs, run_expense_pipeline
+
+    calls: list = []
+    respx.post().mock(side_effect=_pipeline_handler(calls))
+
+    jobs = plan_expense_jobs(_rows(3))
+    journal = io.StringIO()
+    client = OpenCollectiveClient(token="t")
+    run_expense_pipeline(client, jobs, concurrency=3, journal=journal)
+
+    assert [j.status for j in jobs] == ["PAID", "PAID", "PAID"]
+    assert sorted(j.legacy_id for j in jobs) == [0, 1, 2]
+    assert jobs[0].expense_input["items"][0]["amount"] == {"valueInCents": 1234}
+    # All creates finish before any approval starts, and approvals before payments.
+    stages = ["create" if "createExpense" in q else v["action"] for q, v, _ in calls]
+    assert stages == ["create"] * 3 + ["APPROVE"] * 3 + ["PAY"] * 3
+    keys = {key for _, _, key in calls}
+    assert len(keys) == 9
+    assert len(journal.getvalue().splitlines()) == 9
+    client.close()
+
+
+@respx.mock
+def test_expense_pipeline_resumes_from_journal(tmp_path: Path):
+    from oc_opsdevnz.expenses import plan_expense_jobs, run_expense_pipeline
+    from oc_opsdevnz.journal import read_journal
+
+    journal_path = tmp_path / "journal.jsonl"
+    calls: list = []
+    respx.post().mock(side_effect=_pipeline_handler(calls))
+    client = OpenCollectiveClient(token="t")
+
+    with journal_path.open("a") as journal:
+        run_expense_pipeline(client, plan_expense_jobs(_rows(2)), until="APPROVE", journal=journal)
+    calls.clear()
+
+    jobs = plan_expense_jobs(_rows(2))
+    state = read_journal(journal_path)
+    with journal_path.open("a") as journal:
+        run_expense_pipeline(client, jobs, journal=journal, journal_state=state)
+
+    assert [v["action"] for _, v, _ in calls] == ["PAY", "PAY"]
+    assert [j.completed for j in jobs] == [["CREATE", "APPROVE", "PAY"]] * 2
+    client.close()
+
+
+def test_plan_expense_jobs_rejects_duplicates_and_bad_amounts():
+    import pytest
+
+    from oc_opsdevnz.expenses import plan_expense_jobs
+
+    with pytest.raises(ValueError, match="Row 2 duplicates row 1"):
+        plan_expense_jobs(_rows(1) * 2)
+    with pytest.raises(ValueError, match="Row 1: .*more than two decimal places"):
+        plan_expense_jobs([{**_rows(1)[0], "amount": "1.234"}])
+    with pytest.raises(ValueError, match="Row 1: Invalid amount: 'Infinity'"):
+        plan_expense_jobs([{**_rows(1)[0], "amount": "Infinity"}])
+    with pytest.raises(ValueError, match="Row 1: Amount '1e30' exceeds"):
+        plan_expense_jobs([{**_rows(1)[0], "amount": "1e30"}])
@@ -0,0 +1,232 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from oc_opsdevnz import PROD_URL, GraphQLError, HTTPRequestError, OpenCollectiveClient
+from oc_opsdevnz.balances import fetch_balances
+from oc_opsdevnz.cache import NotFoundCache
+from oc_opsdevnz.cli import main
+from oc_opsdevnz.expenses import plan_expense_jobs, run_expense_pipeline
+from oc_opsdevnz.fake_oc import FakeOpenCollective, FakeTransport, Faults, serve
+from oc_opsdevnz.funds import allocate_funds, plan_allocations
+from oc_opsdevnz.operations import upsert_collective, upsert_project
+from oc_opsdevnz.transactions import LedgerStore, sync_transactions
+
+
+def _client(fake: FakeOpenCollective) -> OpenCollectiveClient:
+    return OpenCollectiveClient(
+        api_url="http://fake.local/graphql/v2", token="fake-token", transport=FakeTransport(fake)
+    )
+
+
+def test_upserts_converge_and_rerun_unchanged():
+    fake = FakeOpenCollective()
+    fake.add_host("example-host", balance=10_000)
+    client = _client(fake)
+    collective = {
+        "name": "Example Collective",
+        "slug": "example-collective",
+        "description": "d",
+        "tags": ["a"],
+        "host_slug": "example-host",
+        "apply_to_host": True,
+    }
+    project = {
+        "name": "Example Project",
+        "slug": "example-project",
+        "parent_slug": collective["slug"],
+    }
+
+    first = upsert_collective(client, collective)
+    assert (first.created, first.applied_to_host) == (True, True)
+    assert upsert_project(client, project).created
+
+    again = upsert_collective(client, collective)
+    assert not (again.created or again.updated or again.applied_to_host)
+    assert not upsert_project(client, project).updated
+    assert fake.accounts["example-collective"]["host"] == "example-host"
+    assert fake.operations["CreateCollective"] == 1
+    # Projects only confirm their parent exists; they never fetch its full account.
+    assert fake.operations["Parent"] == 2 and fake.operations["Account"] == 0
+
+
+def test_allocate_expenses_and_sync_over_concurrent_paths(tmp_path: Path):
+    fake = FakeOpenCollective()
+    fake.add_host("example-host", balance=50_000)
+    fake.add_account("example-collective", host="example-host")
+    fake.add_account("example-vendor", type="INDIVIDUAL")
+    client = _client(fake)
+
+    rows = [
+        {"project": "example-collective", "amount": "25.00", "description": f"g{i}"}
+        for i in range(8)
+    ]
+    allocations = plan_allocations(rows, host="example-host")
+    report = allocate_funds(client, allocations, host="example-host", concurrency=4)
+    assert not report.failed and not report.mismatches
+    assert fake.balance("example-host") == 30_000
+
+    expense_rows = [
+        {
+            "account": "example-collective",
+            "payee": "example-vendor",
+            "description": f"e{i}",
+            "amount": "10",
+        }
+        for i in range(5)
+    ]
+    jobs = run_expense_pipeline(client, plan_expense_jobs(expense_rows), concurrency=3)
+    assert all(job.status == "PAID" and job.error is None for job in jobs)
+    assert fake.balance("example-vendor") == 5_000
+
+    with LedgerStore(tmp_path / "ledger.db") as store:
+        result = sync_transactions(client, store, "example-collective", page_size=4)
+    assert result.inserted == 8 + 5
+
+    balances = fetch_balances(client, ["example-collective", "missing-slug"])
+    assert balances["example-collective"].value_in_cents == 20_000 - 5_000
+    assert balances["missing-slug"].found is False
+
+
+def test_idempotency_key_replays_mutation():
+    fake = FakeOpenCollective()
+    fake.add_host("example-host", balance=1_000)
+    fake.add_account("example-collective", host="example-host")
+    client = _client(fake)
+    allocation = plan_allocations(
+        [{"project": "example-collective", "amount": "1", "description": "x"}], host="example-host"
+    )
+    allocate_funds(client, allocation, host="example-host")
+    allocation[0].done = False
+    allocate_funds(client, allocation, host="example-host")
+    assert fake.balance("example-collective") == 100
+
+
+def test_graphql_errors_and_fault_injection():
+    fake = FakeOpenCollective(faults=Faults(error_rate=1.0, error_status=503, seed=1))
+    client = _client(fake)
+    with pytest.raises(GraphQLError, match="No account found with slug nope"):
+        fake.faults.error_rate = 0.0
+        client.graphql(
+            "query Account($slug: String!) { account(slug: $slug) { id } }", {"slug": "nope"}
+        )
+
+    fake.faults.error_rate = 1.0
+    with pytest.raises(HTTPRequestError, match="HTTP 503"):
+        client.graphql('query { account(slug: "x") { id } }', retry=0)
+
+    limited = FakeOpenCollective(faults=Faults(rate_limit=2, rate_window=60))
+    client = _client(limited)
+    for _ in range(2):
+        with pytest.raises(GraphQLError):
+            client.graphql('query { account(slug: "x") { id } }')
+    with pytest.raises(HTTPRequestError) as excinfo:
+        client.graphql('query { account(slug: "x") { id } }')
+    assert excinfo.value.status_code == 429
+    assert limited.responses[429] == 1
+
+
+def test_cli_against_local_http_server(tmp_path: Path):
+    fake = FakeOpenCollective()
+    fake.add_host("example-host")
+    hosts = tmp_path / "collectives.yaml"
+    hosts.write_text(
+        "- name: Example Collective\n"
+        "  slug: example-collective\n"
+        "  host_slug: example-host\n"
+        "  apply_to_host: true\n"
+    )
+    with serve(fake) as url:
+        argv = ["collectives", "--file", str(hosts), "--api-url", url, "--token", "fake-token"]
+        assert main([*argv, "--output", "quiet"]) == 0
+    assert fake.accounts["example-collective"]["host"] == "example-host"
+
+
+def test_persisted_queries_send_hashes_after_first_use():
+    fake = FakeOpenCollective()
+    fake.add_account("example-collective")
+    client = OpenCollectiveClient(
+        api_url="http://apq.fake.local/graphql/v2",
+        token="fake-token",
+        transport=FakeTransport(fake),
+        persisted_queries=True,
+    )
+    query = "query Account($slug: String!) { account(slug: $slug) { slug } }"
+    for _ in range(3):
+        assert client.graphql(query, {"slug": "example-collective"})["account"]["slug"]
+    # One miss registers the document; later calls carry only its hash.
+    assert client.network["requests"] == 4
+    assert fake.operations["Account"] == 3
+
+    legacy = FakeOpenCollective(persisted_queries=False)
+    legacy.add_account("example-collective")
+    client = OpenCollectiveClient(
+        api_url="http://legacy.fake.local/graphql/v2",
+        token="fake-token",
+        transport=FakeTransport(legacy),
+        persisted_queries=True,
+    )
+    for _ in range(3):
+        client.graphql(query, {"slug": "example-collective"})
+    # Unsupported endpoints are probed once, then get plain requests.
+    assert client.network["requests"] == 4
+
+
+def test_missing_slugs_are_cached_until_created():
+    fake = FakeOpenCollective()
+    client = _client(fake)
+    orphan = {"name": "Orphan", "slug": "orphan-project", "parent_slug": "example-collective"}
+
+    for _ in range(3):
+        with pytest.raises(RuntimeError, match="not found"):
+            upsert_project(client, orphan)
+    assert fake.operations["Parent"] == 1
+
+    # Creating the parent through this client forgets the cached miss straight away.
+    upsert_collective(client, {"name": "Example Collective", "slug": "example-collective"})
+    assert upsert_project(client, orphan).created
+    assert fake.operations["Parent"] == 2
+
+    client.not_found = NotFoundCache(ttl=0)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            upsert_project(client, {**orphan, "parent_slug": "missing-collective"})
+    assert fake.operations["Parent"] == 4
+
+
+def test_cli_fans_out_across_environments(tmp_path: Path, monkeypatch, capsys):
+    staging, qa = FakeOpenCollective(), FakeOpenCollective()
+    hosts = tmp_path / "hosts.yaml"
+    hosts.write_text("- name: Example Org\n  slug: example-org\n  description: d\n")
+    with serve(staging) as staging_url, serve(qa) as qa_url:
+        monkeypatch.setenv("OC_API_URL_STAGING", staging_url)
+        monkeypatch.setenv("OC_TOKEN_STAGING", "fake-token-staging")
+        monkeypatch.setenv("OC_API_URL_QA", qa_url)
+        monkeypatch.setenv("OC_TOKEN_QA", "fake-token-qa")
+        argv = ["hosts", "--file", str(hosts), "--envs", "staging,qa", "--output", "ndjson"]
+        assert main(argv) == 0
+        records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert [(r["env"], r["created"]) for r in records] == [("staging", True), ("qa", True)]
+
+        # The prod guard holds per environment: only "prod" may point at the production API.
+        monkeypatch.setenv("OC_API_URL_QA", PROD_URL)
+        assert main([*argv[:-1], "summary"]) == 1
+        captured = capsys.readouterr()
+    assert captured.out.splitlines()[0].startswith("staging: created=0")
+    assert "[qa] created=0" in captured.err and "Refusing to use production API" in captured.err
+    assert "example-org" in staging.accounts and "example-org" in qa.accounts
+
+
+def test_transactions_sync_writes_timings_and_profile(tmp_path: Path):
+    fake = FakeOpenCollective()
+    fake.add_host("example-host", balance=10_000)
+    timings, profile = tmp_path / "timings.json", tmp_path / "run.prof"
+    with serve(fake) as url:
+        argv = ["transactions", "sync", "example-host", "--db", str(tmp_path / "ledger.sqlite")]
+        argv += ["--api-url", url, "--token", "fake-token"]
+        assert main([*argv, "--timings-file", str(timings), "--profile", str(profile)]) == 0
+    report = json.loads(timings.read_text())
+    assert list(report["phases"]) == ["load", "network", "print"]
+    assert report["network"]["requests"] >= 1
+    assert profile.stat().st_size > 0
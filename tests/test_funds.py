@@ -0,0 +1,145 @@
+import io
+import json
+import re
+
+import pytest
+import respx
+from httpx import Response
+
+from oc_opsdevnz import OpenCollectiveClient
+from oc_opsdevnz.funds import allocate_funds, plan_allocations
+from oc_opsdevnz.journal import read_journal
+
+
+class _FakeBalances:
+    """Minimal stateful stand-in for the balances query and addFunds mutation."""
+
+    def __init__(self, balances: dict[str, int]):
+        self.balances = dict(balances)
+        self.add_funds_calls: list[dict] = []
+        self.balance_queries = 0
+
+    def __call__(self, request):
+        payload = json.loads(request.content)
+        query, variables = payload["query"], payload["variables"]
+        if "addFunds" in query:
+            self.add_funds_calls.append({**variables, "key": request.headers["Idempotency-Key"]})
+            cents = variables["amount"]["valueInCents"]
+            cents -= round(cents * variables["hostFeePercent"] / 100)
+            self.balances[variables["from"]["slug"]] -= cents
+            self.balances[variables["to"]["slug"]] += cents
+            tx = {"id": f"tx{len(self.add_funds_calls)}", "status": "COMPLETED"}
+            return Response(200, json={"data": {"addFunds": tx}})
+        self.balance_queries += 1
+        data = {}
+        for alias in re.findall(r"(b\d+): account", query):
+            slug = variables["s" + alias[1:]]
+            data[alias] = {
+                "slug": slug,
+                "name": slug.title(),
+                "stats": {"balance": {"valueInCents": self.balances[slug], "currency": "NZD"}},
+            }
+        return Response(200, json={"data": data})
+
+
+_LEDGER = [
+    {"project": "example-project-a", "amount": "655.50", "description": "Cookies and swag"},
+    {"project": "example-project-b", "amount": "100", "description": "Facilitator"},
+    {"project": "example-project-a", "amount": "0.10", "description": "Rounding top-up"},
+]
+
+
+@respx.mock
+def test_allocate_funds_runs_and_verifies_with_batched_balances():
+    fake = _FakeBalances({"example-host": 100000, "example-project-a": 0, "example-project-b": 0})
+    respx.post().mock(side_effect=fake)
+
+    client = OpenCollectiveClient(token="t")
+    allocations = plan_allocations(_LEDGER, host="example-host")
+    report = allocate_funds(client, allocations, host="example-host", concurrency=3)
+
+    assert report.failed == []
+    assert report.mismatches == []
+    assert fake.balance_queries == 2  # one batched read before, one after
+    assert len(fake.add_funds_calls) == 3
+    assert {c["key"] for c in fake.add_funds_calls} == {a.key for a in allocations}
+    assert report.after["example-project-a"].value_in_cents == 65560
+    assert report.after["example-host"].value_in_cents == 100000 - 75560
+    client.close()
+
+
+@respx.mock
+def test_allocate_funds_verifies_balances_net_of_host_fee():
+    fake = _FakeBalances({"example-host": 100000, "example-project-a": 0})
+    respx.post().mock(side_effect=fake)
+    client = OpenCollectiveClient(token="t")
+    ledger = [
+        {
+            "project": "example-project-a",
+            "amount": "200",
+            "description": "Venue hire",
+            "hostFeePercent": "5",
+        }
+    ]
+
+    report = allocate_funds(
+        client, plan_allocations(ledger, host="example-host"), host="example-host"
+    )
+
+    assert fake.add_funds_calls[0]["amount"]["valueInCents"] == 20000
+    assert report.after["example-project-a"].value_in_cents == 19000
+    assert report.mismatches == []
+    client.close()
+
+
+@respx.mock
+def test_allocate_funds_is_rerunnable_from_journal(tmp_path):
+    fake = _FakeBalances({"example-host": 100000, "example-project-a": 0, "example-project-b": 0})
+    respx.post().mock(side_effect=fake)
+    client = OpenCollectiveClient(token="t")
+    journal_path = tmp_path / "ledger.journal.jsonl"
+
+    with journal_path.open("a") as journal:
+        allocate_funds(
+            client,
+            plan_allocations(_LEDGER, host="example-host"),
+            host="example-host",
+            journal=journal,
+        )
+    with journal_path.open("a") as journal:
+        report = allocate_funds(
+            client,
+            plan_allocations(_LEDGER, host="example-host"),
+            host="example-host",
+            journal=journal,
+            journal_state=read_journal(journal_path),
+        )
+
+    assert len(fake.add_funds_calls) == 3
+    assert all(a.done for a in report.allocations)
+    assert fake.balances["example-project-b"] == 10000
+    client.close()
+
+
+@respx.mock
+def test_allocate_funds_rejects_ledger_exceeding_host_balance():
+    fake = _FakeBalances({"example-host": 500, "example-project-a": 0, "example-project-b": 0})
+    respx.post().mock(side_effect=fake)
+    client = OpenCollectiveClient(token="t")
+
+    with pytest.raises(RuntimeError, match="only holds 5.00"):
+        allocate_funds(
+            client,
+            plan_allocations(_LEDGER, host="example-host"),
+            host="example-host",
+            journal=io.StringIO(),
+        )
+    assert fake.add_funds_calls == []
+    client.close()
+
+
+def test_plan_allocations_validates_rows():
+    with pytest.raises(ValueError, match="Row 1: amount must be positive"):
+        plan_allocations([{**_LEDGER[0], "amount": "-1"}], host="example-host")
+    with pytest.raises(ValueError, match="Row 2 duplicates row 1"):
+        plan_allocations([_LEDGER[0], _LEDGER[0]], host="example-host")
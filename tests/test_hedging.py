@@ -0,0 +1,99 @@
+import threading
+import time
+
+import respx
+from httpx import Response
+
+from oc_opsdevnz import OpenCollectiveClient
+from oc_opsdevnz.hedging import HedgePolicy, LatencyTracker
+from oc_opsdevnz.ratelimit import RateLimiter
+
+URL = "http://localhost:8765/graphql/v2"
+QUERY = "query Account($slug: String!) { account(slug: $slug) { id } }"
+MUTATION = (
+    "mutation EditAccount($account: AccountUpdateInput!) { editAccount(account: $account) { id } }"
+)
+
+
+def _slow_call(slow: set[int]):
+    """respx side effect: calls whose (1-based) number is in ``slow`` take 0.5s."""
+    calls = []
+    lock = threading.Lock()
+
+    def respond(request):
+        with lock:
+            calls.append(request)
+            n = len(calls)
+        if n in slow:
+            time.sleep(0.5)
+        return Response(200, json={"data": {"account": {"id": f"a{n}"}}})
+
+    return respond, calls
+
+
+def test_latency_tracker_threshold_is_the_quantile():
+    tracker = LatencyTracker(HedgePolicy(quantile=0.9, min_samples=5, min_delay=0.0))
+    for ms in range(1, 5):
+        tracker.observe("Account", ms / 1000)
+    assert tracker.threshold("Account") is None
+    for ms in range(5, 11):
+        tracker.observe("Account", ms / 1000)
+    assert tracker.threshold("Account") == 0.009
+
+
+@respx.mock
+def test_slow_read_is_hedged_and_charged_to_the_limiter():
+    respond, calls = _slow_call({4})
+    respx.post(URL).mock(side_effect=respond)
+    limiter = RateLimiter(rate=1000)
+    client = OpenCollectiveClient(
+        api_url=URL,
+        token="mock-token",
+        rate_limiter=limiter,
+        hedge=HedgePolicy(min_samples=3, min_delay=0.05),
+    )
+    for _ in range(3):
+        client.graphql(QUERY, {"slug": "example-collective"})
+
+    data = client.graphql(QUERY, {"slug": "example-collective"})
+    # The duplicate (call 5) answered while the original (call 4) was still sleeping.
+    assert data == {"account": {"id": "a5"}}
+    assert client.network["hedges"] == 1
+    # The abandoned request took a token as well.
+    assert limiter.acquired == 5
+    client.close()
+
+
+@respx.mock
+def test_no_duplicate_when_the_hedge_pool_is_full():
+    respond, calls = _slow_call({4})
+    respx.post(URL).mock(side_effect=respond)
+    limiter = RateLimiter(rate=1000)
+    client = OpenCollectiveClient(
+        api_url=URL,
+        token="mock-token",
+        rate_limiter=limiter,
+        hedge=HedgePolicy(min_samples=3, min_delay=0.05, max_workers=1),
+    )
+    for _ in range(4):
+        data = client.graphql(QUERY, {"slug": "example-collective"})
+
+    assert data == {"account": {"id": "a4"}}
+    assert len(calls) == 4
+    assert client.network["hedges"] == 0
+    assert limiter.acquired == 4
+    client.close()
+
+
+@respx.mock
+def test_mutations_are_never_hedged():
+    respond, calls = _slow_call({4})
+    respx.post(URL).mock(side_effect=respond)
+    client = OpenCollectiveClient(
+        api_url=URL, token="mock-token", hedge=HedgePolicy(min_samples=1, min_delay=0.01)
+    )
+    for _ in range(4):
+        client.graphql(MUTATION, {"account": {"slug": "x"}}, idempotency_key="key-1")
+    assert len(calls) == 4
+    assert client.network["hedges"] == 0
+    client.close()
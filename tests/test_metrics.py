@@ -0,0 +1,68 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import respx
+from httpx import Response
+
+from oc_opsdevnz import HTTPRequestError, OpenCollectiveClient
+from oc_opsdevnz.cli import main
+from oc_opsdevnz.metrics import Metrics
+
+API = "http://localhost:8765/graphql/v2"
+
+
+@respx.mock
+def test_client_feeds_request_retry_and_429_metrics():
+    respx.post(API).mock(
+        side_effect=[
+            Response(502, text="bad gateway"),
+            Response(200, json={"data": {"account": None}}),
+            Response(429, text="slow down"),
+        ]
+    )
+    metrics = Metrics(buckets=(1.0,))
+    client = OpenCollectiveClient(api_url=API, token="t", metrics=metrics)
+    with patch("oc_opsdevnz.oc_client.time.sleep"):
+        client.graphql("query Account($slug: String!) { x }", {"slug": "a"})
+    with pytest.raises(HTTPRequestError):
+        client.graphql("query Account($slug: String!) { x }", {"slug": "b"})
+    client.log_cache("query Account($slug: String!) { x }", hit=True)
+    client.close()
+
+    text = metrics.render()
+    assert 'oc_opsdevnz_requests_total{operation="Account",status="502"} 1' in text
+    assert 'oc_opsdevnz_requests_total{operation="Account",status="200"} 1' in text
+    assert 'oc_opsdevnz_retries_total{operation="Account"} 1' in text
+    assert 'oc_opsdevnz_rate_limited_total{operation="Account"} 1' in text
+    assert 'oc_opsdevnz_cache_lookups_total{operation="Account",result="hit"} 1' in text
+    assert (
+        'oc_opsdevnz_request_duration_seconds_bucket{operation="Account",status="200",le="+Inf"} 1'
+        in text
+    )
+    assert "# TYPE oc_opsdevnz_request_duration_seconds histogram" in text
+
+
+@respx.mock
+def test_cli_writes_metrics_file(tmp_path: Path):
+    respx.post(API).mock(
+        side_effect=[
+            Response(200, json={"data": {"account": None}}),
+            Response(
+                200,
+                json={"data": {"createOrganization": {"id": "org1", "slug": "example-org"}}},
+            ),
+            Response(200, json={"data": {"editAccount": {"id": "org1", "slug": "example-org"}}}),
+        ]
+    )
+    hosts = tmp_path / "hosts.yaml"
+    hosts.write_text("- name: Example Org\n  slug: example-org\n")
+    out = tmp_path / "oc.prom"
+
+    argv = ["hosts", "--file", str(hosts), "--api-url", API, "--token", "t"]
+    assert main([*argv, "--output", "quiet", "--metrics-file", str(out)]) == 0
+
+    text = out.read_text()
+    assert 'oc_opsdevnz_items_total{kind="host",result="created"} 1' in text
+    assert 'oc_opsdevnz_requests_total{operation="CreateOrganization",status="200"} 1' in text
+    assert not list(tmp_path.glob(".oc.prom.*"))
@@ -6,6 +6,7 @@ import respx
 from httpx import Response
 
 from oc_opsdevnz import OpenCollectiveClient, upsert_collective, upsert_host, upsert_project
+from oc_opsdevnz.queries import PROJECT_FIELDS, account_query, account_selection
 
 
 @respx.mock
@@ -281,3 +282,19 @@ def test_load_items_requires_list(tmp_path: Path):
 
     with pytest.raises(ValueError):
         load_items(bad)
+
+
+def test_account_queries_select_only_declared_fields():
+    query = account_query("ProjectAccount", PROJECT_FIELDS)
+    assert "longDescription" not in query and "socialLinks" not in query
+    assert "... on AccountWithParent { parent { slug } }" in query
+    assert account_query("ProjectAccount", PROJECT_FIELDS) is query
+
+    selection = account_selection(["host", "slug", "parent"], indent="")
+    assert selection.splitlines() == [
+        "slug",
+        "... on AccountWithHost { host { slug name } }",
+        "... on AccountWithParent { parent { slug } }",
+    ]
+    with pytest.raises(ValueError, match="nope"):
+        account_selection(["slug", "nope"])
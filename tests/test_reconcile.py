@@ -0,0 +1,110 @@
+from datetime import date
+
+import pytest
+
+from oc_opsdevnz.reconcile import (
+    MATCH_BY_AMOUNT,
+    MATCH_BY_DESCRIPTION,
+    MATCH_BY_ID,
+    OCTransaction,
+    ledger_entries,
+    reconcile,
+)
+
+
+def _tx(tx_id: str, cents: int, day: int, description: str = "", refs=()) -> OCTransaction:
+    return OCTransaction(
+        id=tx_id,
+        account="example-project",
+        cents=cents,
+        day=date(2026, 7, day),
+        description=description,
+        refs=(tx_id, *refs),
+        created_at=f"2026-07-{day:02d}T00:00:00Z",
+    )
+
+
+def test_reconcile_matches_by_id_description_and_amount():
+    entries = ledger_entries(
+        [
+            {
+                "account": "example-project",
+                "amount": "655.50",
+                "date": "2026-07-22",
+                "description": "SFD allocation",
+                "order_id": "order-1",
+            },
+            {
+                "account": "example-project",
+                "amount": "-12.34",
+                "date": "2026-07-23",
+                "description": "Volunteer  reimbursement",
+            },
+            {
+                "account": "example-project",
+                "amount": "100.00",
+                "date": "2026-07-20",
+                "description": "Top-up",
+            },
+            {
+                "account": "example-project",
+                "amount": "5.00",
+                "date": "2026-07-20",
+                "description": "Never sent",
+            },
+        ]
+    )
+    transactions = [
+        _tx("tx1", 65550, 22, "Different wording", refs=("order-1",)),
+        _tx("tx2", -1234, 24, "volunteer reimbursement"),
+        _tx("tx3", 10000, 21, "Top up (edited in UI)"),
+        _tx("tx4", 999, 22, "Host fee"),
+    ]
+
+    report = reconcile(entries, transactions, window_days=2)
+
+    assert [(m.entry.line, m.transaction.id, m.how) for m in report.matched] == [
+        (1, "tx1", MATCH_BY_ID),
+        (2, "tx2", MATCH_BY_DESCRIPTION),
+        (3, "tx3", MATCH_BY_AMOUNT),
+    ]
+    assert [e.line for e in report.missing] == [4]
+    assert [t.id for t in report.unexpected] == ["tx4"]
+    assert report.clean is False
+
+
+def test_reconcile_consumes_each_transaction_once_and_respects_window():
+    entries = ledger_entries(
+        [
+            {"account": "example-project", "amount": "10", "date": "2026-07-10"},
+            {"account": "example-project", "amount": "10", "date": "2026-07-10"},
+            {"account": "example-project", "amount": "10", "date": "2026-07-01"},
+        ]
+    )
+    transactions = [_tx("tx1", 1000, 10), _tx("tx2", 1000, 11), _tx("tx3", 1000, 20)]
+
+    report = reconcile(entries, transactions, window_days=1)
+
+    assert sorted(m.transaction.id for m in report.matched) == ["tx1", "tx2"]
+    assert [e.line for e in report.missing] == [3]
+    assert [t.id for t in report.unexpected] == ["tx3"]
+
+
+def test_ledger_entries_resolve_keys_through_journal():
+    journal_state = {"oc-opsdevnz-addfunds-abc": {"completed": ["ADD_FUNDS"], "id": "order-9"}}
+    (entry,) = ledger_entries(
+        [
+            {
+                "project": "example-project",
+                "amount": "1.00",
+                "processedAt": "2026-07-22T00:00:00Z",
+                "idempotency_key": "oc-opsdevnz-addfunds-abc",
+            }
+        ],
+        journal_state=journal_state,
+    )
+    assert entry.reference == "order-9"
+    assert entry.cents == 100
+
+    with pytest.raises(ValueError, match="Row 1: ledger rows require account"):
+        ledger_entries([{"account": "example-project", "amount": "1"}])
@@ -0,0 +1,75 @@
+from pathlib import Path
+
+import pytest
+
+from oc_opsdevnz.transactions import LedgerStore
+
+np = pytest.importorskip("numpy")
+
+from oc_opsdevnz.reports import expense_arrays, ledger_arrays, rollup  # noqa: E402
+
+
+def _node(n: int, account: str, kind: str, tx_type: str, cents: int, created_at: str) -> dict:
+    return {
+        "id": f"tx{n}",
+        "legacyId": n,
+        "kind": kind,
+        "type": tx_type,
+        "description": "",
+        "createdAt": created_at,
+        "amount": {"valueInCents": cents, "currency": "NZD"},
+        "account": {"slug": account},
+    }
+
+
+def test_rollup_over_synced_ledger(tmp_path: Path):
+    with LedgerStore(tmp_path / "ledger.sqlite") as store:
+        store.upsert_page(
+            "example-project",
+            [
+                _node(1, "example-project", "ADDED_FUNDS", "CREDIT", 50000, "2026-07-22T00:00:00Z"),
+                _node(2, "example-project", "EXPENSE", "DEBIT", -12000, "2026-07-25T00:00:00Z"),
+                _node(3, "example-project", "EXPENSE", "DEBIT", -3000, "2026-08-02T00:00:00Z"),
+                _node(4, "example-project", "CONTRIBUTION", "CREDIT", 2500, "2026-08-03T00:00:00Z"),
+            ],
+        )
+        store.upsert_page(
+            "example-other",
+            [_node(5, "example-other", "ADDED_FUNDS", "CREDIT", 100, "2026-08-01T00:00:00Z")],
+        )
+        result = rollup(ledger_arrays(store))
+
+    assert result.sums.dtype == np.int64
+    records = {(r["slug"], r["month"]): r for r in result.records()}
+    july = records[("example-project", "2026-07")]
+    august = records[("example-project", "2026-08")]
+    assert july["allocationsCents"] == 50000
+    assert july["expensesCents"] == -12000
+    assert july["expensesCount"] == 1
+    assert august["incomeCents"] == 2500
+    assert august["netCents"] == -500
+    assert august["balanceCents"] == 37500
+    assert ("example-other", "2026-07") not in records
+    assert records[("example-other", "2026-08")]["balanceCents"] == 100
+
+
+def test_rollup_of_expense_export_groups_by_status():
+    expenses = [
+        {"status": "PAID", "amountInCents": "1000", "accountSlug": "a", "createdAt": "2026-07-01"},
+        {"status": "PAID", "amountInCents": "500", "accountSlug": "a", "createdAt": "2026-07-09"},
+        {
+            "status": "PENDING",
+            "amount": {"valueInCents": 250},
+            "account": {"slug": "a"},
+            "createdAt": "2026-07-10",
+        },
+    ]
+    (record,) = rollup(expense_arrays(expenses)).records()
+    assert record["paidCents"] == 1500
+    assert record["paidCount"] == 2
+    assert record["pendingCents"] == 250
+
+
+def test_rollup_of_empty_ledger(tmp_path: Path):
+    with LedgerStore(tmp_path / "ledger.sqlite") as store:
+        assert list(rollup(ledger_arrays(store)).records()) == []
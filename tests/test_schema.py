@@ -0,0 +1,127 @@
+from pathlib import Path
+
+import pytest
+import respx
+from httpx import Response
+
+from oc_opsdevnz import OpenCollectiveClient
+from oc_opsdevnz.cli import main
+from oc_opsdevnz.schema import QueryValidationError, Schema, Validator, load_schema
+
+API = "http://localhost:8765/graphql/v2"
+
+
+def _ref(type_str: str):
+    if type_str.endswith("!"):
+        return {"kind": "NON_NULL", "name": None, "ofType": _ref(type_str[:-1])}
+    if type_str.startswith("["):
+        return {"kind": "LIST", "name": None, "ofType": _ref(type_str[1:-1])}
+    kind = "INPUT_OBJECT" if type_str.endswith("Input") else "SCALAR"
+    kind = "OBJECT" if type_str in ("Query", "Mutation", "Collective") else kind
+    kind = "INTERFACE" if type_str == "Account" else kind
+    kind = "ENUM" if type_str == "Currency" else kind
+    return {"kind": kind, "name": type_str, "ofType": None}
+
+
+def _field(name, type_str, **args):
+    return {
+        "name": name,
+        "type": _ref(type_str),
+        "args": [{"name": k, "type": _ref(v), "defaultValue": None} for k, v in args.items()],
+    }
+
+
+ACCOUNT_FIELDS = [_field("id", "String!"), _field("slug", "String!"), _field("tags", "[String]")]
+INTROSPECTION = {
+    "queryType": {"name": "Query"},
+    "mutationType": {"name": "Mutation"},
+    "types": [
+        {"kind": "SCALAR", "name": "String"},
+        {"kind": "SCALAR", "name": "Boolean"},
+        {"kind": "ENUM", "name": "Currency", "enumValues": [{"name": "NZD"}, {"name": "AUD"}]},
+        {
+            "kind": "OBJECT",
+            "name": "Query",
+            "fields": [_field("account", "Account", slug="String")],
+        },
+        {
+            "kind": "OBJECT",
+            "name": "Mutation",
+            "fields": [_field("editAccount", "Account!", account="AccountUpdateInput!")],
+        },
+        {"kind": "INTERFACE", "name": "Account", "fields": ACCOUNT_FIELDS},
+        {"kind": "OBJECT", "name": "Collective", "fields": ACCOUNT_FIELDS},
+        {
+            "kind": "INPUT_OBJECT",
+            "name": "AccountUpdateInput",
+            "inputFields": [
+                {"name": "id", "type": _ref("String!"), "defaultValue": None},
+                {"name": "tags", "type": _ref("[String]"), "defaultValue": None},
+                {"name": "currency", "type": _ref("Currency"), "defaultValue": None},
+            ],
+        },
+    ],
+}
+
+EDIT = """
+mutation Edit($account: AccountUpdateInput!) {
+  editAccount(account: $account) { id ... on Collective { tags } }
+}
+"""
+
+
+def test_validator_checks_documents_once_and_variables_every_call():
+    validator = Validator(Schema(INTROSPECTION))
+    assert validator.document_problems(EDIT) == ()
+    assert validator.document_problems(EDIT) is validator.document_problems(EDIT)
+    validator.check(EDIT, {"account": {"id": "c1", "tags": ["a", "b"]}})
+
+    with pytest.raises(QueryValidationError) as excinfo:
+        validator.check(EDIT, {"account": {"tags": "a", "name": 3}})
+    assert excinfo.value.problems == [
+        "$account: no field 'name' on input AccountUpdateInput",
+        "$account: missing required field 'id'",
+    ]
+
+    bad = "query A($slug: String!, $n: Boolean) { account(slug: $slug, id: 1) { id website } }"
+    assert validator.document_problems(bad) == (
+        "A.account: unknown argument 'id'",
+        "A.account.website: no field 'website' on type 'Account'",
+        "$n is declared but never used",
+    )
+    wrong_var = "query B($slug: Boolean) { account(slug: $slug) { id } }"
+    assert validator.document_problems(wrong_var) == (
+        "B.account(slug): $slug is Boolean, expected String",
+    )
+
+
+def test_validator_reports_enum_variables_of_the_wrong_type():
+    validator = Validator(Schema(INTROSPECTION))
+    validator.check(EDIT, {"account": {"id": "c1", "currency": "NZD"}})
+
+    for value, problem in (
+        ("USD", "$account.currency: 'USD' is not a Currency value"),
+        (["NZD"], "$account.currency: expected a Currency value, got list"),
+        ({"code": "NZD"}, "$account.currency: expected a Currency value, got dict"),
+    ):
+        with pytest.raises(QueryValidationError) as excinfo:
+            validator.check(EDIT, {"account": {"id": "c1", "currency": value}})
+        assert excinfo.value.problems == [problem]
+
+
+@respx.mock
+def test_introspect_caches_schema_and_validator_blocks_before_io(tmp_path: Path, capsys):
+    route = respx.post(API).mock(
+        return_value=Response(200, json={"data": {"__schema": INTROSPECTION}})
+    )
+    argv = ["introspect", "--api-url", API, "--token", "mock-token", "--cache-dir", str(tmp_path)]
+    # The tiny test schema lacks most of what the bundled documents use.
+    assert main(argv) == 1
+    assert "[invalid] operations.MUTATION_CREATE_ORG" in capsys.readouterr().err
+    assert (tmp_path / "schema" / "localhost_8765_graphql_v2.json").exists()
+
+    schema = load_schema(API, tmp_path)
+    client = OpenCollectiveClient(api_url=API, token="mock-token", validator=Validator(schema))
+    with pytest.raises(QueryValidationError, match="no field 'name'"):
+        client.graphql('query { account(slug: "x") { name } }')
+    assert route.call_count == 1
@@ -0,0 +1,126 @@
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+import respx
+from httpx import Response
+
+from oc_opsdevnz import OpenCollectiveClient
+from oc_opsdevnz.oc_client import HTTPRequestError
+from oc_opsdevnz.transactions import LedgerStore, sync_transactions
+
+
+def _tx(n: int, day: int) -> dict:
+    return {
+        "id": f"tx{n:03d}",
+        "legacyId": n,
+        "kind": "ADDED_FUNDS",
+        "type": "CREDIT",
+        "description": f"Transaction {n}",
+        "createdAt": f"2026-07-{day:02d}T00:00:00Z",
+        "amount": {"valueInCents": 100 * n, "currency": "NZD"},
+        "netAmount": {"valueInCents": 100 * n, "currency": "NZD"},
+        "account": {"slug": "example-project"},
+        "oppositeAccount": {"slug": "example-host"},
+        "expense": None,
+        "order": None,
+    }
+
+
+class _FakeTransactions:
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+        self.requests: list[dict] = []
+        self.fail_at_offset = None
+
+    def __call__(self, request):
+        variables = json.loads(request.content)["variables"]
+        self.requests.append(variables)
+        if variables["offset"] == self.fail_at_offset:
+            return Response(400, text="boom")
+        since = variables.get("dateFrom") or ""
+        matching = [r for r in self.rows if r["createdAt"] >= since]
+        start = variables["offset"]
+        nodes = matching[start : start + variables["limit"]]
+        return Response(
+            200, json={"data": {"transactions": {"totalCount": len(matching), "nodes": nodes}}}
+        )
+
+
+@respx.mock
+def test_sync_is_incremental_from_high_water_mark(tmp_path: Path):
+    fake = _FakeTransactions([_tx(n, 1 + n // 2) for n in range(6)])
+    respx.post().mock(side_effect=fake)
+    client = OpenCollectiveClient(token="t")
+
+    with LedgerStore(tmp_path / "ledger.sqlite") as store:
+        first = sync_transactions(client, store, "example-project", page_size=4)
+        assert (first.fetched, first.inserted) == (6, 6)
+        assert store.high_water("example-project") == ("2026-07-03T00:00:00Z", "tx005")
+
+        fake.rows.append(_tx(6, 4))
+        fake.requests.clear()
+        second = sync_transactions(client, store, "example-project", page_size=4)
+
+    assert fake.requests[0]["dateFrom"] == "2026-07-03T00:00:00Z"
+    # Only the boundary day plus the new row come back over the wire.
+    assert second.fetched == 3
+    assert second.inserted == 1
+    client.close()
+
+
+def test_ledger_store_upgrades_a_ledger_without_link_ids(tmp_path: Path):
+    path = tmp_path / "ledger.sqlite"
+    old = sqlite3.connect(path)
+    old.executescript(
+        """
+        CREATE TABLE transactions (
+          id TEXT PRIMARY KEY, legacy_id INTEGER, account TEXT NOT NULL,
+          opposite_account TEXT, kind TEXT, type TEXT, description TEXT,
+          created_at TEXT NOT NULL, amount_cents INTEGER NOT NULL, net_amount_cents INTEGER,
+          currency TEXT, expense_legacy_id INTEGER, order_legacy_id INTEGER, raw TEXT NOT NULL
+        );
+        CREATE TABLE sync_state (
+          account TEXT PRIMARY KEY, last_created_at TEXT NOT NULL,
+          last_id TEXT NOT NULL, synced_at TEXT NOT NULL
+        );
+        """
+    )
+    node = {**_tx(1, 1), "expense": {"id": "exp-1", "legacyId": 7}}
+    old.execute(
+        "INSERT INTO transactions (id, account, created_at, amount_cents, expense_legacy_id, raw)"
+        " VALUES ('tx001', 'example-project', '2026-07-01T00:00:00Z', 100, 7, ?)",
+        (json.dumps(node),),
+    )
+    old.commit()
+    old.close()
+
+    with LedgerStore(path) as store:
+        [row] = store.iter_transactions("example-project")
+        assert (row["expense_id"], row["order_id"]) == ("exp-1", None)
+        store.upsert_page("example-project", [{**_tx(2, 2), "order": {"id": "ord-2"}}])
+        assert [r["order_id"] for r in store.iter_transactions()] == [None, "ord-2"]
+
+
+@respx.mock
+def test_sync_resumes_after_interruption(tmp_path: Path):
+    fake = _FakeTransactions([_tx(n, n + 1) for n in range(5)])
+    fake.fail_at_offset = 2
+    respx.post().mock(side_effect=fake)
+    client = OpenCollectiveClient(token="t")
+
+    with LedgerStore(tmp_path / "ledger.sqlite") as store:
+        with pytest.raises(HTTPRequestError):
+            sync_transactions(client, store, "example-project", page_size=2)
+        assert store.count() == 2
+        assert store.high_water("example-project") == ("2026-07-02T00:00:00Z", "tx001")
+
+        fake.fail_at_offset = None
+        result = sync_transactions(client, store, "example-project", page_size=2)
+        assert result.since == "2026-07-02T00:00:00Z"
+        assert result.inserted == 3
+        assert [r["id"] for r in store.iter_transactions("example-project")] == [
+            f"tx{n:03d}" for n in range(5)
+        ]
+    client.close()